@@ -0,0 +1,206 @@
+"""
+Ohio House Representatives Admission Control
+
+This script handles deciding which clients and scrapes the websocket server lets in, in
+bounded memory so a flood of connections cannot grow the server's state. Each client IP
+gets a token bucket of two numbers, kept in least recently used order so the oldest
+clients are dropped once there are too many or they have been idle too long. Scrape jobs
+wait for one of a fixed number of running slots in first come order, and are told their
+place in the queue whenever it changes.
+
+Classes:
+    ClientRateLimiter: Per IP token buckets with LRU and idle eviction.
+    ScrapeAdmission: Caps the scrapes running at once and queues the rest.
+    QueueFullError: Raised when a scrape cannot be queued.
+
+Libraries:
+    asyncio: Used for the futures the queued scrapes wait on
+    time: Used to refill the token buckets
+    OrderedDict: Used to keep the clients in least recently used order
+    deque: Used for the queue of waiting scrapes
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+
+
+class QueueFullError(Exception):
+    """Raised when a scrape cannot be queued because the queue is full."""
+
+
+class ClientRateLimiter:
+    """
+    Per IP token buckets with LRU and idle eviction.
+
+    Each client holds its tokens and when they were last refilled. A client's bucket
+    is full again once it has been idle for burst / rate seconds, so buckets idle for
+    longer than that can be dropped without changing any decision.
+
+    Args:
+        rate (float): Messages per second each client may send.
+        burst (int): Messages a client may send back to back.
+        max_clients (int): The most clients kept, the least recently seen are dropped.
+        ttl (float): Seconds a client is kept after its last message, or None for
+            burst / rate.
+    """
+
+    def __init__(self, rate, burst, max_clients=10000, ttl=None):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.ttl = ttl if ttl is not None else burst / rate
+
+        # Maps each client IP to [tokens, last refill], least recently seen first
+        self.clients = OrderedDict()
+
+        self.allowed = 0
+        self.limited = 0
+        self.evicted = 0
+
+    def evict(self, now):
+        """
+        Drops the clients idle past the ttl and the oldest clients over max_clients.
+
+        Args:
+            now (float): The current time.monotonic().
+        """
+        while self.clients:
+            client_ip, (_, updated) = next(iter(self.clients.items()))
+
+            if len(self.clients) <= self.max_clients and now - updated < self.ttl:
+                break
+
+            del self.clients[client_ip]
+            self.evicted += 1
+
+    def allow(self, client_ip):
+        """
+        Takes a token from a client's bucket.
+
+        Args:
+            client_ip (str): The IP address of the client sending a message.
+
+        Returns:
+            bool: True if the message is allowed, False if the client is rate limited.
+        """
+        now = time.monotonic()
+        bucket = self.clients.get(client_ip)
+
+        if bucket is None:
+            bucket = self.clients[client_ip] = [self.burst, now]
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            self.clients.move_to_end(client_ip)
+
+        self.evict(now)
+
+        if bucket[0] < 1:
+            self.limited += 1
+            return False
+
+        bucket[0] -= 1
+        self.allowed += 1
+        return True
+
+    def get_stats(self):
+        """Returns the clients kept and the messages allowed, limited and evicted."""
+        return {
+            "clients": len(self.clients),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "evicted": self.evicted,
+        }
+
+
+class ScrapeAdmission:
+    """
+    Caps the scrapes running at once and queues the rest in first come order.
+
+    A finished scrape hands its slot straight to the first one in the queue, and
+    every scrape still waiting is told its new position.
+
+    Args:
+        max_running (int): The most scrapes running at once.
+        max_queued (int): The most scrapes waiting for a slot.
+    """
+
+    def __init__(self, max_running=2, max_queued=20):
+        self.max_running = max_running
+        self.max_queued = max_queued
+
+        self.running = 0
+        # (future, notify) of every waiting scrape, first in line first
+        self.waiters = deque()
+
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    def notify_positions(self):
+        """
+        Sends every waiting scrape its position in the queue, starting at 1.
+        """
+        for position, (_, notify) in enumerate(self.waiters, start=1):
+            notify(position)
+
+    async def acquire(self, notify):
+        """
+        Waits for a running slot.
+
+        Args:
+            notify (function): Called with the scrape's position in the queue when it
+                has to wait and whenever the position changes.
+
+        Raises:
+            QueueFullError: If every slot is taken and the queue is full.
+        """
+        if self.running < self.max_running and not self.waiters:
+            self.running += 1
+            self.admitted += 1
+            return
+
+        if len(self.waiters) >= self.max_queued:
+            self.rejected += 1
+            raise QueueFullError(f"{len(self.waiters)} scrapes are already waiting")
+
+        waiter = (asyncio.get_running_loop().create_future(), notify)
+        self.waiters.append(waiter)
+        self.queued += 1
+        notify(len(self.waiters))
+
+        try:
+            await waiter[0]
+        except asyncio.CancelledError:
+            if waiter[0].done() and not waiter[0].cancelled():
+                # The slot was handed over just as the scrape was cancelled
+                self.release()
+            else:
+                self.waiters.remove(waiter)
+                self.notify_positions()
+            raise
+
+        self.admitted += 1
+
+    def release(self):
+        """
+        Gives a running slot back, or hands it to the first waiting scrape.
+        """
+        if not self.waiters:
+            self.running -= 1
+            return
+
+        future, _ = self.waiters.popleft()
+        future.set_result(None)
+        self.notify_positions()
+
+    def get_stats(self):
+        """Returns the scrapes running, waiting, admitted, queued and rejected."""
+        return {
+            "running": self.running,
+            "waiting": len(self.waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,186 @@
+"""
+Ohio House Representatives AI Result Cache
+
+This script handles caching the parsed results of the biography AI calls. Results are
+keyed by a hash of the normalized biography text together with the version of the AI
+prompt, so a biography that has not changed since the last run skips the model call and
+any edit to the prompt invalidates every older result automatically.
+
+Storing a result only marks the cache as changed. A single task writes the file from a
+thread until no changes are left, so several results stored while a save runs are
+written together and the saves never land out of order. The run flushes the cache when
+it ends.
+
+Classes:
+    AIResultCache: Persistent store of parsed AI results.
+
+Functions:
+    def normalize_bio(combined_bio): Collapses whitespace so formatting changes do not miss
+
+Libraries:
+    asyncio: Used to keep disk writes off the event loop
+    hashlib: Used to hash biographies
+    json: Used to store results on disk
+    os: Used for file paths
+    re: Used to normalize whitespace
+    threading: Used to keep the save task and a direct save from overlapping
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+
+
+def normalize_bio(combined_bio):
+    """
+    Normalizes biography text before it is hashed.
+
+    Args:
+        combined_bio (str): The biography text scraped from the page.
+
+    Returns:
+        str: The text with all runs of whitespace collapsed to single spaces.
+    """
+    return re.sub(r"\s+", " ", combined_bio).strip()
+
+
+class AIResultCache:
+    """
+    Persistent store of parsed AI results, keyed by biography and prompt version.
+
+    Args:
+        path (str): The json file the results are kept in.
+        prompt_version (str): The version of the prompt results are created with.
+    """
+
+    def __init__(self, path, prompt_version):
+        self.path = path
+        self.prompt_version = prompt_version
+        self.entries = {}
+        self.save_lock = threading.Lock()
+
+        # Set when results were stored since the last save, picked up by the save task
+        self.dirty = False
+        self.save_task = None
+
+        self.hits = 0
+        self.misses = 0
+
+        self.load()
+
+    def get_key(self, combined_bio):
+        """
+        Creates the cache key for a biography.
+
+        Args:
+            combined_bio (str): The biography text scraped from the page.
+
+        Returns:
+            str: The prompt version and the hash of the normalized biography.
+        """
+        bio_hash = hashlib.sha256(normalize_bio(combined_bio).encode("utf-8"))
+        return f"{self.prompt_version}:{bio_hash.hexdigest()}"
+
+    def load(self):
+        """
+        Reads the stored results, dropping those made with a different prompt version.
+        """
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                entries = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Could not load AI result cache: {e}")
+            return
+
+        prefix = f"{self.prompt_version}:"
+        self.entries = {
+            key: values for key, values in entries.items() if key.startswith(prefix)
+        }
+
+    def save(self, entries=None):
+        """
+        Writes every result to the cache file, replacing it atomically.
+
+        Args:
+            entries (dict): A copy of the results to write. Defaults to all results.
+        """
+        if entries is None:
+            entries = dict(self.entries)
+
+        with self.save_lock:
+            temp_path = self.path + ".tmp"
+
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(temp_path, "w", encoding="utf-8") as file:
+                    json.dump(entries, file)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                print(f"Could not save AI result cache: {e}")
+
+    def get(self, combined_bio):
+        """
+        Gets the cached result for a biography.
+
+        Args:
+            combined_bio (str): The biography text scraped from the page.
+
+        Returns:
+            tuple: Education, politics, employment and community, or None on a miss.
+        """
+        values = self.entries.get(self.get_key(combined_bio))
+
+        if values is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return tuple(values)
+
+    def put(self, combined_bio, values):
+        """
+        Stores the result for a biography and starts the save task if it is not
+        running.
+
+        Args:
+            combined_bio (str): The biography text scraped from the page.
+            values (tuple): Education, politics, employment and community.
+        """
+        self.entries[self.get_key(combined_bio)] = list(values)
+        self.dirty = True
+
+        if self.save_task is None or self.save_task.done():
+            self.save_task = asyncio.get_running_loop().create_task(
+                self.save_pending()
+            )
+
+    async def save_pending(self):
+        """
+        Saves the results from a thread until no changes are left, one save at a time.
+        """
+        while self.dirty:
+            self.dirty = False
+            await asyncio.to_thread(self.save, dict(self.entries))
+
+    async def flush(self):
+        """
+        Waits for the save task so every stored result is on disk. Called at the end
+        of a run.
+        """
+        if self.save_task is not None:
+            await self.save_task
+
+    def get_stats(self):
+        """Returns the hit and miss counts and the number of stored results."""
+        return {
+            "prompt_version": self.prompt_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.entries),
+        }
@@ -0,0 +1,272 @@
+"""
+Ohio House Representatives AI Extraction
+
+This script handles sending biographies to Gemini as its own stage of the scraper.
+Biographies are put on a queue and a dispatcher collects them for a short window and
+sends them together, several representatives per request, each marked with their slug
+as a stable id. The instructions are only sent once per request instead of once per
+biography. Only the ids whose lines fail validation are split out and retried on their
+own with the single biography prompt.
+
+Model calls are paced by their own requests per minute limit and max in flight limit
+and run in a dedicated thread pool, so AI work drains at its quota while the scraper
+keeps fetching pages at full polite speed.
+
+Classes:
+    BatchedBioExtractor: Queue fed stage that extracts biographies in batched requests.
+
+Libraries:
+    asyncio: Used for the queue, batching window and limits
+    time: Used to time the model calls
+    ThreadPoolExecutor: Used to run the blocking model calls
+    partial: Used to pass keyword arguments to the thread pool
+
+Imports:
+    metrics.py
+        registry: Used to record the model call latency and outcome for /metrics
+    utils.py
+        get_ai_prompt: Gets the single biography prompt used for retries
+        get_ai_batch_prompt: Gets the prompt for several biographies at once
+        parse_ai_batch_response: Splits a batched response into values by id
+    request_scheduler.py
+        TokenBucket: Used for the requests per minute limit
+
+Global Variables:
+    ai_call_histogram: model call latency served by /metrics
+    ai_calls_counter: model calls by outcome served by /metrics
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from utils import get_ai_prompt, get_ai_batch_prompt, parse_ai_batch_response
+from request_scheduler import TokenBucket
+from metrics import registry
+
+# Model call instruments served by the websocket server's /metrics endpoint
+ai_call_histogram = registry.histogram(
+    "scraper_ai_call_seconds", "Seconds a model call took, from send to response"
+)
+ai_calls_counter = registry.counter(
+    "scraper_ai_calls_total", "Model calls by outcome", ("outcome",)
+)
+
+
+class BatchedBioExtractor:
+    """
+    Queue fed stage that sends biographies to the model in batches.
+
+    A batch is sent once it holds batch_size biographies or max_wait seconds after its
+    first biography arrived, whichever comes first. Sending a batch does not hold up
+    collecting the next one; the limits decide when each request actually starts.
+
+    Args:
+        client (genai.Client): The Gemini client.
+        model (str): The model name.
+        batch_size (int): The most biographies sent in one request.
+        max_wait (float): Seconds to wait for a batch to fill before sending it.
+        requests_per_minute (float): The most model requests started per minute.
+        max_in_flight (int): The most model requests running at once. Also the size
+            of the thread pool.
+    """
+
+    def __init__(
+        self,
+        client,
+        model,
+        batch_size=8,
+        max_wait=2.0,
+        requests_per_minute=15,
+        max_in_flight=4,
+    ):
+        self.client = client
+        self.model = model
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.max_in_flight = max_in_flight
+
+        self.rate_bucket = TokenBucket(requests_per_minute / 60, 1)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_in_flight, thread_name_prefix="ai-extraction"
+        )
+
+        # Created on first use so they belong to the running event loop
+        self.queue = None
+        self.in_flight = None
+        self.dispatcher = None
+        self.batch_tasks = set()
+
+        self.requests = 0
+        self.retried = 0
+        self.queued = 0
+
+    def start(self):
+        """
+        Starts the dispatcher if it is not already running.
+        """
+        if self.dispatcher is not None and not self.dispatcher.done():
+            return
+
+        self.queue = asyncio.Queue()
+        self.in_flight = asyncio.Semaphore(self.max_in_flight)
+        self.dispatcher = asyncio.create_task(self.dispatch())
+
+    async def extract(self, rep_name, combined_bio):
+        """
+        Queues a biography and waits for its extracted sections.
+
+        Args:
+            rep_name (str): The representative's slug, used as the id in the batch.
+            combined_bio (str): The representative's full biography.
+
+        Returns:
+            tuple: Education, politics, employment and community, or None if the
+                model did not return a valid result.
+
+        Raises:
+            Exception: Any error raised by the model call.
+        """
+        self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((rep_name, combined_bio, future))
+        self.queued += 1
+
+        return await future
+
+    async def dispatch(self):
+        """
+        Collects queued biographies into batches and starts each batch.
+        """
+        carried = None
+
+        while True:
+            rep_name, combined_bio, future = carried or await self.queue.get()
+            carried = None
+
+            batch = {rep_name: (combined_bio, future)}
+            deadline = asyncio.get_running_loop().time() + self.max_wait
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+                # The same id can't be in one batch twice
+                if item[0] in batch:
+                    carried = item
+                    break
+
+                batch[item[0]] = (item[1], item[2])
+
+            self.queued -= len(batch)
+
+            task = asyncio.create_task(self.run_batch(batch))
+            self.batch_tasks.add(task)
+            task.add_done_callback(self.batch_tasks.discard)
+
+    async def generate(self, prompt):
+        """
+        Sends a prompt to the model once the limits allow it.
+
+        Args:
+            prompt (str): The full prompt.
+
+        Returns:
+            str: The text of the model's response.
+        """
+        async with self.in_flight:
+            wait = self.rate_bucket.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            self.requests += 1
+            started = time.monotonic()
+            outcome = "error"
+
+            try:
+                response = await asyncio.get_running_loop().run_in_executor(
+                    self.executor,
+                    partial(
+                        self.client.models.generate_content,
+                        model=self.model,
+                        contents=prompt,
+                    ),
+                )
+                outcome = "ok"
+            finally:
+                ai_call_histogram.observe(time.monotonic() - started)
+                ai_calls_counter.inc(outcome=outcome)
+
+        return response.text or ""
+
+    async def run_batch(self, batch):
+        """
+        Extracts a batch and resolves each biography's future.
+
+        Args:
+            batch (dict): Maps each id to its (biography, future) pair.
+        """
+        if len(batch) == 1:
+            [(rep_name, (combined_bio, future))] = batch.items()
+            await self.run_single(combined_bio, future)
+            return
+
+        bios = {rep_name: combined_bio for rep_name, (combined_bio, _) in batch.items()}
+
+        try:
+            response_text = await self.generate(get_ai_batch_prompt(bios))
+        except Exception as e:
+            for _, future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        results = parse_ai_batch_response(response_text, bios.keys())
+
+        retries = []
+        for rep_name, (combined_bio, future) in batch.items():
+            if rep_name in results:
+                if not future.done():
+                    future.set_result(results[rep_name])
+            else:
+                retries.append(self.run_single(combined_bio, future))
+
+        # Only the biographies that failed validation are sent again
+        self.retried += len(retries)
+        await asyncio.gather(*retries)
+
+    async def run_single(self, combined_bio, future):
+        """
+        Extracts a single biography with the single biography prompt.
+
+        Args:
+            combined_bio (str): The representative's full biography.
+            future (asyncio.Future): Resolved with the values, or None if invalid.
+        """
+        try:
+            response_text = await self.generate(get_ai_prompt(combined_bio))
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+
+        values = response_text.split("|")
+
+        if not future.done():
+            future.set_result(tuple(values[:4]) if len(values) >= 4 else None)
+
+    def get_stats(self):
+        """Returns the number of model requests, retried and queued biographies."""
+        return {
+            "requests": self.requests,
+            "retried": self.retried,
+            "queued": self.queued,
+        }
@@ -0,0 +1,284 @@
+"""
+Ohio House Representatives Fake Site
+
+This script handles serving a local copy of the ohiohouse.gov pages the scraper reads, so
+the scraper can be benchmarked without sending a single request to the live site. The
+pages are built from the fixtures folder for any number of representatives. The server
+can add latency to every response, throttle clients that go over a rate with 429s and a
+Retry-After header, and fail a share of the requests with 503s.
+
+Instead of the fixtures, the server can serve the pages of a capture archive recorded
+from the real site (see capture_archive.py), for benchmarks on realistic pages.
+
+The server runs on its own thread and event loop so serving pages does not take time from
+the scraper being measured.
+
+Classes:
+    FakeSite: Local aiohttp server serving the fixture pages.
+
+Functions:
+    def build_names(count): Builds the representative names listed in the directory
+
+Libraries:
+    asyncio: Used for the server's event loop
+    threading: Used to run the server next to the scraper
+    random: Used for the latency jitter and the random errors
+    time: Used for the rate limit
+    os: Used to find the fixtures
+    string: Used to fill in the fixture templates
+    urlsplit: Used to match the recorded pages to request paths
+    aiohttp: Used for the server
+
+Imports:
+    utils.py
+        create_rep_slug: Used to build the same slugs the scraper looks up
+    capture_archive.py
+        read_capture: Used to read the pages of a capture archive
+
+Global Variables:
+    FIXTURES_DIR: Folder the fixture pages are read from
+    FIRST_NAMES, LAST_NAMES: Used to build the representative names
+"""
+
+import asyncio
+import os
+import random
+import string
+import threading
+import time
+from urllib.parse import urlsplit
+
+from aiohttp import web  # type: ignore
+
+from utils import create_rep_slug
+from capture_archive import read_capture
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+FIRST_NAMES = ["Jane", "John", "Mary", "D.J.", "Sara", "Bill", "Ana", "Tom", "Kim"]
+LAST_NAMES = ["Doe", "Smith", "Swearingen", "Miller", "Jones", "Brown", "Lopez"]
+
+
+def build_names(count):
+    """
+    Builds the names of the representatives listed in the fake directory.
+
+    Args:
+        count (int): The number of representatives.
+
+    Returns:
+        list: Unique display names.
+    """
+    names = []
+
+    for index in range(count):
+        first = FIRST_NAMES[index % len(FIRST_NAMES)]
+        last = LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        names.append(f"{first} {last} {index + 1}")
+
+    return names
+
+
+class FakeSite:
+    """
+    Local aiohttp server serving the fixture pages.
+
+    Args:
+        rep_count (int): The number of representatives in the directory.
+        latency (float): Average seconds added to every response, with +-50% jitter.
+        rate (float): Requests per second allowed before 429s, 0 for no limit.
+        burst (int): Requests allowed back to back before the rate applies.
+        retry_after (float): Seconds sent in the Retry-After header of a 429.
+        error_rate (float): Share of the requests answered with a 503.
+        seed (int): Seed for the latency jitter and the random errors.
+        fixtures_dir (str): Folder the fixture pages are read from.
+        capture_path (str): A capture archive to serve instead of the fixtures, or None.
+    """
+
+    def __init__(
+        self,
+        rep_count=99,
+        latency=0.05,
+        rate=0,
+        burst=5,
+        retry_after=1,
+        error_rate=0.0,
+        seed=0,
+        fixtures_dir=FIXTURES_DIR,
+        capture_path=None,
+    ):
+        self.latency = latency
+        self.rate = rate
+        self.burst = burst
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+
+        # Recorded pages keyed by path and query, the last good response of each url
+        self.pages = None
+        if capture_path:
+            self.pages = {}
+            for entry in read_capture(capture_path):
+                if entry["status"] == 200:
+                    parts = urlsplit(entry["url"])
+                    path = parts.path + (f"?{parts.query}" if parts.query else "")
+                    self.pages[path] = entry["body"]
+
+        self.templates = {}
+        for name in os.listdir(fixtures_dir):
+            if name.endswith(".html"):
+                with open(os.path.join(fixtures_dir, name), "r", encoding="utf-8") as file:
+                    self.templates[name[: -len(".html")]] = string.Template(file.read())
+
+        self.reps = {}
+        for index, name in enumerate(build_names(rep_count), start=1):
+            self.reps[create_rep_slug(name)] = {
+                "name": name,
+                "slug": create_rep_slug(name),
+                "index": index,
+                "phone": f"{index:04d}",
+            }
+
+        self.directory = self.templates["directory"].substitute(
+            entries="\n".join(
+                self.templates["directory_entry"].substitute(rep)
+                for rep in self.reps.values()
+            )
+        )
+
+        self.tokens = burst
+        self.last_refill = time.monotonic()
+
+        self.loop = None
+        self.runner = None
+        self.thread = None
+        self.url = None
+
+        self.requests = 0
+        self.served = 0
+        self.throttled = 0
+        self.errors = 0
+
+    def take_token(self):
+        """
+        Takes a token from the rate limit bucket.
+
+        Returns:
+            bool: True if the request is allowed.
+        """
+        if not self.rate:
+            return True
+
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+        if self.tokens < 1:
+            return False
+
+        self.tokens -= 1
+        return True
+
+    async def handle(self, request):
+        """
+        Answers a request like ohiohouse.gov would, with the configured faults.
+
+        Args:
+            request (web.Request): The request.
+
+        Returns:
+            web.Response: The page, a 429, a 503 or a 404.
+        """
+        self.requests += 1
+
+        if self.latency:
+            await asyncio.sleep(self.latency * self.random.uniform(0.5, 1.5))
+
+        if not self.take_token():
+            self.throttled += 1
+            return web.Response(
+                status=429, headers={"Retry-After": str(self.retry_after)}
+            )
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            return web.Response(status=503)
+
+        slug = request.match_info.get("slug")
+        page = request.match_info.get("page", "member")
+
+        if self.pages is not None:
+            body = self.pages.get(request.path_qs)
+            if body is None:
+                return web.Response(status=404)
+        elif slug == "directory":
+            body = self.directory
+        elif slug in self.reps and page in self.templates:
+            body = self.templates[page].substitute(self.reps[slug])
+        else:
+            return web.Response(status=404)
+
+        self.served += 1
+        return web.Response(text=body, content_type="text/html")
+
+    async def serve(self, ready):
+        """
+        Starts the server on a free local port.
+
+        Args:
+            ready (threading.Event): Set once the server accepts requests.
+        """
+        app = web.Application()
+        app.router.add_get("/members/{slug}", self.handle)
+        app.router.add_get("/members/{slug}/{page}", self.handle)
+
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+
+        port = self.runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}"
+        ready.set()
+
+    def start(self):
+        """
+        Starts the server on its own thread.
+
+        Returns:
+            str: The url to use as the scraper's SITE_URL.
+        """
+        ready = threading.Event()
+        self.loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self.serve(ready))
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=run, name="fake-site", daemon=True)
+        self.thread.start()
+        ready.wait()
+
+        return self.url
+
+    def stop(self):
+        """Stops the server and its thread."""
+        if self.loop is None:
+            return
+
+        future = asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop)
+        future.result()
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    def get_stats(self):
+        """Returns the requests received, pages served, 429s and 503s."""
+        return {
+            "requests": self.requests,
+            "served": self.served,
+            "throttled": self.throttled,
+            "errors": self.errors,
+        }
@@ -0,0 +1,349 @@
+"""
+Ohio House Representatives Scraper Benchmark
+
+This script handles measuring the scraper end to end without the live site or Gemini. It
+starts the fake site, points the scraper at it with SITE_URL, swaps the Gemini client for
+the stub and runs run_scraper for every representative. The wall time, requests per
+second, retries, peak RSS and time to first result are printed and saved as json, named
+after the time and commit, so runs can be compared between commits with --compare.
+
+The response and AI caches are turned off or pointed at a temporary folder so every run
+starts cold, and the learned request rate is not saved over the real one. Any scraper
+setting not covered by the options (AI_BATCH_SIZE, PARSE_WORKERS, ...) can be set through
+its environment variable as usual.
+
+Usage:
+    python benchmarks/run_benchmark.py --reps 99 --latency 0.05 --site-rate 20
+    python benchmarks/run_benchmark.py --capture cache/captures/<run>.jsonl.gz
+    python benchmarks/run_benchmark.py --compare results/old.json results/new.json
+
+Functions:
+    def parse_args(): Reads the command line options
+    def configure_env(args, site_url, temp_dir): Sets the scraper's environment before it is imported
+    def get_peak_rss(): Gets the peak resident memory of the benchmark and its parse workers
+    def get_commit(): Gets the short hash of the current commit
+    async def run_benchmark(args, site, ai_client): Runs the scraper once and collects the metrics
+    def save_result(result, output_dir): Saves a result as json
+    def compare_results(old_path, new_path): Prints the change of each metric between two results
+    def main(): Runs the benchmark or the comparison
+
+Libraries:
+    argparse: Used for the command line options
+    asyncio: Used to run the scraper
+    json: Used to save and read the results
+    os, sys: Used for the environment and the import path
+    resource: Used to measure the peak RSS
+    subprocess: Used to get the current commit
+    tempfile: Used for the caches of the run
+    time: Used to time the run
+
+Imports:
+    fake_site.py
+        FakeSite: Used to serve the fixture pages with latency, 429s and 503s
+    stub_gemini.py
+        StubGeminiClient: Used in place of the Gemini client
+    houseScraper_async.py (imported once the environment is set)
+        run_scraper: The function being measured
+
+Global Variables:
+    BACKEND_DIR: The backend folder, added to the import path
+    RESULTS_DIR: Default folder the results are saved in
+    ALL_FIELDS: Every field the scraper supports
+    COMPARED_METRICS: Metrics printed by --compare
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from fake_site import FakeSite  # noqa: E402
+from stub_gemini import StubGeminiClient  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+ALL_FIELDS = ["info", "bio", "committees", "legislation", "image_url"]
+COMPARED_METRICS = [
+    "wall_seconds",
+    "requests_per_second",
+    "first_result_seconds",
+    "retries",
+    "site_requests",
+    "ai_requests",
+    "peak_rss_mb",
+]
+
+
+def parse_args():
+    """
+    Reads the command line options.
+
+    Returns:
+        argparse.Namespace: The options.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the scraper offline.")
+
+    parser.add_argument("--reps", type=int, default=99, help="representatives")
+    parser.add_argument("--fields", nargs="+", default=ALL_FIELDS, help="fields")
+    parser.add_argument(
+        "--no-stream", action="store_true", help="collect the json instead of streaming"
+    )
+    parser.add_argument("--latency", type=float, default=0.05, help="site latency (s)")
+    parser.add_argument(
+        "--site-rate", type=float, default=0, help="site requests/s before 429s"
+    )
+    parser.add_argument("--site-burst", type=int, default=5, help="site burst")
+    parser.add_argument(
+        "--retry-after", type=float, default=1, help="Retry-After of a 429 (s)"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 503s")
+    parser.add_argument("--ai-latency", type=float, default=0.5, help="AI latency (s)")
+    parser.add_argument(
+        "--ai-failure-rate", type=float, default=0.0, help="share of AI failures"
+    )
+    parser.add_argument(
+        "--request-rate", type=float, default=None, help="scraper REQUEST_RATE"
+    )
+    parser.add_argument(
+        "--capture", default=None, help="capture archive served instead of the fixtures"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed for the faults")
+    parser.add_argument("--label", default="", help="label saved with the result")
+    parser.add_argument("--output", default=RESULTS_DIR, help="results folder")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two results"
+    )
+
+    return parser.parse_args()
+
+
+def configure_env(args, site_url, temp_dir):
+    """
+    Sets the scraper's environment before it is imported.
+
+    Variables already set by the caller are kept, except SITE_URL.
+
+    Args:
+        args (argparse.Namespace): The options.
+        site_url (str): The url of the fake site.
+        temp_dir (str): Folder for the caches and rate state of the run.
+    """
+    os.environ["SITE_URL"] = site_url
+    os.environ.setdefault("API_KEY", "benchmark")
+    os.environ.setdefault("RESPONSE_CACHE_MODE", "off")
+    os.environ.setdefault(
+        "RESPONSE_CACHE_DIR", os.path.join(temp_dir, "responses")
+    )
+    os.environ.setdefault("AI_CACHE_FILE", os.path.join(temp_dir, "ai_results.json"))
+    os.environ.setdefault("RATE_STATE_FILE", os.path.join(temp_dir, "rate_state.json"))
+
+    if args.request_rate is not None:
+        os.environ["REQUEST_RATE"] = str(args.request_rate)
+
+
+def get_peak_rss():
+    """
+    Gets the peak resident memory of the benchmark and its parse workers.
+
+    Returns:
+        dict: The peak RSS in MB of the process and of its finished children, or
+            None values where resource is not available.
+    """
+    if resource is None:
+        return {"peak_rss_mb": None, "children_peak_rss_mb": None}
+
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+
+    return {
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        "children_peak_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        / scale,
+    }
+
+
+def get_commit():
+    """
+    Gets the short hash of the current commit.
+
+    Returns:
+        str: The hash, or "unknown" outside a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run_benchmark(args, site, ai_client):
+    """
+    Runs the scraper once against the fake site and collects the metrics.
+
+    Args:
+        args (argparse.Namespace): The options.
+        site (FakeSite): The running fake site.
+        ai_client (StubGeminiClient): The stub Gemini client.
+
+    Returns:
+        dict: The metrics of the run.
+    """
+    import houseScraper_async
+
+    houseScraper_async.bio_extractor.client = ai_client
+
+    stream = not args.no_stream
+    started = time.monotonic()
+    first_result = {}
+    final_json = {}
+
+    def add_to_ui_queue(message):
+        if "first" not in first_result and '"msg_type":"result"' in message:
+            first_result["first"] = time.monotonic() - started
+
+    async def send_json(websocket, people):
+        final_json["reps"] = len(people)
+        first_result.setdefault("first", time.monotonic() - started)
+
+    run_stats = await houseScraper_async.run_scraper(
+        args.fields, add_to_ui_queue, send_json, None, stream
+    )
+    wall_seconds = time.monotonic() - started
+
+    await houseScraper_async.close_session()
+
+    # Finished workers are counted in the children's peak RSS
+    if houseScraper_async.parse_pool is not None:
+        houseScraper_async.parse_pool.shutdown()
+
+    site_stats = site.get_stats()
+
+    return {
+        "commit": get_commit(),
+        "label": args.label,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("compare", "output")
+        },
+        "wall_seconds": wall_seconds,
+        "requests_per_second": site_stats["requests"] / wall_seconds,
+        "first_result_seconds": first_result.get("first"),
+        "retries": run_stats["retries"]["retries"],
+        "site_requests": site_stats["requests"],
+        "ai_requests": ai_client.get_stats()["requests"],
+        **get_peak_rss(),
+        "site": site_stats,
+        "ai": ai_client.get_stats(),
+        "run_stats": run_stats,
+    }
+
+
+def save_result(result, output_dir):
+    """
+    Saves a result as json, named after its time and commit.
+
+    Args:
+        result (dict): The metrics of the run.
+        output_dir (str): The folder to save it in.
+
+    Returns:
+        str: The path of the saved result.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{result['commit']}.json"
+    path = os.path.join(output_dir, name)
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(result, file, indent=2, default=str)
+
+    return path
+
+
+def compare_results(old_path, new_path):
+    """
+    Prints the change of each metric between two results.
+
+    Args:
+        old_path (str): The result to compare against.
+        new_path (str): The new result.
+    """
+    with open(old_path, "r", encoding="utf-8") as file:
+        old = json.load(file)
+    with open(new_path, "r", encoding="utf-8") as file:
+        new = json.load(file)
+
+    print(f"{'metric':<24}{old['commit']:>14}{new['commit']:>14}{'change':>10}")
+
+    for metric in COMPARED_METRICS:
+        old_value = old.get(metric)
+        new_value = new.get(metric)
+
+        if old_value is None or new_value is None:
+            print(f"{metric:<24}{str(old_value):>14}{str(new_value):>14}")
+            continue
+
+        change = f"{(new_value - old_value) / old_value:+.1%}" if old_value else ""
+        print(f"{metric:<24}{old_value:>14.3f}{new_value:>14.3f}{change:>10}")
+
+    if old["config"] != new["config"]:
+        print("Warning: the results were run with different options")
+
+
+def main():
+    """
+    Runs the benchmark or the comparison.
+    """
+    args = parse_args()
+
+    if args.compare:
+        compare_results(*args.compare)
+        return
+
+    site = FakeSite(
+        rep_count=args.reps,
+        latency=args.latency,
+        rate=args.site_rate,
+        burst=args.site_burst,
+        retry_after=args.retry_after,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        capture_path=args.capture,
+    )
+    ai_client = StubGeminiClient(args.ai_latency, args.ai_failure_rate, args.seed)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        configure_env(args, site.start(), temp_dir)
+
+        try:
+            result = asyncio.run(run_benchmark(args, site, ai_client))
+        finally:
+            site.stop()
+
+    path = save_result(result, args.output)
+
+    for metric in COMPARED_METRICS:
+        print(f"{metric}: {result[metric]}")
+    print(f"Saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
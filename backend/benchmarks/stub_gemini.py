@@ -0,0 +1,95 @@
+"""
+Ohio House Representatives Stub Gemini Client
+
+This script handles standing in for the Gemini client during benchmarks. It answers the
+scraper's single and batched biography prompts in the format the real model is asked for,
+after a configurable latency, and fails a configurable share of the requests. The
+scraper calls the client from a thread, so the latency is a blocking sleep just like a
+real request.
+
+Classes:
+    StubGeminiClient: Drop in replacement for genai.Client used by the AI extraction stage.
+
+Libraries:
+    random: Used for the latency jitter and the failures
+    threading: Used to count requests from the executor threads
+    time: Used for the latency
+    types: Used to build the response objects
+"""
+
+import random
+import threading
+import time
+import types
+
+
+class StubGeminiClient:
+    """
+    Drop in replacement for genai.Client used by the AI extraction stage.
+
+    Args:
+        latency (float): Average seconds per request, with +-50% jitter.
+        failure_rate (float): Share of the requests that raise an error.
+        seed (int): Seed for the latency jitter and the failures.
+    """
+
+    def __init__(self, latency=0.5, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+        self.models = types.SimpleNamespace(generate_content=self.generate_content)
+
+        self.requests = 0
+        self.failures = 0
+
+    def generate_content(self, model, contents):
+        """
+        Answers a prompt like the model would.
+
+        Args:
+            model (str): The model name, ignored.
+            contents (str): The prompt.
+
+        Returns:
+            SimpleNamespace: A response with the text of the answer.
+
+        Raises:
+            RuntimeError: For the share of requests set by failure_rate.
+        """
+        with self.lock:
+            self.requests += 1
+            delay = self.latency * self.random.uniform(0.5, 1.5)
+            failed = self.random.random() < self.failure_rate
+            if failed:
+                self.failures += 1
+
+        time.sleep(delay)
+
+        if failed:
+            raise RuntimeError("Stub Gemini failure")
+
+        summary = (
+            "The Ohio State University, BA, Political Science"
+            "|Ohio House of Representatives, 2023-Present"
+            "|Small Business Owner"
+            "|Rotary Club, Member"
+        )
+
+        bio_ids = [
+            line.split("[ID: ", 1)[1].rstrip("]").strip()
+            for line in contents.splitlines()
+            if line.strip().startswith("[ID: ")
+        ]
+
+        if not bio_ids:
+            return types.SimpleNamespace(text=summary)
+
+        return types.SimpleNamespace(
+            text="\n".join(f"{bio_id}::{summary}" for bio_id in bio_ids)
+        )
+
+    def get_stats(self):
+        """Returns the requests answered and failed."""
+        return {"requests": self.requests, "failures": self.failures}
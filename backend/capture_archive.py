@@ -0,0 +1,265 @@
+"""
+Ohio House Representatives Capture Archive
+
+This script handles recording the pages of a real run and replaying them later without
+the network. In record mode every response fetch_data receives (url, status, headers,
+body and how long it took) is written to one gzip compressed json lines file per run. In
+replay mode fetch_data is served from such a file, so a run that hit a parse failure can
+be reproduced exactly, the parse and AI stages can be profiled without the network, and
+the benchmarks can serve real pages.
+
+A url fetched more than once (a retried 429 or 503) is replayed in the order it was
+recorded, and its last response is repeated after that. Replay can also wait as long as
+each recorded response took, for runs that should keep the original timing.
+
+Classes:
+    CaptureWriter: Writes the responses of a run to a compressed archive.
+    CaptureReplay: Serves responses from a compressed archive.
+
+Functions:
+    def read_capture(path): Reads every entry of an archive
+    def get_latest_capture(directory): Gets the most recent archive in a folder
+
+Libraries:
+    asyncio: Used to keep the file access off the event loop
+    gzip: Used to compress the archive
+    itertools: Used to keep the names of archives started together apart
+    json: Used to write and read the entries
+    os: Used to name and find the archives
+    time: Used to time the responses
+    defaultdict: Used to group the entries by url
+"""
+
+import asyncio
+import gzip
+import itertools
+import json
+import os
+import time
+from collections import defaultdict
+
+
+def read_capture(path):
+    """
+    Reads every entry of an archive.
+
+    Args:
+        path (str): The archive.
+
+    Returns:
+        list: The response entries, in the order they were recorded.
+    """
+    entries = []
+
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        try:
+            for line in file:
+                entry = json.loads(line)
+
+                if entry.get("type") == "response":
+                    entries.append(entry)
+        except (EOFError, ValueError):
+            # The archive of a run that was interrupted ends early
+            pass
+
+    return entries
+
+
+def get_latest_capture(directory):
+    """
+    Gets the most recent archive in a folder.
+
+    Args:
+        directory (str): The folder the archives are written to.
+
+    Returns:
+        str: The path of the archive, or None if there is none.
+    """
+    try:
+        paths = [
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.endswith(".jsonl.gz")
+        ]
+    except OSError:
+        return None
+
+    return max(paths, key=os.path.getmtime, default=None)
+
+
+class CaptureWriter:
+    """
+    Writes the responses of a run to a compressed archive.
+
+    Entries are collected and written from a thread in batches, so recording does not
+    block the event loop.
+
+    Args:
+        directory (str): The folder the archive is written to.
+        site_url (str): The site the run scrapes, saved in the archive's header.
+        batch_size (int): Entries collected before they are written.
+    """
+
+    # Runs can start in the same second, each needs its own archive
+    ids = itertools.count()
+
+    def __init__(self, directory, site_url, batch_size=32):
+        self.path = os.path.join(
+            directory,
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(self.ids)}.jsonl.gz",
+        )
+        self.directory = directory
+        self.batch_size = batch_size
+
+        self.file = None
+        self.pending = [
+            {"type": "capture", "site_url": site_url, "started": time.time()}
+        ]
+        self.lock = asyncio.Lock()
+        self.started = time.monotonic()
+
+        self.recorded = 0
+        self.bytes = 0
+
+    def write_entries(self, entries):
+        """
+        Writes entries to the archive. Runs in a thread.
+
+        Args:
+            entries (list): The entries to write.
+        """
+        if self.file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.file = gzip.open(self.path, "wt", encoding="utf-8")
+
+        for entry in entries:
+            self.file.write(json.dumps(entry) + "\n")
+
+    async def flush(self):
+        """
+        Writes the collected entries to the archive.
+        """
+        async with self.lock:
+            entries, self.pending = self.pending, []
+
+            if entries:
+                await asyncio.to_thread(self.write_entries, entries)
+
+    async def record(self, url, status, headers, body, started, error=None):
+        """
+        Records a response.
+
+        Args:
+            url (str): The url that was requested.
+            status (int): The response status, 0 if no response was received.
+            headers (dict): The response headers.
+            body (str): The response body, or None.
+            started (float): time.monotonic() when the request was sent.
+            error (str): The error class of a request that got no response, or None.
+        """
+        now = time.monotonic()
+
+        self.pending.append(
+            {
+                "type": "response",
+                "url": url,
+                "status": status,
+                "headers": dict(headers),
+                "body": body,
+                "error": error,
+                "offset": started - self.started,
+                "elapsed": now - started,
+            }
+        )
+        self.recorded += 1
+        self.bytes += len(body or "")
+
+        if len(self.pending) >= self.batch_size:
+            await self.flush()
+
+    async def close(self):
+        """
+        Writes the remaining entries and closes the archive.
+        """
+        await self.flush()
+
+        if self.file is not None:
+            await asyncio.to_thread(self.file.close)
+            self.file = None
+
+    def get_stats(self):
+        """Returns the archive's path, responses recorded and body bytes."""
+        return {"path": self.path, "recorded": self.recorded, "bytes": self.bytes}
+
+
+class CaptureReplay:
+    """
+    Serves responses from a compressed archive.
+
+    The archive is read on first use.
+
+    Args:
+        path (str): The archive to replay.
+        timing (bool): Whether to wait as long as each recorded response took.
+    """
+
+    def __init__(self, path, timing=False):
+        self.path = path
+        self.timing = timing
+
+        self.responses = None
+        self.served = defaultdict(int)
+        self.lock = asyncio.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    async def load(self):
+        """
+        Reads the archive and groups its entries by url.
+        """
+        async with self.lock:
+            if self.responses is not None:
+                return
+
+            entries = await asyncio.to_thread(read_capture, self.path)
+
+            responses = defaultdict(list)
+            for entry in entries:
+                responses[entry["url"]].append(entry)
+
+            self.responses = responses
+
+    async def get(self, url):
+        """
+        Gets the next recorded response of a url.
+
+        Args:
+            url (str): The url being fetched.
+
+        Returns:
+            dict: The recorded entry, or None if the url was not recorded.
+        """
+        if self.responses is None:
+            await self.load()
+
+        entries = self.responses.get(url)
+
+        if not entries:
+            self.misses += 1
+            return None
+
+        index = min(self.served[url], len(entries) - 1)
+        self.served[url] += 1
+        self.hits += 1
+
+        entry = entries[index]
+
+        if self.timing:
+            await asyncio.sleep(entry["elapsed"])
+
+        return entry
+
+    def get_stats(self):
+        """Returns the archive's path and the responses served and missing."""
+        return {"path": self.path, "hits": self.hits, "misses": self.misses}
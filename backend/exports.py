@@ -0,0 +1,381 @@
+"""
+Ohio House Representatives Exports
+
+This script handles building downloadable exports of the snapshot on the server, so the
+frontend no longer has to build the file from the final json. An export can be TSV, laid
+out like the frontend's Save Output file, CSV, NDJSON with one representative per line,
+or Parquet when pyarrow is installed. The columns come from the chosen fields and the
+rows from the chosen representatives.
+
+An export is written to a file in chunks of rows, one row group per chunk for Parquet,
+so memory stays flat no matter how many representatives there are, and the file is
+streamed to the client from disk. Files are named after the snapshot version they were
+built from, so the same export is only built once per version. Exports of older versions
+are deleted when a newer one is built, once they are older than a grace period so a
+download that started before the snapshot changed can finish.
+
+Classes:
+    ExportCache: Builds exports of the snapshot and keeps them by snapshot version.
+    ExportError: Raised when an export cannot be built from the request.
+
+Functions:
+    def format_cell(value): Formats a value for a TSV or CSV cell
+    def iter_text_chunks(rows, columns, export_format, chunk_rows): Encodes rows as text in chunks
+    def write_parquet(path, rows, columns, chunk_rows): Writes rows as Parquet in row groups
+
+Libraries:
+    asyncio: Used to build exports off the event loop
+    csv: Used to quote the CSV cells
+    hashlib: Used to name the export files
+    io: Used to collect each chunk of CSV rows
+    itertools: Used to split the rows into chunks and name temporary files
+    os: Used for the export files
+    time: Used to keep exports of older versions for the grace period
+    pyarrow: Optional, used to write Parquet
+
+Imports:
+    serialization.py
+        clean_value: Used to keep tabs and line breaks out of TSV cells
+        dumps: Used to encode NDJSON lines and the export keys
+
+Global Variables:
+    COLUMN_HEADERS: The header of each column, as in the frontend's Save Output file
+    EXPORT_FORMATS: The content type and file extension of each format
+"""
+
+import asyncio
+import csv
+import hashlib
+import io
+import itertools
+import os
+import time
+
+try:
+    import pyarrow  # type: ignore
+    import pyarrow.parquet  # type: ignore
+except ImportError:
+    pyarrow = None
+
+from serialization import clean_value, dumps
+
+COLUMN_HEADERS = {
+    "name": "Name",
+    "hometown": "Hometown",
+    "address": "Address",
+    "phone": "Phone",
+    "fax": "Fax",
+    "education": "Education",
+    "politics": "Politics",
+    "employment": "Employment",
+    "community": "Community",
+    "committees": "Committees",
+    "legislation": "Legislation",
+    "image_formula": "Image",
+    "image_url": "Image_URL",
+}
+
+EXPORT_FORMATS = {
+    "tsv": ("text/tab-separated-values; charset=utf-8", "txt"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson; charset=utf-8", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class ExportError(Exception):
+    """Raised when an export cannot be built from the request."""
+
+
+def format_cell(value):
+    """
+    Formats a value for a TSV or CSV cell the way the frontend did.
+
+    Args:
+        value: The column's value. Missing values are empty and lists are joined
+            with commas.
+
+    Returns:
+        str: The cell.
+    """
+    if value is None:
+        return ""
+
+    if isinstance(value, (tuple, list)):
+        value = ",".join(format_cell(item) for item in value)
+
+    return clean_value(str(value))
+
+
+def iter_text_chunks(rows, columns, export_format, chunk_rows):
+    """
+    Encodes rows as TSV, CSV or NDJSON text in chunks.
+
+    Args:
+        rows (iterable): (name, values) of every representative, with the values in
+            the order of the columns.
+        columns (list): The columns after the name.
+        export_format (str): tsv, csv or ndjson.
+        chunk_rows (int): The number of rows in a chunk.
+
+    Yields:
+        str: The header, if the format has one, then the rows in chunks.
+    """
+    rows = iter(rows)
+    headers = [COLUMN_HEADERS["name"]] + [COLUMN_HEADERS[c] for c in columns]
+
+    if export_format == "tsv":
+        yield "\t".join(headers) + "\n"
+
+        while chunk := list(itertools.islice(rows, chunk_rows)):
+            yield "".join(
+                "\t".join([format_cell(name)] + [format_cell(v) for v in values])
+                + "\n"
+                for name, values in chunk
+            )
+    elif export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(headers)
+
+        while chunk := list(itertools.islice(rows, chunk_rows)):
+            writer.writerows(
+                [format_cell(name)] + [format_cell(v) for v in values]
+                for name, values in chunk
+            )
+            yield buffer.getvalue()
+
+            buffer.seek(0)
+            buffer.truncate()
+
+        # The header alone when there are no rows
+        yield buffer.getvalue()
+    else:
+        while chunk := list(itertools.islice(rows, chunk_rows)):
+            yield "".join(
+                dumps({"name": name, **dict(zip(columns, values))}) + "\n"
+                for name, values in chunk
+            )
+
+
+def write_parquet(path, rows, columns, chunk_rows):
+    """
+    Writes rows as Parquet, one row group per chunk. Every column is a string column.
+
+    Args:
+        path (str): The file to write.
+        rows (iterable): (name, values) of every representative.
+        columns (list): The columns after the name.
+        chunk_rows (int): The number of rows in a row group.
+    """
+    names = ["name"] + list(columns)
+    schema = pyarrow.schema([(name, pyarrow.string()) for name in names])
+    rows = iter(rows)
+
+    with pyarrow.parquet.ParquetWriter(path, schema) as writer:
+        while chunk := list(itertools.islice(rows, chunk_rows)):
+            table_columns = [[name for name, _ in chunk]] + [
+                [None if row[i] is None else format_cell(row[i]) for _, row in chunk]
+                for i in range(len(columns))
+            ]
+            writer.write_table(pyarrow.table(table_columns, schema=schema))
+
+
+class ExportCache:
+    """
+    Builds exports of the snapshot and keeps them by snapshot version.
+
+    Args:
+        directory (str): The folder the exports are kept in.
+        field_columns (dict): Maps each field to the columns it fills in.
+        chunk_rows (int): The rows written at a time.
+        max_files (int): The most exports kept for the current version, the oldest are
+            deleted first.
+        grace (float): Seconds an export of an older version is kept after it was
+            last built or served, for downloads that are still being sent.
+    """
+
+    def __init__(
+        self, directory, field_columns, chunk_rows=500, max_files=32, grace=300
+    ):
+        self.directory = directory
+        self.field_columns = field_columns
+        self.chunk_rows = chunk_rows
+        self.max_files = max_files
+        self.grace = grace
+
+        # Exports being built, so requests for the same export wait for one build
+        self.building = {}
+        self.counter = itertools.count()
+
+        self.hits = 0
+        self.built = 0
+
+    def get_columns(self, fields):
+        """
+        Gets the columns of the chosen fields, in the frontend's column order.
+
+        Args:
+            fields (iterable): The chosen fields, or nothing for every field.
+
+        Returns:
+            list: The columns.
+
+        Raises:
+            ExportError: If a field is unknown.
+        """
+        fields = set(fields)
+        unknown = fields - set(self.field_columns)
+
+        if unknown:
+            raise ExportError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+        return [
+            column
+            for field, columns in self.field_columns.items()
+            if not fields or field in fields
+            for column in columns
+        ]
+
+    async def get(self, snapshot_store, export_format, fields=(), reps=()):
+        """
+        Gets the file of an export, building it if this version does not have it yet.
+
+        Args:
+            snapshot_store (SnapshotStore): The snapshot the export is built from.
+            export_format (str): tsv, csv, ndjson or parquet.
+            fields (iterable): The fields to include, or nothing for every field.
+            reps (iterable): The representatives to include, or nothing for all.
+
+        Returns:
+            tuple: The path of the export file and True if it was built for this request.
+
+        Raises:
+            ExportError: If the format, a field or a representative is not available.
+        """
+        if export_format == "parquet" and pyarrow is None:
+            raise ExportError("Parquet exports need pyarrow installed")
+
+        if export_format not in EXPORT_FORMATS:
+            raise ExportError(f"Unknown format: {export_format}")
+
+        columns = self.get_columns(fields)
+        reps = set(reps)
+        unknown = reps - set(snapshot_store.results)
+
+        if unknown:
+            raise ExportError(f"Unknown representatives: {', '.join(sorted(unknown))}")
+
+        version = snapshot_store.version
+        key = hashlib.sha1(
+            dumps([export_format, columns, sorted(reps)]).encode("utf-8")
+        ).hexdigest()[:16]
+        path = os.path.join(
+            self.directory, f"{version}-{key}.{EXPORT_FORMATS[export_format][1]}"
+        )
+
+        if path in self.building:
+            self.hits += 1
+            await asyncio.shield(self.building[path])
+            return path, False
+
+        # A served export counts as new, for the grace period and max_files
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        else:
+            self.hits += 1
+            return path, False
+
+        # The snapshot is updated in place, so the values of this version are taken
+        # now. Only references are copied, the strings themselves are shared.
+        rows = [
+            (rep_name, tuple(rep_obj.get(column) for column in columns))
+            for rep_name, rep_obj in snapshot_store.results.items()
+            if not reps or rep_name in reps
+        ]
+
+        # The build goes on if the client leaves, the next request can use it
+        build = asyncio.create_task(
+            asyncio.to_thread(self.build, path, version, rows, columns, export_format)
+        )
+        self.building[path] = build
+        build.add_done_callback(lambda _: self.building.pop(path, None))
+
+        await asyncio.shield(build)
+
+        self.built += 1
+        return path, True
+
+    def build(self, path, version, rows, columns, export_format):
+        """
+        Writes an export to its file with an atomic write. Runs in a thread.
+
+        Args:
+            path (str): The export file.
+            version (int): The snapshot version the rows are from.
+            rows (list): (name, values) of every representative.
+            columns (list): The columns after the name.
+            export_format (str): tsv, csv, ndjson or parquet.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}-{next(self.counter)}.tmp"
+
+        try:
+            if export_format == "parquet":
+                write_parquet(temp_path, rows, columns, self.chunk_rows)
+            else:
+                with open(temp_path, "w", encoding="utf-8", newline="") as file:
+                    for chunk in iter_text_chunks(
+                        rows, columns, export_format, self.chunk_rows
+                    ):
+                        file.write(chunk)
+
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self.prune(version)
+
+    def prune(self, version):
+        """
+        Deletes the exports of older versions past the grace period and the least
+        recently served of this version over max_files. Exports of newer versions,
+        built by a request that saw a later snapshot, are kept.
+
+        Args:
+            version (int): The snapshot version the export was built from.
+        """
+        current = []
+        expired = time.time() - self.grace
+
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            file_version = name.split("-", 1)[0]
+
+            if name.endswith(".tmp") or not file_version.isdigit():
+                continue
+
+            try:
+                if int(file_version) < version:
+                    if os.path.getmtime(path) < expired:
+                        os.remove(path)
+                elif int(file_version) == version:
+                    current.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                # Deleted by a build of another export in the meantime
+                continue
+
+        current.sort()
+
+        for _, path in current[: max(0, len(current) - self.max_files)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+
+    def get_stats(self):
+        """Returns the exports served from the cache and built."""
+        return {"hits": self.hits, "built": self.built}
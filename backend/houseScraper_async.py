@@ -2,75 +2,183 @@
 Ohio House Representatives Scraper
 
 This script handles scraping the OhioHouse.gov website for information about the representatives.
-The list of rep names are split into batches of 15 that are then run concurrently. A batch is started
-every 60 seconds. Updates are sent to the front end throughout scraping.
+Each representative is streamed through a pipeline of fetch, parse, enrich and emit stages connected
+by bounded queues. Requests are paced by the request scheduler and biographies are handed to a
+separate AI extraction stage with its own quota limits. Updates are sent to the front end throughout
+scraping.
 
 Functions:
     async def fetch_data(session, url): Fetches HTML content for a given URL asynchronously.
+    async def replay_data(url): Serves a page from the capture archive instead of the network.
+    async def parse_page(parser, html, url=None): Runs a page parser in the parse process pool.
+    def get_pipeline_depths(): Gets the jobs waiting in front of each pipeline stage, for /metrics
+    def get_request_depths(): Gets the requests waiting on the request scheduler, for /metrics
+    def report_response_error(rep_name, field, add_to_ui_queue, error_queue, url): Reports a page that
+        could not be fetched and schedules a retry of the field.
+    def report_parse_error(rep_name, field, add_to_ui_queue, error_queue): Reports a field that could
+        not be scraped from its page and schedules a retry of the field.
     async def get_info(session, rep_name, add_to_ui_queue, error_queue): Fetches representative
         information (hometown, address, phone, fax).
+    async def extract_bio(rep_name, combined_bio, add_to_ui_queue, error_queue): Processes a scraped
+        biography using AI.
     async def get_bio(session, rep_name, add_to_ui_queue, error_queue): Fetches representative biography
         details and process using AI.
     async def get_committees(session, rep_name, add_to_ui_queue, error_queue): Fetches representative
         committee memberships.
     async def get_legislation(session, rep_name, add_to_ui_queue, error_queue): Fetches representatives
         primary sponsered legislation
-    async def get_image_url(session, rep_name, add_to_ui_queue, error_queue): Fetches representatives
-        headshot
-    async def process_rep(session, rep_name, fields, add_to_ui_queue, result_queue, error_queue): Processes each
-        representative's data concurrently.
-    async def process_batch(session, batch, fields, add_to_ui_queue, result_queue, error_queue): Process a batch
-        of representatives concurrently.
-    async def create_run_batches(rep_names, fields, batch_size, add_to_ui_queue, result_queue, error_queue, session):
-        Splits the representative list into batches and process each batch sequentially.
-    async def run_scraper(fields, add_to_ui_queue, sendJson, websocket): Main function to run the scraper and
-        send the results to the frontend.
+    async def get_session(): Gets the aiohttp session shared by every run
+    async def close_session(): Closes the shared aiohttp session
+    async def get_directory_index(session): Fetches the member directory once and indexes it by slug
+    async def get_rep_names(): Gets the list of representative slugs without blocking the loop
+    async def get_image_url(session, rep_name, add_to_ui_queue, error_queue, directory): Looks up
+        representatives headshot in the directory index
+    def build_rep_obj(fields, values): Maps field results onto the object sent to the frontend.
+    async def process_unit(session, unit, add_to_ui_queue, rep_results, error_queue, directory):
+        Retries one field of a representative and merges it into their record.
+    async def run_pipeline(rep_names, fields, add_to_ui_queue, rep_results, error_queue, session, directory):
+        Streams every representative through the fetch, parse, enrich and emit stages.
+    async def run_scraper(fields, add_to_ui_queue, sendJson, websocket, stream=False, journal=None,
+        profile=False, reused=None): Main function to run the scraper and send the results to the frontend.
 
 Libraries:
     asyncio: handles async functions
     aiohttp: handles async requests
-    BeautifulSoup: Helps format scraped pages
-    queue: Used for holding messages for frontend
     os, load_dontenv: Used for environment variables
-    re: Used for pattern matching
-    time: Used for delaying requests
+    json: Used to read cache TTLs from the environment
+    time: Used to time the responses written to the capture archive and the metrics
+    traceback: Used to print the errors of fields that could not be scraped
+    partial: Used to bind the directory index to get_image_url
+    ContextVar: Used to give every run its own capture archive and parse executor
+    ProcessPoolExecutor: Used to parse pages off the event loop
 
 Imports:
     utils.py
-        get_representative_list: Used to get complete list of representatives
-        get_ai_prompt: Gets AI prompt to be used in getBio
-        create_formatted_json_msg: Used to format json messages
+        build_directory_index: Used to index the member directory by representative
+        get_ai_prompt_version: Gets the version the AI cache entries are tied to
         checkURLResponse: Used to check the response_code for error handling
-        create_json_list: Used to change python dictionary into json list
+    serialization.py
+        create_formatted_json_msg: Used to format json messages
+        create_msg: Used to format the error and update messages of a run
+    request_scheduler.py
+        RequestScheduler: Used to space out requests to ohiohouse.gov
+    rate_controller.py
+        AdaptiveRateController: Used to adapt the request rate to 429s and Retry-After
+    response_cache.py
+        ResponseCache: Used to cache pages and revalidate them with conditional GETs
+    ai_cache.py
+        AIResultCache: Used to skip AI calls for biographies that have not changed
+    ai_extraction.py
+        BatchedBioExtractor: Used to extract several biographies per AI request
+    parsers.py
+        parse_info, parse_bio, parse_committees, parse_legislation: Used to pull fields out of pages
+    pipeline.py
+        Pipeline, Stage: Used to stream representatives through the scraping stages
+    result_stream.py
+        ResultStream: Used to send each representative's record as soon as it is finished
+    retry_scheduler.py
+        RetryScheduler: Used to retry failed fields with backoff, per error class
+        classify_status: Used to get the error class of a failed response
+    rep_results.py
+        RepResults: Used to track and merge the result of every representative and field
+    capture_archive.py
+        CaptureWriter: Used to write every response of a run to a compressed archive
+        CaptureReplay: Used to serve fetch_data from a recorded archive
+        get_latest_capture: Used to replay the most recent archive by default
+    metrics.py
+        registry: Used to create the instruments served by /metrics
+    run_profiler.py
+        RunProfiler: Used to profile the CPU time and allocations of a run
 
 Global Variables:
-    last_request_time: time the last request was sent
-    REQUEST_DELAY: delay between requests
-    request_lock: asyncio lock used for delaying requests
+    SITE_URL: site the pages are fetched from (env SITE_URL)
+    DIRECTORY_URL: the member directory page
+    FIELD_URLS: page fetched for each field
+    FIELD_PARSERS: parser for each field's page
+    RESPONSE_ERRORS: values used when a field's page could not be fetched
+    BIO_NOT_FOUND: values used when a representative has no biography
+    FIELD_COLUMNS: output columns filled in by each field
+    PARSE_ERRORS: values used when a field could not be scraped from its page
+    PARSE_WORKERS: worker processes used for parsing, 0 parses on the loop (env PARSE_WORKERS)
+    parse_pool: process pool the page parsers run in
+    PIPELINE_WORKERS: number of workers in each pipeline stage
+    PIPELINE_QUEUE_SIZE: most jobs waiting in front of each pipeline stage
+    AI_MODEL: the Gemini model used for biographies
+    AI_BATCH_SIZE: most biographies sent in one AI request (env AI_BATCH_SIZE)
+    AI_BATCH_WAIT: seconds a batch waits to fill before it is sent (env AI_BATCH_WAIT)
+    AI_REQUESTS_PER_MINUTE: most AI requests started per minute (env AI_REQUESTS_PER_MINUTE)
+    AI_MAX_IN_FLIGHT: most AI requests running at once (env AI_MAX_IN_FLIGHT)
+    bio_extractor: queue fed biography extraction stage used by get_bio
+    REQUEST_RATE: requests per second allowed per host (env REQUEST_RATE)
+    REQUEST_BURST: requests a host may receive back to back (env REQUEST_BURST)
+    request_scheduler: token bucket scheduler deciding when requests start
+    RATE_STATE_FILE: file the learned request rates are saved to (env RATE_STATE_FILE)
+    REQUEST_RATE_MAX: highest rate the rate controller raises a host to, REQUEST_RATE by default (env REQUEST_RATE_MAX)
+    rate_controller: AIMD controller adjusting request_scheduler's rates
+    RESPONSE_CACHE_DIR: folder the cached pages are kept in (env RESPONSE_CACHE_DIR)
+    RESPONSE_CACHE_MODE: normal, offline or off (env RESPONSE_CACHE_MODE)
+    RESPONSE_CACHE_TTLS: json list of [pattern, seconds] overriding the TTLs (env RESPONSE_CACHE_TTLS)
+    RESPONSE_CACHE_MAX_FILES: most pages kept on disk (env RESPONSE_CACHE_MAX_FILES)
+    RESPONSE_CACHE_MAX_AGE: seconds a page is kept on disk after it was last fetched (env RESPONSE_CACHE_MAX_AGE)
+    response_cache: two tier cache used by fetch_data
+    AI_CACHE_FILE: file the parsed AI results are kept in (env AI_CACHE_FILE)
+    ai_cache: persistent cache of parsed AI results used by get_bio
+    http_session: aiohttp session shared by every run, created by get_session
+    REQUEST_TIMEOUT: seconds a page request may take (env REQUEST_TIMEOUT)
+    fetch_errors: error class of each failed fetch, used to pick its retry policy
+    CAPTURE_MODE: off, record or replay (env CAPTURE_MODE)
+    CAPTURE_DIR: folder the capture archives are written to (env CAPTURE_DIR)
+    CAPTURE_FILE: archive replayed, the latest in CAPTURE_DIR by default (env CAPTURE_FILE)
+    CAPTURE_TIMING: whether replay waits as long as each response took (env CAPTURE_TIMING)
+    capture_writer: archive of the current run, set by run_scraper for the tasks of each run
+    capture_replay: archive fetch_data is served from in replay mode
+    RETRY_BUDGET: most retries in one run (env RETRY_BUDGET)
+    RETRY_CONCURRENCY: most retries running at once (env RETRY_CONCURRENCY)
+    PROFILE_DIR: folder the profiles of profiled runs are saved in (env PROFILE_DIR)
+    PROFILE_TOP: functions and allocation sites listed in a profile report (env PROFILE_TOP)
+    active_profiler: profiler of the run being profiled, only one run is profiled at a time
+    parse_executor: process pool the current run parses in, None to parse on the loop, set by run_scraper
+    active_pipelines: pipelines of the runs in progress, read by the queue depth gauge
+    requests_counter, cache_counter, errors_counter, retries_counter, runs_counter: counters
+        served by /metrics
+    fetch_histogram, request_wait_histogram, parse_histogram, run_histogram: latency
+        histograms served by /metrics
+    in_flight_gauge, last_run_units_gauge, last_run_retries_gauge,
+        last_run_first_result_gauge: gauges served by /metrics
 
 
 Author: Kent Howell [khowellmobile@gmail.com]
 Created Date: 2/18/2025
-Last Update: 3/13/2025
+Last Update: 10/18/2026
 """
 
 import asyncio
 import aiohttp  # type: ignore
-from bs4 import BeautifulSoup  # type: ignore
 from google import genai
-import queue
 import os
-import re
-from dotenv import load_dotenv  # type: ignore
+import json
 import time
-
-from utils import (
-    get_representative_list,
-    get_ai_prompt,
-    create_formatted_json_msg,
-    checkURLResponse,
-    create_json_list,
-)
+import traceback
+from dotenv import load_dotenv  # type: ignore
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from contextvars import ContextVar
+
+from utils import build_directory_index, get_ai_prompt_version, checkURLResponse
+from serialization import create_formatted_json_msg, create_msg
+from request_scheduler import RequestScheduler
+from rate_controller import AdaptiveRateController
+from response_cache import ResponseCache
+from ai_cache import AIResultCache
+from ai_extraction import BatchedBioExtractor
+from parsers import parse_info, parse_bio, parse_committees, parse_legislation
+from pipeline import Pipeline, Stage
+from result_stream import ResultStream
+from rep_results import RepResults
+from retry_scheduler import RetryScheduler, classify_status
+from capture_archive import CaptureWriter, CaptureReplay, get_latest_capture
+from metrics import registry
+from run_profiler import RunProfiler
 
 # Getting ai client
 load_dotenv()
@@ -79,10 +187,288 @@ api_key = os.getenv("API_KEY")
 API_KEY = api_key
 client = genai.Client(api_key=API_KEY)
 
-# Global Time variables to handle request delays
-last_request_time = 0
-REQUEST_DELAY = 0.85
-request_lock = asyncio.Lock()
+# Batched biography extraction stage with its own AI request limits
+AI_MODEL = "gemini-1.5-flash"
+AI_BATCH_SIZE = int(os.getenv("AI_BATCH_SIZE", 8))
+AI_BATCH_WAIT = float(os.getenv("AI_BATCH_WAIT", 2.0))
+AI_REQUESTS_PER_MINUTE = float(os.getenv("AI_REQUESTS_PER_MINUTE", 15))
+AI_MAX_IN_FLIGHT = int(os.getenv("AI_MAX_IN_FLIGHT", 4))
+bio_extractor = BatchedBioExtractor(
+    client,
+    AI_MODEL,
+    AI_BATCH_SIZE,
+    AI_BATCH_WAIT,
+    AI_REQUESTS_PER_MINUTE,
+    AI_MAX_IN_FLIGHT,
+)
+
+# Request scheduler used to space out requests to each host
+REQUEST_RATE = float(os.getenv("REQUEST_RATE", 1 / 0.85))
+REQUEST_BURST = int(os.getenv("REQUEST_BURST", 1))
+request_scheduler = RequestScheduler(REQUEST_RATE, REQUEST_BURST)
+
+# Adapts the scheduler's rate to 429s and keeps the learned rate between runs
+RATE_STATE_FILE = os.getenv(
+    "RATE_STATE_FILE", os.path.join(os.path.dirname(__file__), "rate_state.json")
+)
+REQUEST_RATE_MAX = float(os.getenv("REQUEST_RATE_MAX", REQUEST_RATE))
+rate_controller = AdaptiveRateController(
+    request_scheduler, RATE_STATE_FILE, max_rate=REQUEST_RATE_MAX
+)
+
+
+# Two tier response cache with conditional GET revalidation
+RESPONSE_CACHE_DIR = os.getenv(
+    "RESPONSE_CACHE_DIR", os.path.join(os.path.dirname(__file__), "cache", "responses")
+)
+RESPONSE_CACHE_MODE = os.getenv("RESPONSE_CACHE_MODE", "normal")
+RESPONSE_CACHE_TTLS = (
+    json.loads(os.getenv("RESPONSE_CACHE_TTLS"))
+    if os.getenv("RESPONSE_CACHE_TTLS")
+    else None
+)
+RESPONSE_CACHE_MAX_FILES = int(os.getenv("RESPONSE_CACHE_MAX_FILES", 5000))
+RESPONSE_CACHE_MAX_AGE = float(os.getenv("RESPONSE_CACHE_MAX_AGE", 30 * 24 * 60 * 60))
+response_cache = ResponseCache(
+    RESPONSE_CACHE_DIR,
+    RESPONSE_CACHE_TTLS,
+    RESPONSE_CACHE_MODE,
+    disk_files=RESPONSE_CACHE_MAX_FILES,
+    disk_max_age=RESPONSE_CACHE_MAX_AGE,
+)
+
+# Parsed AI results keyed by biography hash and prompt version
+AI_CACHE_FILE = os.getenv(
+    "AI_CACHE_FILE", os.path.join(os.path.dirname(__file__), "cache", "ai_results.json")
+)
+ai_cache = AIResultCache(AI_CACHE_FILE, get_ai_prompt_version())
+
+
+# Site the pages are fetched from, pointed at a local server by the benchmarks
+SITE_URL = os.getenv("SITE_URL", "https://ohiohouse.gov").rstrip("/")
+DIRECTORY_URL = f"{SITE_URL}/members/directory?start=1&sort=LastName"
+
+# Pages fetched for each field. image_url comes from the directory index instead
+FIELD_URLS = {
+    "info": SITE_URL + "/members/{rep_name}",
+    "bio": SITE_URL + "/members/{rep_name}/biography",
+    "committees": SITE_URL + "/members/{rep_name}/committees",
+    "legislation": SITE_URL + "/members/{rep_name}/legislation",
+}
+
+# Parser for each field's page (bio is parsed and then sent to the AI)
+FIELD_PARSERS = {
+    "info": parse_info,
+    "bio": parse_bio,
+    "committees": parse_committees,
+    "legislation": parse_legislation,
+}
+
+# Values used when a field's page could not be fetched
+RESPONSE_ERRORS = {
+    "info": ("Response Error", "Response Error", "Response Error", "Response Error"),
+    "bio": ("Response Error", "Response Error", "Response Error", "Response Error"),
+    "committees": "Response Error",
+    "legislation": "Response Error",
+}
+BIO_NOT_FOUND = ("Bio Not Found", "Bio Not Found", "Bio Not Found", "Bio Not Found")
+
+# Output columns filled in by each field
+FIELD_COLUMNS = {
+    "info": ("hometown", "address", "phone", "fax"),
+    "bio": ("education", "politics", "employment", "community"),
+    "committees": ("committees",),
+    "legislation": ("legislation",),
+    "image_url": ("image_formula", "image_url"),
+}
+
+# Values used when a field could not be scraped from its page
+PARSE_ERRORS = {
+    field: ("Parse Error",) * len(columns) if len(columns) > 1 else "Parse Error"
+    for field, columns in FIELD_COLUMNS.items()
+}
+
+# Worker processes used to parse pages off the event loop (0 parses on the loop)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", min(2, os.cpu_count() or 1)))
+parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS) if PARSE_WORKERS else None
+
+# Workers per pipeline stage and the size of the queue in front of each stage
+PIPELINE_WORKERS = {"fetch": 8, "parse": max(1, PARSE_WORKERS), "enrich": 32, "emit": 1}
+PIPELINE_QUEUE_SIZE = 16
+
+
+# Shared aiohttp session, created on first use so it belongs to the running loop
+http_session = None
+
+
+async def get_session():
+    """
+    Gets the aiohttp session shared by every run and the server's commands.
+
+    Reusing one session keeps its connections to ohiohouse.gov open between runs.
+
+    Args:
+        None
+
+    Returns:
+        aiohttp.ClientSession: The shared session.
+    """
+    global http_session
+
+    if http_session is None or http_session.closed:
+        http_session = aiohttp.ClientSession()
+
+    return http_session
+
+
+async def close_session():
+    """
+    Closes the shared aiohttp session.
+    """
+    global http_session
+
+    if http_session is not None and not http_session.closed:
+        await http_session.close()
+
+    http_session = None
+
+
+# Per request timeout and the error class of each failed fetch, read by report_response_error
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", 30))
+request_timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+fetch_errors = {}
+
+# Record and replay of the responses a run receives
+CAPTURE_MODE = os.getenv("CAPTURE_MODE", "off")
+CAPTURE_DIR = os.getenv(
+    "CAPTURE_DIR", os.path.join(os.path.dirname(__file__), "cache", "captures")
+)
+CAPTURE_FILE = os.getenv("CAPTURE_FILE") or (
+    get_latest_capture(CAPTURE_DIR) if CAPTURE_MODE == "replay" else None
+)
+CAPTURE_TIMING = os.getenv("CAPTURE_TIMING", "0") == "1"
+
+if CAPTURE_MODE == "replay" and not CAPTURE_FILE:
+    raise RuntimeError(
+        f"CAPTURE_MODE is replay but there is no capture in {CAPTURE_DIR}"
+    )
+
+capture_writer = ContextVar("capture_writer", default=None)
+capture_replay = (
+    CaptureReplay(CAPTURE_FILE, CAPTURE_TIMING) if CAPTURE_MODE == "replay" else None
+)
+
+# Retries of failed representatives
+RETRY_BUDGET = int(os.getenv("RETRY_BUDGET", 75))
+RETRY_CONCURRENCY = int(os.getenv("RETRY_CONCURRENCY", 8))
+
+# Profiling of single runs, asked for by an admin
+PROFILE_DIR = os.getenv(
+    "PROFILE_DIR", os.path.join(os.path.dirname(__file__), "cache", "profiles")
+)
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", 25))
+active_profiler = None
+parse_executor = ContextVar("parse_executor", default=parse_pool)
+
+# Pipelines of the runs in progress, read by the queue depth gauge
+active_pipelines = set()
+
+
+def get_pipeline_depths():
+    """
+    Gets the number of jobs waiting in front of each pipeline stage, over every run.
+
+    Returns:
+        dict: Maps each (stage,) label tuple to its queue depth.
+    """
+    depths = {}
+
+    for pipeline in active_pipelines:
+        for stage, stats in pipeline.get_stats().items():
+            depths[(stage,)] = depths.get((stage,), 0) + stats["queue_depth"]
+
+    return depths
+
+
+def get_request_depths():
+    """
+    Gets the number of requests waiting on the request scheduler, per host.
+
+    Returns:
+        dict: Maps each (host,) label tuple to its waiting requests.
+    """
+    return {
+        (host,): stats["queue_depth"]
+        for host, stats in request_scheduler.get_stats().items()
+    }
+
+
+# Instruments served by the websocket server's /metrics endpoint
+requests_counter = registry.counter(
+    "scraper_requests_total",
+    "Page requests by response status, or error class without a response",
+    ("status",),
+)
+cache_counter = registry.counter(
+    "scraper_cache_lookups_total",
+    "Response and AI cache lookups by result",
+    ("cache", "result"),
+)
+errors_counter = registry.counter(
+    "scraper_errors_total", "Failed fields by error class", ("error_class",)
+)
+retries_counter = registry.counter(
+    "scraper_retries_total", "Retried fields by field", ("field",)
+)
+runs_counter = registry.counter(
+    "scraper_runs_total", "Finished runs by outcome", ("outcome",)
+)
+fetch_histogram = registry.histogram(
+    "scraper_fetch_seconds", "Seconds from sending a request to reading its body"
+)
+request_wait_histogram = registry.histogram(
+    "scraper_request_wait_seconds", "Seconds requests waited on the request scheduler"
+)
+parse_histogram = registry.histogram(
+    "scraper_parse_seconds", "Seconds spent parsing a page, by parser", ("parser",)
+)
+run_histogram = registry.histogram(
+    "scraper_run_seconds",
+    "Seconds a run took",
+    buckets=(30, 60, 120, 300, 600, 1200, 1800, 3600),
+)
+in_flight_gauge = registry.gauge(
+    "scraper_requests_in_flight", "Requests sent and not answered yet"
+)
+registry.gauge(
+    "scraper_pipeline_queue_depth",
+    "Jobs waiting in front of each pipeline stage",
+    ("stage",),
+    get_pipeline_depths,
+)
+registry.gauge(
+    "scraper_request_queue_depth",
+    "Requests waiting on the request scheduler, per host",
+    ("host",),
+    get_request_depths,
+)
+registry.gauge(
+    "scraper_ai_queue_depth",
+    "Biographies waiting for the AI extraction stage",
+    function=lambda: bio_extractor.queued,
+)
+last_run_units_gauge = registry.gauge(
+    "scraper_last_run_units",
+    "Fields of the last finished run by result",
+    ("status",),
+)
+last_run_retries_gauge = registry.gauge(
+    "scraper_last_run_retries", "Retries of the last finished run"
+)
+last_run_first_result_gauge = registry.gauge(
+    "scraper_last_run_first_result_seconds",
+    "Seconds until the last streamed run sent its first result",
+)
 
 
 # Asynchronous fetch for getting html content
@@ -93,7 +479,20 @@ async def fetch_data(session, url):
     Sends a GET request to the URL, checks the response status, and returns
     the HTML content if successful. Returns None if the response is not valid.
 
-    Uses a Asyncio lock to make sure requests are spaced 0.85s apart
+    Pages still fresh in the response cache are returned without a request. Stale
+    pages are revalidated with a conditional GET so an unchanged page costs a 304.
+    In offline mode only cached pages are returned.
+
+    In capture record mode the cache is not read, so every page is requested, and
+    every response is written to the run's capture archive. In replay mode the
+    responses come from the archive and nothing is sent.
+
+    Uses the request scheduler to decide when the request may start. The body is
+    downloaded outside of the scheduler so other requests are not held up by it.
+    Every response status is reported to the rate controller so the request rate
+    follows what the site currently allows. The error class of a failed request
+    (see classify_status, timeouts and connection errors) is recorded in fetch_errors
+    so its retry follows the right policy.
 
     Args:
         session (aiohttp.ClientSession): The aiohttp session used for sending requests.
@@ -102,27 +501,202 @@ async def fetch_data(session, url):
     Returns:
         str: The HTML content of the page or None if the request fails.
     """
+    if capture_replay is not None:
+        return await replay_data(url)
+
+    capture = capture_writer.get()
+    entry = None if capture else await response_cache.get(url)
+
+    if entry and (response_cache.offline or response_cache.is_fresh(entry)):
+        response_cache.hits += 1
+        cache_counter.inc(cache="response", result="hit")
+        return entry.body
+
+    if response_cache.offline:
+        response_cache.misses += 1
+        cache_counter.inc(cache="response", result="miss")
+        print(f"Error: {url} is not cached and the cache is in offline mode")
+        return None
+
+    request_wait_histogram.observe(await request_scheduler.acquire(url))
+
+    headers = response_cache.get_conditional_headers(entry)
+    started = time.monotonic()
+    error_class = None
+    in_flight_gauge.inc()
+
+    try:
+        async with session.get(url, headers=headers, timeout=request_timeout) as response:
+            rate_controller.record(
+                url, response.status, response.headers.get("Retry-After")
+            )
+            requests_counter.inc(status=response.status)
 
-    global last_request_time
+            if response.status == 304 and entry:
+                response_cache.revalidated += 1
+                cache_counter.inc(cache="response", result="revalidated")
+                await response_cache.refresh(entry)
+                return entry.body
 
-    async with request_lock:
-        current_time = time.time()
-        elapsed_time = current_time - last_request_time
+            if await checkURLResponse(response) != 0:
+                print(f"Error: Received a non-200 status code {response.status} for {url}")
+                fetch_errors[url] = classify_status(response.status)
 
-        if elapsed_time < REQUEST_DELAY:
-            await asyncio.sleep(REQUEST_DELAY - elapsed_time)
+                if capture:
+                    await capture.record(
+                        url, response.status, response.headers, None, started
+                    )
+                return None
 
-        async with session.get(url) as response:
-            last_request_time = time.time()
+            body = await response.text()
+    except asyncio.TimeoutError:
+        print(f"Error: Request timed out for {url}")
+        error_class = "timeout"
+    except aiohttp.ClientError as e:
+        print(f"Error: Request failed for {url}: {e}")
+        error_class = "connection"
+    finally:
+        in_flight_gauge.dec()
+        fetch_histogram.observe(time.monotonic() - started)
+
+    if error_class:
+        fetch_errors[url] = error_class
+        requests_counter.inc(status=error_class)
+
+        if capture:
+            await capture.record(url, 0, {}, None, started, error_class)
+        return None
+
+    if capture:
+        await capture.record(
+            url, response.status, response.headers, body, started
+        )
 
-            if await checkURLResponse(response) != 0:
-                print(
-                    f"Error: Received a non-200 status code {response.status} for {url}"
-                )
-                return None
+    response_cache.misses += 1
+    cache_counter.inc(cache="response", result="miss")
+    await response_cache.store(
+        url,
+        body,
+        response.headers.get("ETag"),
+        response.headers.get("Last-Modified"),
+    )
+
+    return body
+
+
+# Serve a page from the capture archive
+async def replay_data(url):
+    """
+    Serve a page from the capture archive instead of the network.
+
+    Failed responses are replayed too, so a replayed run retries the same pages the
+    recorded run did.
+
+    Args:
+        url (str): The URL to fetch data from.
+
+    Returns:
+        str: The recorded HTML content of the page or None if the recorded request
+            failed or the url was not recorded.
+    """
+    entry = await capture_replay.get(url)
+
+    if entry is None:
+        print(f"Error: {url} is not in the capture {capture_replay.path}")
+        fetch_errors[url] = "response"
+        return None
+
+    if entry["status"] != 200:
+        fetch_errors[url] = entry["error"] or classify_status(entry["status"])
+        return None
+
+    return entry["body"]
+
+
+# Parse a page in the parse pool
+async def parse_page(parser, html, url=None):
+    """
+    Run one of the page parsers in the parse process pool.
+
+    Parsing builds a BeautifulSoup tree, which is CPU bound and holds the GIL, so
+    it is done in a worker process to keep the event loop free for requests and
+    progress messages. The profiled run parses its pages on the loop so the
+    profiler sees the time spent in BeautifulSoup, other runs keep using the pool.
+
+    A page served from the response cache or revalidated with a 304 is not parsed
+    again if its value was kept for the same validators.
+
+    Args:
+        parser (function): One of the pure parse functions from parsers.py.
+        html (str): The html content of the page.
+        url (str): The url of the page, used to find its kept value.
+
+    Returns:
+        The value returned by the parser.
+    """
+    parsed_key = response_cache.get_parsed_key(url, html, parser.__name__)
+    found, value = response_cache.get_parsed(parsed_key)
+
+    if found:
+        cache_counter.inc(cache="parsed", result="hit")
+        return value
+
+    started = time.monotonic()
+
+    executor = parse_executor.get()
+
+    if executor is None:
+        value = parser(html)
+    else:
+        value = await asyncio.get_running_loop().run_in_executor(
+            executor, parser, html
+        )
+
+    parse_histogram.observe(time.monotonic() - started, parser=parser.__name__)
+    response_cache.put_parsed(parsed_key, value)
+
+    return value
+
+
+# Report a page that could not be fetched
+def report_response_error(rep_name, field, add_to_ui_queue, error_queue, url):
+    """
+    Sends a response error to the frontend and schedules a retry of the field.
+
+    The retry follows the policy of the error fetch_data recorded for the url.
+
+    Args:
+        rep_name (str): The name of the representative whose page failed.
+        field (str): The field whose page failed.
+        add_to_ui_queue (function): A function to send updates to the frontend.
+        error_queue (RetryScheduler): Schedules retries of the fields with errors.
+        url (str): The url of the page that failed.
+    """
+    error_class = fetch_errors.pop(url, "response")
+    errors_counter.inc(error_class=error_class)
+
+    add_to_ui_queue(create_formatted_json_msg("res_error", rep_name))
+    error_queue.put((rep_name, field), error_class)
+
+
+def report_parse_error(rep_name, field, add_to_ui_queue, error_queue):
+    """
+    Sends a parse error to the frontend and schedules a retry of the field.
 
-            # Return the response text
-            return await response.text()
+    Used when scraping a field raised, such as a page missing an element the parser
+    expects, so the representative is still recorded and the field is retried.
+
+    Args:
+        rep_name (str): The name of the representative whose field failed.
+        field (str): The field that failed.
+        add_to_ui_queue (function): A function to send updates to the frontend.
+        error_queue (RetryScheduler): Schedules retries of the fields with errors.
+    """
+    traceback.print_exc()
+    errors_counter.inc(error_class="parse")
+
+    add_to_ui_queue(create_formatted_json_msg("parse_error", rep_name))
+    error_queue.put((rep_name, field), "parse")
 
 
 # Fetch representative information
@@ -137,40 +711,64 @@ async def get_info(session, rep_name, add_to_ui_queue, error_queue):
         session (aiohttp.ClientSession): The aiohttp session used for sending requests.
         rep_name (str): The name of the representative whose details are being fetched.
         add_to_ui_queue (function): A callback function to send updates to the frontend.
-        error_queue (queue.Queue): A queue to store names of representatives with errors.
+        error_queue (RetryScheduler): Schedules retries of the fields with errors.
 
     Returns:
         tuple: Hometown, address, phone number, and fax number of the representative.
     """
-    address_keywords = ["77", "High", "Street", "St.", "South", "S.", "Floor"]
-    url = f"https://ohiohouse.gov/members/{rep_name}"
+    url = FIELD_URLS["info"].format(rep_name=rep_name)
     response = await fetch_data(session, url)
 
     if not response:
-        add_to_ui_queue(create_formatted_json_msg("res_error", rep_name))
-        error_queue.put(rep_name)
-        return "Response Error", "Response Error", "Response Error", "Response Error"
+        report_response_error(rep_name, "info", add_to_ui_queue, error_queue, url)
+        return RESPONSE_ERRORS["info"]
 
-    soup = BeautifulSoup(response, "html.parser")
+    return await parse_page(parse_info, response, url)
 
-    divs = soup.find_all("div", class_="member-info-bar-module")
 
-    home_town = address = phone_number = fax_number = "Not Listed"
+# Run the AI on a scraped biography
+async def extract_bio(rep_name, combined_bio, add_to_ui_queue, error_queue):
+    """
+    Process a representative's biography using AI.
 
-    for module in divs:
-        module_text = module.get_text()
-        if "Hometown" in module_text:
-            home_town = module.find("div", class_="member-info-bar-value").text.strip()
+    Biographies that were already processed with the current prompt are served
+    from the AI cache. The rest are queued on the AI extraction stage, which sends
+    several representatives per request at its own quota limited pace.
 
-        if any(keyword in module_text for keyword in address_keywords):
-            address_number_module = module.find_all(
-                "div", class_="member-info-bar-value"
-            )
-            address = address_number_module[0].text.strip()
-            phone_number = address_number_module[1].text.strip().replace("Phone: ", "")
-            fax_number = address_number_module[2].text.strip().replace("Fax: ", "")
+    Args:
+        rep_name (str): The name of the representative whose biography is processed.
+        combined_bio (str): The biography text scraped from the page.
+        add_to_ui_queue (function): A function to send updates to the frontend.
+        error_queue (RetryScheduler): Schedules retries of the fields with errors.
+
+    Returns:
+        tuple: Biography-related details (education, politics, employment, community).
+    """
+    cached_values = ai_cache.get(combined_bio)
+    if cached_values:
+        cache_counter.inc(cache="ai", result="hit")
+        return cached_values
+
+    cache_counter.inc(cache="ai", result="miss")
+
+    try:
+        values = await bio_extractor.extract(rep_name, combined_bio)
+    except Exception as e:
+        print(f"Gemini Response Error: {e}")
+        errors_counter.inc(error_class="ai_error")
+        add_to_ui_queue(create_formatted_json_msg("ai_error", rep_name))
+        error_queue.put((rep_name, "bio"), "ai_error")
+        return "AI Error", "AI Error", "AI Error", "AI Error"
+
+    if not values:
+        errors_counter.inc(error_class="ai_format")
+        add_to_ui_queue(create_formatted_json_msg("ai_error", rep_name))
+        error_queue.put((rep_name, "bio"), "ai_format")
+        return "AI Error", "AI Error", "AI Error", "AI Error"
+
+    ai_cache.put(combined_bio, values)
 
-    return home_town, address, phone_number, fax_number
+    return values[0], values[1], values[2], values[3]
 
 
 # Fetch bio details
@@ -185,53 +783,24 @@ async def get_bio(session, rep_name, add_to_ui_queue, error_queue):
         session (aiohttp.ClientSession): The aiohttp session used for sending requests.
         rep_name (str): The name of the representative whose biography is being fetched.
         add_to_ui_queue (function): A function to send updates to the frontend.
-        error_queue (queue.Queue): A queue to store names of representatives with errors.
+        error_queue (RetryScheduler): Schedules retries of the fields with errors.
 
     Returns:
         tuple: Biography-related details (education, politics, employment, community).
     """
-    url = f"https://ohiohouse.gov/members/{rep_name}/biography"
+    url = FIELD_URLS["bio"].format(rep_name=rep_name)
     response = await fetch_data(session, url)
 
     if not response:
-        add_to_ui_queue(create_formatted_json_msg("res_error", rep_name))
-        error_queue.put(rep_name)
-        return "Response Error", "Response Error", "Response Error", "Response Error"
+        report_response_error(rep_name, "bio", add_to_ui_queue, error_queue, url)
+        return RESPONSE_ERRORS["bio"]
 
-    soup = BeautifulSoup(response, "html.parser")
+    combined_bio = await parse_page(parse_bio, response, url)
 
-    bio_block = soup.find("div", class_="gray-block")
+    if not combined_bio:
+        return BIO_NOT_FOUND
 
-    if bio_block:
-        bio_paragraphs = bio_block.find_all("p")
-
-        if bio_paragraphs:
-            combined_bio = " ".join(
-                paragraph.text.strip() for paragraph in bio_paragraphs
-            )
-
-            try:
-                response = await asyncio.to_thread(
-                    client.models.generate_content,
-                    model="gemini-1.5-flash",
-                    contents=get_ai_prompt(combined_bio),
-                )
-            except Exception as e:
-                print(f"Gemini Response Error: {e}")
-                add_to_ui_queue(create_formatted_json_msg("ai_error", rep_name))
-                error_queue.put(rep_name)
-                return "AI Error", "AI Error", "AI Error", "AI Error"
-
-            values = response.text.split("|")
-
-            if len(values) < 4:
-                add_to_ui_queue(create_formatted_json_msg("ai_error", rep_name))
-                error_queue.put(rep_name)
-                return "AI Error", "AI Error", "AI Error", "AI Error"
-
-            return values[0], values[1], values[2], values[3]
-
-    return "Bio Not Found", "Bio Not Found", "Bio Not Found", "Bio Not Found"
+    return await extract_bio(rep_name, combined_bio, add_to_ui_queue, error_queue)
 
 
 # Fetch committees information
@@ -245,26 +814,19 @@ async def get_committees(session, rep_name, add_to_ui_queue, error_queue):
         session (aiohttp.ClientSession): The aiohttp session used for sending requests.
         rep_name (str): The name of the representative whose committee info is being fetched.
         add_to_ui_queue (function): A function to send updates to the frontend.
-        error_queue (queue.Queue): A queue to store names of representatives with errors.
+        error_queue (RetryScheduler): Schedules retries of the fields with errors.
 
     Returns:
         str: A comma-separated list of committees the representative is a member of.
     """
-    url = f"https://ohiohouse.gov/members/{rep_name}/committees"
+    url = FIELD_URLS["committees"].format(rep_name=rep_name)
     response = await fetch_data(session, url)
 
     if not response:
-        add_to_ui_queue(create_formatted_json_msg("res_error", rep_name))
-        error_queue.put(rep_name)
-        return "Response Error"
+        report_response_error(rep_name, "committees", add_to_ui_queue, error_queue, url)
+        return RESPONSE_ERRORS["committees"]
 
-    soup = BeautifulSoup(response, "html.parser")
-
-    media_captions = soup.find_all("div", class_="media-overlay-caption")
-
-    committees = ", ".join(caption.text.strip() for caption in media_captions)
-
-    return committees
+    return await parse_page(parse_committees, response, url)
 
 
 # Fetch primary legislation
@@ -278,308 +840,549 @@ async def get_legislation(session, rep_name, add_to_ui_queue, error_queue):
         session (aiohttp.ClientSession): The aiohttp session used for sending requests.
         rep_name (str): The name of the representative whose legislation info is being fetched.
         add_to_ui_queue (function): A function to send updates to the frontend.
-        error_queue (queue.Queue): A queue to store names of representatives with errors.
+        error_queue (RetryScheduler): Schedules retries of the fields with errors.
 
     Returns:
         str: A list of legislation the representative sponsors in a <newline> delimited list.
     """
-    url = f"https://ohiohouse.gov/members/{rep_name}/legislation"
+    url = FIELD_URLS["legislation"].format(rep_name=rep_name)
     response = await fetch_data(session, url)
 
     if not response:
-        add_to_ui_queue(create_formatted_json_msg("res_error", rep_name))
-        error_queue.put(rep_name)
-        return "Response Error"
-
-    soup = BeautifulSoup(response, "html.parser")
+        report_response_error(
+            rep_name, "legislation", add_to_ui_queue, error_queue, url
+        )
+        return RESPONSE_ERRORS["legislation"]
 
-    legislation_tables = soup.find_all("table", class_="member-legislation-table")
+    return await parse_page(parse_legislation, response, url)
 
-    table = None
 
-    # Finding needed table
-    for val in legislation_tables:
-        caption = val.find("caption")
+# Fetch the member directory index
+async def get_directory_index(session):
+    """
+    Fetch the member directory once and index it by representative slug.
 
-        if caption and "Primary Sponsored Bills" in caption.text:
-            table = val
+    The directory page lists every representative along with their headshot, so it
+    is fetched a single time per run and shared by every representative.
 
-    if not table:
-        return "No Primary Sponsored Bills Found"
+    Args:
+        session (aiohttp.ClientSession): The aiohttp session used for sending requests.
 
-    primary_legislation = []
+    Returns:
+        dict: Maps each slug to its "name", "image_url" and "image_formula".
 
-    for tbody in table.find_all("tbody"):
-        bill_num = tbody.find("a").text
-        bill_title = tbody.find("td", class_="title-cell").text
+    Raises:
+        RuntimeError: If the directory page could not be fetched.
+    """
+    response = await fetch_data(session, DIRECTORY_URL)
 
-        primary_legislation.append(bill_num + " " + bill_title)
+    if not response:
+        raise RuntimeError("Could not fetch the member directory")
 
-    return "<newline>".join(primary_legislation)
+    return build_directory_index(response)
 
 
-# Fetch reps headshot image
-async def get_image_url(session, rep_name, add_to_ui_queue, error_queue):
+async def get_rep_names():
     """
-    Fetch the repsentatives headshot and create an excel formula.
+    Gets the list of representative slugs.
 
-    Scrapes the representative's headshot link and inserts it into a formula.
+    Uses the shared session and the response cache, so the event loop is never
+    blocked and a recent directory page is not fetched again.
 
     Args:
-        session (aiohttp.ClientSession): The aiohttp session used for sending requests.
-        rep_name (str): The name of the representative whose legislation info is being fetched.
-        add_to_ui_queue (function): A function to send updates to the frontend.
-        error_queue (queue.Queue): A queue to store names of representatives with errors.
+        None
 
     Returns:
-        tuple: excel image formula, headshot link.
+        list: A list of cleaned and formatted representative names.
     """
-    url = f"https://ohiohouse.gov/members/directory?start=1&sort=LastName"
-    response = await fetch_data(session, url)
+    directory = await get_directory_index(await get_session())
 
-    if not response:
-        add_to_ui_queue(create_formatted_json_msg("res_error", rep_name))
-        error_queue.put(rep_name)
-        return "Response Error"
+    return list(directory)
 
-    soup = BeautifulSoup(response, "html.parser")
 
-    all_portraits = soup.find_all("div", class_="media-container-portrait")
+# Look up reps headshot image
+async def get_image_url(session, rep_name, add_to_ui_queue, error_queue, directory):
+    """
+    Look up the repsentatives headshot and create an excel formula.
 
-    image_url = "Image not found"
+    Reads the representative's headshot link from the directory index built at the
+    start of the run. No request is sent.
 
-    for div in all_portraits:
-        name = div.find("div", class_="media-overlay-caption-text-line-1").text
-        if (
-            rep_name
-            == name.strip().replace(" ", "-").replace(".", "").replace(",", "").lower()
-        ):
-            image_div = div.find("div", class_="media-thumbnail-image")
-            image_url = re.search(r"url\((.*?)\)", image_div["style"]).group(1)
+    Args:
+        session (aiohttp.ClientSession): The aiohttp session used for sending requests.
+        rep_name (str): The name of the representative whose legislation info is being fetched.
+        add_to_ui_queue (function): A function to send updates to the frontend.
+        error_queue (RetryScheduler): Schedules retries of the fields with errors.
+        directory (dict): The directory index returned by get_directory_index.
 
-    formula_wrapped_url = f'=IMAGE("https://ohiohouse.gov{image_url}")'
+    Returns:
+        tuple: excel image formula, headshot link.
+    """
+    entry = directory.get(rep_name)
 
-    return formula_wrapped_url, f"https://ohiohouse.gov{image_url}"
+    if not entry:
+        image_url = "https://ohiohouse.govImage not found"
+        return f'=IMAGE("{image_url}")', image_url
 
+    return entry["image_formula"], entry["image_url"]
 
-# Process each representative concurrently
-async def process_rep(
-    session, rep_name, fields, add_to_ui_queue, result_queue, error_queue
-):
+
+# Map field results onto a representative object
+def build_rep_obj(fields, values):
     """
-    Process each representative's data concurrently, based on fields provided.
+    Map the results of each field into the object sent to the frontend.
 
     Args:
-        session (aiohttp.ClientSession): The aiohttp session used for sending requests.
-        rep_name (str): The name of the representative to process.
-        fields (list): A list of the fields to scrape (strings corresponding to the functions).
-        add_to_ui_queue (function): A function to send updates to the frontend.
-        result_queue (queue.Queue): A queue to store results of the scraping.
-        error_queue (queue.Queue): A queue to store names of representatives with errors.
+        fields (list): The fields that were scraped, in the order they were requested.
+        values (dict): Maps each field to the value its field function returned.
 
     Returns:
-        None
+        dict: The representative's data keyed by output column.
     """
     rep_obj = {}
 
-    # Create a dictionary of available tasks with corresponding functions
-    task_mapping = {
-        "legislation": get_legislation,
-        "image_url": get_image_url,
-        "info": get_info,
-        "bio": get_bio,
-        "committees": get_committees,
-    }
-
-    # Filter the tasks based on the fields provided in the list
-    tasks_to_run = []
     for field in fields:
-        if field in task_mapping:
-            tasks_to_run.append(
-                task_mapping[field](session, rep_name, add_to_ui_queue, error_queue)
-            )
+        if field not in values:
+            continue
 
-    # Run only the selected tasks concurrently
-    add_to_ui_queue(create_formatted_json_msg("start_rep", rep_name))
-    results = await asyncio.gather(*tasks_to_run)
-    add_to_ui_queue(create_formatted_json_msg("finish_rep", rep_name))
+        value = values[field]
 
-    # Map the results into rep_obj based on the field names
-    result_index = 0
-    for field in fields:
         if field == "legislation":
-            rep_obj["legislation"] = results[result_index]
+            rep_obj["legislation"] = value
         elif field == "image_url":
-            rep_obj["image_formula"], rep_obj["image_url"] = results[result_index]
+            rep_obj["image_formula"], rep_obj["image_url"] = value
         elif field == "info":
             (
                 rep_obj["hometown"],
                 rep_obj["address"],
                 rep_obj["phone"],
                 rep_obj["fax"],
-            ) = results[result_index]
+            ) = value
         elif field == "bio":
             (
                 rep_obj["education"],
                 rep_obj["politics"],
                 rep_obj["employment"],
                 rep_obj["community"],
-            ) = results[result_index]
+            ) = value
         elif field == "committees":
-            rep_obj["committees"] = results[result_index]
-        result_index += 1
+            rep_obj["committees"] = value
 
-    # Put the results into the result_queue
-    result_queue.put({rep_name: rep_obj})
+    return rep_obj
 
 
-# Process a batch of representatives concurrently
-async def process_batch(
-    session, batch, fields, add_to_ui_queue, result_queue, error_queue
+# Retry one field of a representative
+async def process_unit(
+    session, unit, add_to_ui_queue, rep_results, error_queue, directory
 ):
     """
-    Process a batch of representatives concurrently.
+    Scrape one field of a representative again and merge it into their record.
 
-    Processes a list of representatives by calling `process_rep` for each. Each
-    batch is processed in parallel, with a 3-second delay between each representative.
+    Only the field's own page is fetched (and the AI called for a biography), so the
+    fields that already worked are not scraped again. A field that raises again is
+    reported as a parse error and retried until its policy gives up.
 
     Args:
         session (aiohttp.ClientSession): The aiohttp session used for sending requests.
-        batch (list): A list of representative names to process.
-        fields(list): A list of the fields we want to scraper to get.
+        unit (tuple): The name of the representative and the field to scrape.
         add_to_ui_queue (function): A function to send updates to the frontend.
-        result_queue (queue.Queue): A queue to store results of the scraping.
-        error_queue (queue.Queue): A queue to store names of representatives with errors.
+        rep_results (RepResults): The results the field is merged into.
+        error_queue (RetryScheduler): Schedules retries of the fields with errors.
+        directory (dict): The directory index returned by get_directory_index.
 
     Returns:
         None
     """
-    tasks = []
-    for rep_name in batch:
-        task = asyncio.create_task(
-            process_rep(
-                session, rep_name, fields, add_to_ui_queue, result_queue, error_queue
-            )
+    rep_name, field = unit
+
+    # Create a dictionary of available tasks with corresponding functions
+    task_mapping = {
+        "legislation": get_legislation,
+        "image_url": partial(get_image_url, directory=directory),
+        "info": get_info,
+        "bio": get_bio,
+        "committees": get_committees,
+    }
+
+    add_to_ui_queue(create_formatted_json_msg("start_rep", rep_name))
+
+    try:
+        value = await task_mapping[field](
+            session, rep_name, add_to_ui_queue, error_queue
         )
-        tasks.append(task)
+    except Exception:
+        print(f"Error: Could not scrape the {field} of {rep_name}")
+        report_parse_error(rep_name, field, add_to_ui_queue, error_queue)
+        value = PARSE_ERRORS[field]
+
+    add_to_ui_queue(create_formatted_json_msg("finish_rep", rep_name))
 
-    await asyncio.gather(*tasks)
+    rep_results.merge(rep_name, field, value)
 
 
-async def create_run_batches(
-    rep_names, fields, batch_size, add_to_ui_queue, result_queue, error_queue, session
+# Stream every representative through the fetch, parse, enrich and emit stages
+async def run_pipeline(
+    rep_names, fields, add_to_ui_queue, rep_results, error_queue, session, directory
 ):
     """
-    Split the representative list into batches and process each batch sequentially.
+    Scrape every representative through a pipeline of independent stages.
 
-    Divides the list of representatives into smaller batches and processes each
-    batch with a 60-second wait between starting to process each batch.
+    Each representative is a job that moves through four stages connected by
+    bounded queues: fetch (download the pages for the selected fields), parse
+    (pull the fields out of the pages), enrich (headshot lookup and AI for the
+    biography) and emit (record the result in rep_results). Jobs move on as
+    soon as they are done with a stage, so there are no batch barriers and a slow
+    representative does not hold up the rest. A full queue makes the stage in
+    front of it wait, so backpressure reaches the fetch stage.
+
+    A stage that raises for a representative, such as a parser on a malformed page,
+    reports every field it has no value for yet as a parse error, which schedules a
+    retry, and the representative is recorded right away instead of being dropped.
 
     Args:
         rep_names (list): List of representative names to process.
         fields(list): A list of the fields we want to scraper to get.
-        batch_size (int): The size of each batch of representatives.
         add_to_ui_queue (function): A function to send updates to the frontend.
-        result_queue (queue.Queue): A queue to store results of the scraping.
-        error_queue (queue.Queue): A queue to store names of representatives with errors.
+        rep_results (RepResults): The results of every representative and field.
+        error_queue (RetryScheduler): Schedules retries of the fields with errors.
         session (aiohttp.ClientSession): The aiohttp session used for sending requests.
+        directory (dict): The directory index returned by get_directory_index.
 
     Returns:
-        None
+        dict: The stats of every pipeline stage.
     """
-    total_batches = len(rep_names) // batch_size + (
-        1 if len(rep_names) % batch_size else 0
-    )
+    page_fields = [field for field in fields if field in FIELD_URLS]
+
+    async def fetch_stage(job):
+        rep_name = job["rep_name"]
+        add_to_ui_queue(create_formatted_json_msg("start_rep", rep_name))
+
+        # Fields replayed from the run's journal are not fetched again
+        missing_fields = [field for field in page_fields if field not in job["values"]]
+        urls = [FIELD_URLS[field].format(rep_name=rep_name) for field in missing_fields]
+        responses = await asyncio.gather(*(fetch_data(session, url) for url in urls))
+
+        for field, url, response in zip(missing_fields, urls, responses):
+            if response:
+                job["pages"][field] = response
+            else:
+                report_response_error(
+                    rep_name, field, add_to_ui_queue, error_queue, url
+                )
+                job["values"][field] = RESPONSE_ERRORS[field]
+
+        return job
+
+    async def parse_stage(job):
+        page_fields = list(job["pages"])
+        parsed = await asyncio.gather(
+            *(
+                parse_page(
+                    FIELD_PARSERS[field],
+                    job["pages"][field],
+                    FIELD_URLS[field].format(rep_name=job["rep_name"]),
+                )
+                for field in page_fields
+            )
+        )
 
-    tasks = []  # List to hold tasks
+        for field, value in zip(page_fields, parsed):
+            if field == "bio":
+                job["bio"] = value
+                if not value:
+                    job["values"]["bio"] = BIO_NOT_FOUND
+            else:
+                job["values"][field] = value
 
-    for i in range(total_batches):
-        batch = rep_names[i * batch_size : (i + 1) * batch_size]
+        # The pages are no longer needed once parsed
+        job["pages"] = {}
 
-        add_to_ui_queue(
-            f'{{"msg_type": "update", "msg": "Starting batch {i + 1}/{total_batches}..."}}'
-        )
+        return job
+
+    async def enrich_stage(job):
+        rep_name = job["rep_name"]
 
-        # Start the batch processing in a new task
-        task = asyncio.create_task(
-            process_batch(
-                session, batch, fields, add_to_ui_queue, result_queue, error_queue
+        if "image_url" in fields and "image_url" not in job["values"]:
+            job["values"]["image_url"] = await get_image_url(
+                session, rep_name, add_to_ui_queue, error_queue, directory
             )
-        )
-        tasks.append(task)
 
-        # Wait 60 seconds before launching the next batch
-        if i < total_batches - 1 and "bio" in fields:
-            add_to_ui_queue(
-                '{"msg_type": "update", "msg": "Waiting 60 seconds to launch next batch..."}'
+        if job["bio"]:
+            job["values"]["bio"] = await extract_bio(
+                rep_name, job["bio"], add_to_ui_queue, error_queue
             )
-            await asyncio.sleep(60)
 
-    # Wait for all tasks to finish
-    await asyncio.gather(*tasks)
+        return job
+
+    async def emit_stage(job):
+        rep_name = job["rep_name"]
+
+        rep_results.add(rep_name, job["values"])
+        add_to_ui_queue(create_formatted_json_msg("finish_rep", rep_name))
+
+        return None
+
+    def guard(name, handler):
+        # Records the representative with its missing fields failed if a stage raises
+        async def guarded_stage(job):
+            try:
+                return await handler(job)
+            except Exception:
+                rep_name = job["rep_name"]
+                print(f"Error: The {name} stage failed for {rep_name}")
+
+                for field in [field for field in fields if field not in job["values"]]:
+                    report_parse_error(rep_name, field, add_to_ui_queue, error_queue)
+                    job["values"][field] = PARSE_ERRORS[field]
+
+                if name != "emit":
+                    return await emit_stage(job)
+
+                raise
 
+        return guarded_stage
 
-# Main runner function (handling session and batches)
-async def run_scraper(fields, add_to_ui_queue, sendJson, websocket):
+    pipeline = Pipeline(
+        [
+            Stage(
+                name,
+                guard(name, handler),
+                PIPELINE_WORKERS[name],
+                PIPELINE_QUEUE_SIZE,
+            )
+            for name, handler in (
+                ("fetch", fetch_stage),
+                ("parse", parse_stage),
+                ("enrich", enrich_stage),
+                ("emit", emit_stage),
+            )
+        ]
+    )
+
+    jobs = (
+        {
+            "rep_name": rep_name,
+            "pages": {},
+            "values": rep_results.get_journaled(rep_name),
+            "bio": None,
+        }
+        for rep_name in rep_names
+    )
+    active_pipelines.add(pipeline)
+    try:
+        await pipeline.run(jobs)
+    finally:
+        active_pipelines.discard(pipeline)
+
+    return pipeline.get_stats()
+
+
+# Main runner function (handling session and pipeline)
+async def run_scraper(
+    fields,
+    add_to_ui_queue,
+    sendJson,
+    websocket,
+    stream=False,
+    journal=None,
+    profile=False,
+    reused=None,
+):
     """
     Main function to run the scraper and send the results to the frontend.
 
-    Initializes the session, processes the batches of representatives,
-    formats the results, and sends the data to the frontend.
+    Gets the shared session, streams the representatives through the pipeline,
+    retries the fields that failed, formats the results, and sends the data to the
+    frontend. Only the failed (representative, field) units are retried and merged
+    into the records. Retries follow the policy of their error class and run
+    concurrently once the pipeline is done, within the run's RETRY_BUDGET.
+
+    In stream mode each representative's record is sent as a result message as soon
+    as it is finished, and again each time a retried field is merged into it,
+    followed by a manifest message once every retry is done. The records are not
+    collected and sendJson is not called.
+
+    In capture record mode every run opens its own archive, which the tasks it
+    starts write their responses to, and closes it when it ends.
+
+    With a journal every completed (representative, field) unit is recorded as it
+    finishes. A journal replayed by resume_run already has the units of the
+    interrupted run, and only the missing ones are scraped. The journal is deleted
+    once the run finishes. Units an earlier job completed can be passed as reused,
+    and are not scraped either.
+
+    A profiled run is wrapped in a CPU profiler and an allocation trace, and the
+    pstats file and report are saved to PROFILE_DIR when it ends. Only one run is
+    profiled at a time, a second one runs without the profiler.
 
     Args:
         fields(list): A list of the fields we want to scraper to get
         add_to_ui_queue (function): A function to send updates to the frontend.
-        sendJson (function): A function to send the final JSON to the frontend.
-        websocket (websockets.WebSocketClientProtocol): The WebSocket connection to the frontend.
+        sendJson (function): A function to send the final records to the frontend. They
+            are passed as a dict and only encoded once, when they are sent.
+        websocket (ScrapeJob): Passed to sendJson with the final records, the job the scrape belongs to.
+        stream (bool): Whether to send each record as soon as it is finished.
+        journal (RunJournal): The run's journal, or None to run without one.
+        profile (bool): Whether to profile the run.
+        reused (dict): Values of units an earlier job completed, by representative and
+            field, or None.
 
 
     Returns:
-        None
+        dict: The stats of the run, used by the benchmarks.
     """
-    rep_names = get_representative_list()
+    global active_profiler
+
+    # Every run records to its own archive, the tasks it starts inherit it
+    capture = CaptureWriter(CAPTURE_DIR, SITE_URL) if CAPTURE_MODE == "record" else None
+    capture_token = capture_writer.set(capture)
 
-    async with aiohttp.ClientSession() as session:
-        result_queue = queue.Queue()
-        error_queue = queue.Queue()
+    run_started = time.monotonic()
+    outcome = "error"
 
-        await create_run_batches(
-            rep_names, fields, 15, add_to_ui_queue, result_queue, error_queue, session
+    profiler = None
+    if profile and active_profiler is None:
+        profiler = active_profiler = RunProfiler(
+            PROFILE_DIR, PROFILE_TOP, "-".join(fields)
         )
+        profiler.start()
+    elif profile:
+        add_to_ui_queue(
+            create_msg(
+                "update", "Another run is being profiled, running without the profiler"
+            )
+        )
+
+    # cProfile only sees the loop thread, so only the profiled run parses on it
+    executor_token = parse_executor.set(None if profiler is not None else parse_pool)
 
-        people = {}
-        while not result_queue.empty():
-            people.update(result_queue.get())
+    try:
+        session = await get_session()
 
-        if not error_queue.empty():
-            add_to_ui_queue(
-                '{"msg_type": "update", "msg": "Starting to process errors..."}'
+        result_queue = ResultStream(add_to_ui_queue) if stream else None
+
+        async def retry_unit(unit):
+            retries_counter.inc(field=unit[1])
+            await process_unit(
+                session, unit, add_to_ui_queue, rep_results, error_queue, directory
             )
 
-        error_queue_counter = 0
+        budget_reported = False
 
-        while not error_queue.empty():
-            if error_queue_counter > 75:
-                add_to_ui_queue(
-                    '{"msg_type": "error", "msg": "Error Queue Overloaded. Wait a few minutes and try again"}'
+        def report_give_up(unit, error_class, reason):
+            nonlocal budget_reported
+
+            if reason == "budget" and budget_reported:
+                return
+
+            if reason == "budget":
+                budget_reported = True
+                msg = "Error Queue Overloaded. Wait a few minutes and try again"
+            else:
+                rep_name, field = unit
+                msg = (
+                    f"Error: Giving up on the {field} of {rep_name} "
+                    f"after repeated {error_class} errors"
                 )
-                break
-
-            await asyncio.sleep(5)
-            await process_rep(
-                session,
-                error_queue.get(),
-                fields,
-                add_to_ui_queue,
-                result_queue,
-                error_queue,
+
+            add_to_ui_queue(create_msg("error", msg))
+
+        # Failed fields are retried concurrently once the pipeline is done
+        error_queue = RetryScheduler(
+            retry_unit,
+            budget=RETRY_BUDGET,
+            concurrency=RETRY_CONCURRENCY,
+            on_give_up=report_give_up,
+        )
+        rep_results = RepResults(
+            fields, build_rep_obj, error_queue, result_queue, journal, reused
+        )
+
+        # One directory fetch gives both the rep list and every headshot
+        directory = await get_directory_index(session)
+        rep_names = list(directory)
+
+        pipeline_stats = await run_pipeline(
+            rep_names,
+            fields,
+            add_to_ui_queue,
+            rep_results,
+            error_queue,
+            session,
+            directory,
+        )
+
+        if error_queue.pending():
+            add_to_ui_queue(create_msg("update", "Starting to process errors..."))
+
+        await error_queue.join()
+
+        run_stats = {
+            "pipeline": pipeline_stats,
+            "request_scheduler": request_scheduler.get_stats(),
+            "response_cache": response_cache.get_stats(),
+            "ai_cache": ai_cache.get_stats(),
+            "ai_extraction": bio_extractor.get_stats(),
+            "retries": error_queue.get_stats(),
+            "units": rep_results.get_stats(),
+            "first_result_seconds": result_queue.first_result if stream else None,
+        }
+
+        print(f"Pipeline stats: {pipeline_stats}")
+        print(f"Request scheduler stats: {run_stats['request_scheduler']}")
+        await rate_controller.flush()
+        print(f"Response cache stats: {run_stats['response_cache']}")
+        print(f"AI cache stats: {run_stats['ai_cache']}")
+        print(f"AI extraction stats: {run_stats['ai_extraction']}")
+        print(f"Retry stats: {run_stats['retries']}")
+        print(f"Field result stats: {run_stats['units']}")
+
+        for status in ("ok", "retrying", "failed"):
+            last_run_units_gauge.set(
+                run_stats["units"]["units"].get(status, 0), status=status
             )
-            error_queue_counter += 1
+        last_run_retries_gauge.set(run_stats["retries"]["retries"])
+        if run_stats["first_result_seconds"] is not None:
+            last_run_first_result_gauge.set(run_stats["first_result_seconds"])
+
+        if journal is not None:
+            print(f"Run journal stats: {journal.get_stats()}")
+            await asyncio.to_thread(journal.finish)
+
+        await ai_cache.flush()
+        await response_cache.prune()
+
+        if stream:
+            result_queue.send_manifest(fields, rep_results.get_failed())
+        else:
+            await sendJson(websocket, rep_results.get_people())
+
+        outcome = "ok"
+        return run_stats
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        runs_counter.inc(outcome=outcome)
+        run_histogram.observe(time.monotonic() - run_started)
+
+        if profiler is not None:
+            snapshot = profiler.stop()
+            active_profiler = None
 
-        # Adding corrected reps to peeople
-        while not result_queue.empty():
-            people.update(result_queue.get())
+            try:
+                paths = await asyncio.to_thread(profiler.save, snapshot)
+            except OSError as e:
+                print(f"Error: Could not save the run profile: {e}")
+            else:
+                print(f"Run profile saved: {paths}")
+                add_to_ui_queue(
+                    create_msg("update", f"Profile saved to {paths['report']}")
+                )
 
-        people_json = create_json_list(people)
+        if capture:
+            print(f"Capture stats: {capture.get_stats()}")
+            await capture.close()
 
-        await sendJson(websocket, people_json)
+        capture_writer.reset(capture_token)
+        parse_executor.reset(executor_token)
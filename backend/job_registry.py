@@ -0,0 +1,520 @@
+"""
+Ohio House Representatives Job Registry
+
+This script handles sharing scrape runs between clients so several users cost the
+upstream site one run's worth of requests. Every run is a job with its own message
+channel. A start_scraper command whose fields are covered by a running job subscribes
+to that job instead of starting a new scrape, and is caught up on the progress and
+results the job already sent. A command that asks for more fields than an earlier job
+(running or recently finished) starts a job that only scrapes the missing fields and
+merges them with the earlier job's results for each representative.
+
+Only a running job or a finished job that succeeded is reused, so a job refused by
+admission control or one whose scraper raised never stands in for a real scrape. Even a
+successful job can have failed units, so once the earlier job is done only its units
+with complete values are reused, and the rest of its fields are scraped again.
+
+Classes:
+    ScrapeJob: One scrape run shared by every client that wants its fields.
+    JobRegistry: Finds the job a start_scraper command should use.
+
+Functions:
+    async def collect_results(job, people): sendJson callback collecting the final
+        records of a scrape into its job
+    def get_unit_value(rep_obj, field): Gets a field's value back from a representative's columns
+
+Libraries:
+    asyncio: Used to wait for jobs to finish
+    time: Used to time jobs and expire finished ones
+    itertools: Used to number the jobs
+
+Imports:
+    message_channel.py
+        MessageChannel: Used to send a job's messages to every subscribed client
+    houseScraper_async.py
+        FIELD_COLUMNS: Used to know which output columns each field fills in
+    serialization.py
+        loads: Used to read the scraper's messages and results
+        create_json_list: Used to encode the collected results once, when they are sent
+        create_msg: Used to format the result and manifest messages
+
+Global Variables:
+    ERROR_VALUES: Column values that mark a unit that failed
+"""
+
+import asyncio
+import itertools
+import time
+
+from message_channel import MessageChannel
+from houseScraper_async import FIELD_COLUMNS
+from serialization import loads, create_json_list, create_msg
+
+ERROR_VALUES = ("Response Error", "AI Error", "Parse Error")
+
+
+async def collect_results(job, people):
+    """
+    Collects the final records of a scrape into its job. Used as the sendJson callback.
+
+    The records are passed as a dict, so they are only encoded when the job sends
+    them.
+
+    Args:
+        job (ScrapeJob): The job the scrape belongs to.
+        people (dict): Maps every scraped representative to their columns.
+    """
+    job.add_results(people)
+
+
+def get_unit_value(rep_obj, field):
+    """
+    Gets the value of a (representative, field) unit back from the representative's
+    columns, in the form the field's function returns it.
+
+    Args:
+        rep_obj (dict): The representative's columns.
+        field (str): The field.
+
+    Returns:
+        The unit's value, or None if a column is missing or holds an error.
+    """
+    columns = FIELD_COLUMNS.get(field, ())
+    values = tuple(rep_obj.get(column) for column in columns)
+
+    if not columns or any(value is None or value in ERROR_VALUES for value in values):
+        return None
+
+    return values[0] if len(values) == 1 else values
+
+
+class ScrapeJob:
+    """
+    One scrape run shared by every client that wants its fields.
+
+    The job sits between the scraper and its channel. It keeps each representative's
+    latest progress message and result so late subscribers can catch up, and merges
+    its results with the base job's results when it reuses one. When the base job is
+    done, the reused units it does not have complete values for are scraped again.
+
+    Args:
+        job_id (int): The number of the job.
+        fields (list): The fields the job delivers, in the order they were requested.
+        stream (bool): Whether results are sent as each representative finishes.
+        base (ScrapeJob): An earlier job whose results are reused, or None.
+        **buffer_options: Passed to the channel's subscriber buffers.
+    """
+
+    def __init__(self, job_id, fields, stream, base=None, **buffer_options):
+        self.job_id = job_id
+        self.requested = list(fields)
+        self.fields = set(fields)
+        self.stream = stream
+        self.base = base
+
+        # Only the fields the base job does not have are scraped
+        self.scrape_fields = [
+            field for field in fields if base is None or field not in base.fields
+        ]
+        self.columns = {
+            column for field in self.fields for column in FIELD_COLUMNS.get(field, ())
+        }
+
+        # Reused fields scraped again because the base job did not complete them
+        self.rescrape_fields = []
+
+        self.channel = MessageChannel(**buffer_options)
+        self.task = None
+        self.journal = None
+        self.succeeded = False
+
+        self.results = {}
+        self.result_seq = {}
+        self.held = {}
+        self.progress = {}
+        self.dependents = set()
+        self.manifest = None
+        self.seq = 0
+
+        self.started = time.monotonic()
+        self.finished_at = None
+        self.done = asyncio.Event()
+
+        if base is not None:
+            base.dependents.add(self)
+
+    @property
+    def running(self):
+        """Whether the job is still running."""
+        return self.finished_at is None
+
+    @property
+    def scraped_fields(self):
+        """The fields the job scraped itself, in the order they were requested."""
+        return self.scrape_fields + self.rescrape_fields
+
+    def subscribe(self, note=None):
+        """
+        Subscribes a client to the job and catches it up.
+
+        Args:
+            note (str): A message sent to the client before the catch up, or None.
+
+        Returns:
+            MessageBuffer: The buffer the client's messages are put in.
+        """
+        history = [note] if note else []
+        history.extend(self.progress.values())
+
+        if self.stream:
+            history.extend(self.format_result(rep_name) for rep_name in self.results)
+
+        return self.channel.subscribe(history)
+
+    def publish(self, text):
+        """
+        Handles a message from the scraper. Used as the add_to_ui_queue callback.
+
+        Results are merged before they are sent and the scraper's manifest is kept
+        for the job's own manifest. Everything else is sent as is.
+
+        Args:
+            text (str): The message from the scraper.
+        """
+        try:
+            message = loads(text)
+        except ValueError:
+            message = None
+
+        if isinstance(message, dict):
+            msg_type = message.get("msg_type")
+
+            if msg_type == "result":
+                self.add_results(message["msg"])
+                return
+            if msg_type == "manifest":
+                self.add_manifest(message["msg"])
+                return
+            if msg_type == "update" and "rep_name" in message:
+                self.progress[message["rep_name"]] = text
+
+        # The parsed message is handed on so the channel does not parse it again
+        self.channel.publish(text, message)
+
+    def add_manifest(self, manifest):
+        """
+        Keeps the scraper's manifest, combining the failed fields of every scraper
+        run of the job.
+
+        Args:
+            manifest (dict): The manifest the scraper sent.
+        """
+        if self.manifest is None:
+            self.manifest = manifest
+            return
+
+        failed_fields = dict(self.manifest.get("failed_fields", {}))
+        for rep_name, fields in manifest.get("failed_fields", {}).items():
+            failed_fields[rep_name] = sorted(
+                {*failed_fields.get(rep_name, ()), *fields}
+            )
+
+        self.manifest["failed_fields"] = failed_fields
+        self.manifest["failed"] = sorted(failed_fields)
+
+    def add_results(self, results):
+        """
+        Adds scraped results, merging them with the base job's results.
+
+        A result the base job does not have yet is held until it does.
+
+        Args:
+            results (dict): Maps representative names to their scraped columns.
+        """
+        for rep_name, rep_obj in results.items():
+            if self.base is None:
+                self.emit(rep_name, rep_obj)
+            elif not self.base.running or rep_name in self.base.results:
+                self.emit(
+                    rep_name,
+                    {
+                        **self.base.results.get(rep_name, {}),
+                        **self.results.get(rep_name, {}),
+                        **rep_obj,
+                    },
+                )
+            else:
+                self.held[rep_name] = rep_obj
+
+    def base_result(self, rep_name):
+        """
+        Sends a held result once the base job has the same representative.
+
+        Args:
+            rep_name (str): The representative the base job just finished.
+        """
+        if rep_name in self.held:
+            merged = {**self.base.results[rep_name], **self.held.pop(rep_name)}
+            self.emit(rep_name, merged)
+
+    def emit(self, rep_name, rep_obj):
+        """
+        Records a finished representative and sends it in stream mode.
+
+        Args:
+            rep_name (str): The representative's name.
+            rep_obj (dict): The representative's columns.
+        """
+        rep_obj = {
+            column: value for column, value in rep_obj.items() if column in self.columns
+        }
+
+        # Scraping the base job's failed units again sends every representative
+        if self.results.get(rep_name) == rep_obj:
+            return
+
+        self.results[rep_name] = rep_obj
+
+        if self.stream:
+            self.seq += 1
+            self.result_seq[rep_name] = self.seq
+            self.channel.publish(self.format_result(rep_name))
+
+        for dependent in list(self.dependents):
+            dependent.base_result(rep_name)
+
+    def format_result(self, rep_name):
+        """
+        Formats a representative's result message.
+
+        Args:
+            rep_name (str): The representative's name.
+
+        Returns:
+            str: The result message.
+        """
+        return create_msg(
+            "result",
+            {rep_name: self.results[rep_name]},
+            seq=self.result_seq[rep_name],
+        )
+
+    def get_reused_units(self):
+        """
+        Gets the base job's units that can be reused, once the base job is done.
+
+        Returns:
+            tuple: The reused fields that have to be scraped again, in the order they
+                were requested, and the values of the base job's complete units of those
+                fields, by representative.
+        """
+        reused_fields = [field for field in self.requested if field in self.base.fields]
+
+        values = {}
+        incomplete = set()
+
+        for rep_name, rep_obj in self.base.results.items():
+            for field in reused_fields:
+                value = get_unit_value(rep_obj, field)
+
+                if value is None:
+                    incomplete.add(field)
+                else:
+                    values.setdefault(rep_name, {})[field] = value
+
+        # A job that did not succeed may not have every representative
+        if not self.base.succeeded:
+            incomplete.update(reused_fields)
+
+        return [field for field in reused_fields if field in incomplete], values
+
+    async def run(self, run_scraper):
+        """
+        Scrapes the missing fields and sends the merged results.
+
+        Once the base job is done, the reused fields it did not complete are scraped
+        again. Its complete units are handed to the scraper so only the rest are
+        fetched.
+
+        Args:
+            run_scraper (function): The scraper's run_scraper function.
+        """
+        if self.scrape_fields:
+            await run_scraper(
+                self.scrape_fields,
+                self.publish,
+                collect_results,
+                self,
+                self.stream,
+                self.journal,
+            )
+
+        if self.base is not None:
+            await self.base.done.wait()
+
+            # Representatives only the base job has results for
+            for rep_name in self.base.results:
+                if rep_name not in self.results and rep_name not in self.held:
+                    self.held[rep_name] = {}
+
+            for rep_name, rep_obj in list(self.held.items()):
+                del self.held[rep_name]
+                self.emit(rep_name, {**self.base.results.get(rep_name, {}), **rep_obj})
+
+            self.rescrape_fields, reused = self.get_reused_units()
+
+            if self.rescrape_fields:
+                await run_scraper(
+                    self.rescrape_fields,
+                    self.publish,
+                    collect_results,
+                    self,
+                    self.stream,
+                    reused=reused,
+                )
+
+        if self.stream:
+            self.send_manifest()
+        else:
+            # Passed with the results so the channel does not decode the payload again
+            self.channel.publish(create_json_list(self.results), self.results)
+
+    def send_manifest(self):
+        """
+        Sends the job's manifest, built on the scraper's manifest if there is one.
+        """
+        manifest = dict(self.manifest or {})
+        manifest.update(
+            {
+                "results": self.seq,
+                "last_seq": self.seq,
+                "rep_count": len(self.results),
+                "rep_names": sorted(self.results),
+                "fields": sorted(self.fields),
+                "scraped_fields": self.scraped_fields,
+                "reused_fields": sorted(self.fields - set(self.scraped_fields)),
+                "failed": manifest.get("failed", []),
+                "first_result_seconds": manifest.get("first_result_seconds"),
+                "elapsed_seconds": time.monotonic() - self.started,
+                "run_id": self.journal.run_id if self.journal else None,
+            }
+        )
+
+        self.channel.publish(create_msg("manifest", manifest))
+
+    def finish(self):
+        """
+        Marks the job finished and closes its channel.
+        """
+        self.finished_at = time.monotonic()
+        self.done.set()
+        self.channel.close()
+
+        if self.base is not None:
+            self.base.dependents.discard(self)
+
+
+class JobRegistry:
+    """
+    Finds the job a start_scraper command should use.
+
+    Finished jobs are kept for result_ttl seconds so later commands can reuse their
+    results.
+
+    Args:
+        result_ttl (float): Seconds a finished job's results can be reused for.
+        **buffer_options: Passed to every job's channel.
+    """
+
+    def __init__(self, result_ttl=600, **buffer_options):
+        self.result_ttl = result_ttl
+        self.buffer_options = buffer_options
+
+        self.jobs = []
+        self.counter = itertools.count(1)
+
+        self.started = 0
+        self.attached = 0
+        self.reused = 0
+
+    def prune(self):
+        """
+        Forgets finished jobs whose results are too old to reuse.
+        """
+        now = time.monotonic()
+        self.jobs = [
+            job
+            for job in self.jobs
+            if job.running or now - job.finished_at < self.result_ttl
+        ]
+
+    def get_journaled_job(self, run_id):
+        """
+        Gets the running job writing a run's journal.
+
+        Args:
+            run_id (str): The id of the run.
+
+        Returns:
+            ScrapeJob: The job, or None if no running job has that journal.
+        """
+        for job in self.jobs:
+            if job.running and job.journal and job.journal.run_id == run_id:
+                return job
+
+        return None
+
+    def get_job(self, fields, stream):
+        """
+        Gets the job for a start_scraper command.
+
+        Returns a running job that covers the fields, or a new job that reuses the
+        running or successful job sharing the most fields with the command.
+
+        Args:
+            fields (list): The fields the command asks for.
+            stream (bool): Whether the command wants results as they finish.
+
+        Returns:
+            tuple: The job and True if it is new and has to be started.
+        """
+        self.prune()
+        wanted = set(fields)
+
+        for job in self.jobs:
+            if job.running and job.stream == stream and wanted <= job.fields:
+                self.attached += 1
+                return job, False
+
+        base = None
+        best_overlap = 0
+
+        # Latest jobs first so ties go to the freshest results
+        for job in reversed(self.jobs):
+            if not job.running and not job.succeeded:
+                continue
+
+            overlap = len(job.fields & wanted)
+            if overlap > best_overlap:
+                base, best_overlap = job, overlap
+
+        if base is not None:
+            self.reused += 1
+
+        job = ScrapeJob(
+            next(self.counter), fields, stream, base=base, **self.buffer_options
+        )
+        self.jobs.append(job)
+        self.started += 1
+
+        return job, True
+
+    def get_stats(self):
+        """Returns the running and kept jobs and how often jobs were shared."""
+        return {
+            "running": sum(job.running for job in self.jobs),
+            "kept": len(self.jobs),
+            "started": self.started,
+            "attached": self.attached,
+            "reused": self.reused,
+        }
@@ -0,0 +1,110 @@
+"""
+Ohio House Representatives Event Loop Monitor
+
+This script handles catching code that blocks the event loop. A heartbeat is scheduled on
+the loop and a watchdog thread checks that it keeps running. When the loop has not run
+the heartbeat for longer than the threshold, something is holding the loop, so the
+watchdog logs the loop thread's current stack, which points at the blocking call.
+
+Only meant for debug mode since sampling stacks has a cost.
+
+Classes:
+    LoopLagMonitor: Logs the stack of any callback that holds the loop past a threshold.
+
+Libraries:
+    asyncio: Used to schedule the heartbeat
+    threading: Used for the watchdog thread
+    time: Used to time the heartbeat
+    sys, traceback: Used to get the stack of the loop thread
+    logging: Used to log the stalls
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+
+class LoopLagMonitor:
+    """
+    Logs the stack of any callback that holds the event loop past a threshold.
+
+    Args:
+        threshold (float): Seconds the loop may go without running the heartbeat.
+        interval (float): Seconds between heartbeats.
+    """
+
+    def __init__(self, threshold=0.1, interval=0.05):
+        self.threshold = threshold
+        self.interval = interval
+
+        self.loop = None
+        self.loop_thread_id = None
+        self.last_beat = time.monotonic()
+        self.stopped = threading.Event()
+        self.watchdog = None
+
+        self.stalls = 0
+        self.max_lag = 0.0
+
+    def start(self):
+        """
+        Starts the heartbeat and the watchdog. Must be called from the running loop.
+        """
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.stopped.clear()
+
+        self.loop.call_soon(self.beat)
+
+        self.watchdog = threading.Thread(
+            target=self.watch, name="loop-lag-monitor", daemon=True
+        )
+        self.watchdog.start()
+
+    def stop(self):
+        """Stops the watchdog."""
+        self.stopped.set()
+
+    def beat(self):
+        """
+        Records that the loop is running and schedules the next heartbeat.
+        """
+        now = time.monotonic()
+        self.max_lag = max(self.max_lag, now - self.last_beat - self.interval)
+        self.last_beat = now
+
+        if not self.stopped.is_set():
+            self.loop.call_later(self.interval, self.beat)
+
+    def watch(self):
+        """
+        Checks the heartbeat and logs the loop's stack once per stall.
+        """
+        stalled_since = None
+
+        while not self.stopped.wait(self.interval):
+            last_beat = self.last_beat
+            lag = time.monotonic() - last_beat - self.interval
+
+            if lag < self.threshold:
+                continue
+
+            # Only log the first time a stall is seen
+            if stalled_since == last_beat:
+                continue
+            stalled_since = last_beat
+
+            self.stalls += 1
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else ""
+            logging.warning(
+                f"Event loop blocked for {lag:.3f}s (threshold {self.threshold}s):\n{stack}"
+            )
+
+    def get_stats(self):
+        """Returns the number of stalls logged and the longest lag seen."""
+        return {"stalls": self.stalls, "max_lag": self.max_lag}
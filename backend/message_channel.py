@@ -0,0 +1,331 @@
+"""
+Ohio House Representatives Message Channel
+
+This script handles passing progress messages from a scrape to the websockets watching it.
+Every scrape session gets its own channel, and every websocket that wants the session's
+messages subscribes to it and gets its own buffer. Publishing puts the message in each
+subscriber's buffer, which wakes the subscriber's sender right away, so there is no
+polling and sessions never see each other's messages.
+
+Buffers coalesce messages into frames. A sender waits for the first message, then keeps
+collecting for a short flush window or until the frame reaches its size limit, and sends
+everything as one json array. While a message waits, a newer update for the same
+representative replaces it, so a representative that finished before the flush only sends
+its final state. Each buffer holds a bounded number of messages. When a slow client lets
+it fill up, the oldest progress messages are dropped to make room for the latest ones.
+Results, manifests and snapshots can not be dropped, so they have a larger cap of their
+own. A client that falls behind by that much is sent an error and its buffer is closed,
+so the server disconnects it instead of holding its messages without limit.
+
+Every frame is a json array of messages, even when it holds a single message. Clients
+other than the frontend must read each frame as a list.
+
+Messages keep the json text they were published as, so a frame is built by joining the
+texts instead of encoding every message again.
+
+Classes:
+    MessageBuffer: Coalesces one subscriber's messages into bounded json array frames.
+    MessageChannel: Fans out the messages of one scrape session to its subscribers.
+
+Libraries:
+    asyncio: Used to wake senders and time the flush window
+    OrderedDict: Used to keep waiting messages in order while replacing them by key
+    itertools: Used to number messages that are never replaced
+
+Imports:
+    serialization.py
+        create_msg: Used for the error sent to a client that fell too far behind
+        dumps, loads: Used to read the messages and encode the ones that are not json
+"""
+
+import asyncio
+import itertools
+from collections import OrderedDict
+
+from serialization import create_msg, dumps, loads
+
+
+class MessageBuffer:
+    """
+    Coalesces one subscriber's messages into bounded json array frames.
+
+    Args:
+        flush_interval (float): Seconds to keep collecting after the first message of
+            a frame arrives.
+        max_frame_bytes (int): The size a frame is sent at without waiting for the rest
+            of the flush window.
+        max_messages (int): The most messages waiting in the buffer before progress
+            messages are dropped.
+        max_data_messages (int): The most messages waiting in the buffer when none of
+            them can be dropped. Past it the buffer is closed with an error.
+    """
+
+    # Progress messages can be dropped for slow clients, data can not
+    DROPPABLE_TYPES = ("update", "error")
+
+    def __init__(
+        self,
+        flush_interval=0.05,
+        max_frame_bytes=65536,
+        max_messages=256,
+        max_data_messages=4096,
+    ):
+        self.flush_interval = flush_interval
+        self.max_frame_bytes = max_frame_bytes
+        self.max_messages = max_messages
+        self.max_data_messages = max_data_messages
+
+        self.pending = OrderedDict()
+        self.pending_bytes = 0
+        # Droppable messages waiting, so a buffer of only data is not scanned
+        self.droppable = 0
+        self.closed = False
+        self.overflowed = False
+        self.counter = itertools.count()
+
+        self.has_messages = asyncio.Event()
+        self.frame_full = asyncio.Event()
+
+        self.merged = 0
+        self.dropped = 0
+        self.frames = 0
+
+    def get_key(self, message):
+        """
+        Gets the key a message is stored under.
+
+        Progress updates about a representative share a key, so a newer one replaces
+        an older one that has not been sent yet. Every other message gets its own key.
+
+        Args:
+            message (dict or str): The parsed message.
+
+        Returns:
+            tuple: The key of the message.
+        """
+        if (
+            isinstance(message, dict)
+            and message.get("msg_type") == "update"
+            and "rep_name" in message
+        ):
+            return ("rep", message["rep_name"])
+
+        return ("msg", next(self.counter))
+
+    def is_droppable(self, message):
+        """Returns True if the message is progress a slow client can miss."""
+        return (
+            not isinstance(message, dict)
+            or message.get("msg_type") in self.DROPPABLE_TYPES
+        )
+
+    def put(self, message, text):
+        """
+        Adds a message to the buffer.
+
+        Args:
+            message (dict or str): The parsed message, or the text if it is not json.
+            text (str): The message as json, sent as is in the frame.
+        """
+        if self.closed:
+            return
+
+        key = self.get_key(message)
+
+        if key in self.pending:
+            old_message, old_text = self.pending.pop(key)
+            self.pending_bytes -= len(old_text)
+            self.droppable -= self.is_droppable(old_message)
+            self.merged += 1
+
+        self.pending[key] = (message, text)
+        self.pending_bytes += len(text)
+        self.droppable += self.is_droppable(message)
+
+        if len(self.pending) > self.max_messages and self.droppable:
+            self.drop_oldest()
+        elif len(self.pending) > self.max_data_messages:
+            self.overflow()
+            return
+
+        self.has_messages.set()
+        if self.pending_bytes >= self.max_frame_bytes:
+            self.frame_full.set()
+
+    def drop_oldest(self):
+        """
+        Drops the oldest progress message to keep the buffer within its limit.
+        """
+        for key, (message, text) in self.pending.items():
+            if self.is_droppable(message):
+                del self.pending[key]
+                self.pending_bytes -= len(text)
+                self.droppable -= 1
+                self.dropped += 1
+                return
+
+    def overflow(self):
+        """
+        Replaces everything waiting with an error and closes the buffer, for a client
+        that fell too far behind to catch up.
+        """
+        self.dropped += len(self.pending)
+        self.pending.clear()
+
+        text = create_msg(
+            "error",
+            "Too many messages are waiting for this connection. Reconnect and use "
+            "get_snapshot or resume_run to catch up.",
+        )
+        self.pending[("msg", next(self.counter))] = (loads(text), text)
+        self.pending_bytes = len(text)
+        self.droppable = 1
+        self.overflowed = True
+
+        self.close()
+
+    def close(self):
+        """
+        Closes the buffer. Messages already in it are still sent.
+        """
+        self.closed = True
+        self.has_messages.set()
+        self.frame_full.set()
+
+    async def get_frame(self):
+        """
+        Waits for the next frame.
+
+        Returns:
+            str: A json array of messages, or None once the buffer is closed and empty.
+        """
+        await self.has_messages.wait()
+
+        if not self.pending:
+            return None
+
+        # Give the rest of the frame a chance to arrive
+        if self.pending_bytes < self.max_frame_bytes and not self.closed:
+            try:
+                await asyncio.wait_for(self.frame_full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+        frame = []
+        frame_bytes = 0
+
+        while self.pending and (not frame or frame_bytes < self.max_frame_bytes):
+            _, (message, text) = self.pending.popitem(last=False)
+            self.pending_bytes -= len(text)
+            self.droppable -= self.is_droppable(message)
+            frame_bytes += len(text)
+            frame.append(text)
+
+        if not self.pending and not self.closed:
+            self.has_messages.clear()
+        if self.pending_bytes < self.max_frame_bytes and not self.closed:
+            self.frame_full.clear()
+
+        self.frames += 1
+        return "[" + ",".join(frame) + "]"
+
+    def get_stats(self):
+        """Returns the frames sent and the messages merged, dropped and waiting."""
+        return {
+            "frames": self.frames,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "pending": len(self.pending),
+            "overflowed": self.overflowed,
+        }
+
+
+class MessageChannel:
+    """
+    Fans out the messages of one scrape session to its subscribers.
+
+    A closed channel closes every subscriber buffer so their senders can stop once
+    they have sent what is left.
+
+    Args:
+        **buffer_options: Passed to every subscriber's MessageBuffer.
+    """
+
+    def __init__(self, **buffer_options):
+        self.buffer_options = buffer_options
+        self.subscribers = set()
+        self.closed = False
+
+    def subscribe(self, history=()):
+        """
+        Adds a subscriber to the channel.
+
+        Args:
+            history (iterable): Messages the subscriber gets before anything else,
+                used to catch up a subscriber that joins late.
+
+        Returns:
+            MessageBuffer: The buffer the subscriber's messages are put in.
+        """
+        subscriber = MessageBuffer(**self.buffer_options)
+
+        for text in history:
+            subscriber.put(*self.parse(text))
+
+        if self.closed:
+            subscriber.close()
+
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """
+        Removes a subscriber from the channel.
+
+        Args:
+            subscriber (MessageBuffer): The buffer returned by subscribe.
+        """
+        self.subscribers.discard(subscriber)
+
+    def publish(self, text, message=None):
+        """
+        Sends a message to every subscriber. Used as the add_to_ui_queue callback.
+
+        Args:
+            text (str): The message to send, normally a json object.
+            message (dict): The message already parsed, or None to parse the text.
+        """
+        if self.closed:
+            return
+
+        if message is None:
+            message, text = self.parse(text)
+
+        for subscriber in self.subscribers:
+            subscriber.put(message, text)
+
+    def parse(self, text):
+        """
+        Parses a message once for every subscriber.
+
+        Args:
+            text (str): The message, normally a json object.
+
+        Returns:
+            tuple: The parsed message (or the text if it is not json) and its json text.
+        """
+        try:
+            return loads(text), text
+        except ValueError:
+            return text, dumps(text)
+
+    def close(self):
+        """
+        Closes the channel and tells every subscriber there are no more messages.
+        """
+        if self.closed:
+            return
+
+        self.closed = True
+        for subscriber in self.subscribers:
+            subscriber.close()
@@ -0,0 +1,274 @@
+"""
+Ohio House Representatives Metrics
+
+This script handles the counters, histograms and gauges the scraper and the websocket
+server record, and renders them in the Prometheus text format for the /metrics endpoint.
+Every instrument is created once at import time through the shared registry, so recording
+a value is a dictionary update on the event loop and costs next to nothing. Gauges can be
+given a function instead of being set, so values the scraper already tracks (queue
+depths, running jobs) are read when /metrics is requested.
+
+Classes:
+    Counter: A value that only goes up, per label set.
+    Gauge: A value that goes up and down, per label set, or read from a function.
+    Histogram: Counts of observed values in buckets, per label set.
+    MetricsRegistry: Holds the instruments and renders them for Prometheus.
+
+Functions:
+    def format_labels(label_names, label_values): Formats a label set for the text format
+    def format_value(value): Formats a sample value for the text format
+
+Libraries:
+    bisect: Used to find the bucket of an observed value
+    math: Used for infinite bucket bounds
+
+Global Variables:
+    DEFAULT_BUCKETS: Histogram buckets in seconds, for latencies
+    registry: The registry shared by the scraper and the websocket server
+"""
+
+import bisect
+import math
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def format_labels(label_names, label_values):
+    """
+    Formats a label set for the Prometheus text format.
+
+    Args:
+        label_names (tuple): The names of the labels.
+        label_values (tuple): The values of the labels, in the same order.
+
+    Returns:
+        str: The label set in braces, or an empty string without labels.
+    """
+    if not label_names:
+        return ""
+
+    pairs = []
+    for name, value in zip(label_names, label_values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+
+    return "{" + ",".join(pairs) + "}"
+
+
+def format_value(value):
+    """
+    Formats a sample value for the Prometheus text format.
+
+    Args:
+        value (float): The value.
+
+    Returns:
+        str: The value, with +Inf, -Inf and NaN spelled the Prometheus way.
+    """
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+
+    if math.isnan(value):
+        return "NaN"
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    A value that only goes up, per label set.
+
+    Args:
+        name (str): The metric name, ending in _total.
+        help_text (str): The description shown by Prometheus.
+        labels (tuple): The label names.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        """
+        Adds to the counter.
+
+        Args:
+            amount (float): How much to add.
+            **labels: The value of every label.
+        """
+        key = tuple(labels[name] for name in self.labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def collect(self):
+        """Returns the (suffix, label names, label values, value) of every sample."""
+        return [("", self.labels, key, value) for key, value in self.values.items()]
+
+
+class Gauge:
+    """
+    A value that goes up and down, per label set.
+
+    A gauge with a function is read when it is collected. The function returns a
+    number, or a dict mapping label value tuples to numbers.
+
+    Args:
+        name (str): The metric name.
+        help_text (str): The description shown by Prometheus.
+        labels (tuple): The label names.
+        function (function): Reads the current value, or None to set it instead.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labels=(), function=None):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.function = function
+        self.values = {}
+
+    def set(self, value, **labels):
+        """Sets the gauge."""
+        self.values[tuple(labels[name] for name in self.labels)] = value
+
+    def inc(self, amount=1, **labels):
+        """Adds to the gauge."""
+        key = tuple(labels[name] for name in self.labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        """Subtracts from the gauge."""
+        self.inc(-amount, **labels)
+
+    def collect(self):
+        """Returns the (suffix, label names, label values, value) of every sample."""
+        values = self.values
+
+        if self.function is not None:
+            values = self.function()
+            if not isinstance(values, dict):
+                values = {(): values}
+
+        return [("", self.labels, key, value) for key, value in values.items()]
+
+
+class Histogram:
+    """
+    Counts of observed values in buckets, per label set.
+
+    Args:
+        name (str): The metric name.
+        help_text (str): The description shown by Prometheus.
+        labels (tuple): The label names.
+        buckets (tuple): The upper bounds of the buckets, in increasing order.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets) + (math.inf,)
+        self.values = {}
+
+    def observe(self, value, **labels):
+        """
+        Records an observed value.
+
+        Args:
+            value (float): The value, such as a latency in seconds.
+            **labels: The value of every label.
+        """
+        key = tuple(labels[name] for name in self.labels)
+
+        if key not in self.values:
+            self.values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0}
+
+        state = self.values[key]
+        state["counts"][bisect.bisect_left(self.buckets, value)] += 1
+        state["sum"] += value
+
+    def collect(self):
+        """Returns the (suffix, label names, label values, value) of every sample."""
+        samples = []
+        bucket_labels = self.labels + ("le",)
+
+        for key, state in self.values.items():
+            cumulative = 0
+
+            for bound, count in zip(self.buckets, state["counts"]):
+                cumulative += count
+                samples.append(
+                    ("_bucket", bucket_labels, key + (format_value(bound),), cumulative)
+                )
+
+            samples.append(("_sum", self.labels, key, state["sum"]))
+            samples.append(("_count", self.labels, key, cumulative))
+
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Holds the instruments and renders them for Prometheus.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        """
+        Adds an instrument, or returns the one already registered with its name.
+
+        Args:
+            metric (Counter | Gauge | Histogram): The instrument.
+
+        Returns:
+            Counter | Gauge | Histogram: The registered instrument.
+        """
+        return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, labels=()):
+        """Creates and registers a counter."""
+        return self.register(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=(), function=None):
+        """Creates and registers a gauge."""
+        return self.register(Gauge(name, help_text, labels, function))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        """Creates and registers a histogram."""
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def render(self):
+        """
+        Renders every instrument in the Prometheus text format.
+
+        Returns:
+            str: The text served by /metrics.
+        """
+        lines = []
+
+        for metric in self.metrics.values():
+            try:
+                samples = metric.collect()
+            except Exception as e:
+                lines.append(f"# Could not collect {metric.name}: {e}")
+                continue
+
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+
+            for suffix, label_names, label_values, value in samples:
+                labels = format_labels(label_names, label_values)
+                lines.append(f"{metric.name}{suffix}{labels} {format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,180 @@
+"""
+Ohio House Representatives Page Parsers
+
+This script holds the functions that pull the scraped fields out of the representative
+pages. Every function is pure: it takes the html of a page and returns the field values,
+without any requests or messages, so parsing can run as its own step of the scraper and
+in worker processes off the event loop.
+
+Each parser only builds the parts of the page it reads (using a SoupStrainer), and lxml
+is used as the tree builder when it is installed since it is much faster than the pure
+python html.parser. The builder can be forced with the HTML_PARSER environment variable.
+
+Functions:
+    def get_parser_backend(): Picks the fastest installed tree builder
+    def parse_info(html): Gets hometown, address, phone and fax from a member page
+    def parse_bio(html): Gets the combined biography text from a biography page
+    def parse_committees(html): Gets the committees from a committees page
+    def parse_legislation(html): Gets the primary sponsored bills from a legislation page
+
+Libraries:
+    BeautifulSoup: Helps format scraped pages
+    SoupStrainer: Used to only build the parts of a page that are read
+    os: Used for environment variables
+
+Global Variables:
+    PARSER_BACKEND: The tree builder used by every parser
+    INFO_STRAINER, BIO_STRAINER, COMMITTEES_STRAINER, LEGISLATION_STRAINER: The parts
+        of each page the parsers read
+"""
+
+import os
+
+from bs4 import BeautifulSoup, SoupStrainer  # type: ignore
+
+
+def get_parser_backend():
+    """
+    Picks the tree builder BeautifulSoup uses.
+
+    Uses the HTML_PARSER environment variable if it is set, otherwise lxml if it is
+    installed and html.parser if it is not.
+
+    Args:
+        None
+
+    Returns:
+        str: The name of the tree builder.
+    """
+    if os.getenv("HTML_PARSER"):
+        return os.getenv("HTML_PARSER")
+
+    try:
+        import lxml  # type: ignore # noqa: F401
+    except ImportError:
+        return "html.parser"
+
+    return "lxml"
+
+
+PARSER_BACKEND = get_parser_backend()
+
+INFO_STRAINER = SoupStrainer("div", class_="member-info-bar-module")
+BIO_STRAINER = SoupStrainer("div", class_="gray-block")
+COMMITTEES_STRAINER = SoupStrainer("div", class_="media-overlay-caption")
+LEGISLATION_STRAINER = SoupStrainer("table", class_="member-legislation-table")
+
+
+def parse_info(html):
+    """
+    Parses representative information (hometown, address, phone, fax).
+
+    Returns default values for any details not found on the page.
+
+    Args:
+        html (str): The html content of the representative's member page.
+
+    Returns:
+        tuple: Hometown, address, phone number, and fax number of the representative.
+    """
+    address_keywords = ["77", "High", "Street", "St.", "South", "S.", "Floor"]
+
+    soup = BeautifulSoup(html, PARSER_BACKEND, parse_only=INFO_STRAINER)
+
+    divs = soup.find_all("div", class_="member-info-bar-module")
+
+    home_town = address = phone_number = fax_number = "Not Listed"
+
+    for module in divs:
+        module_text = module.get_text()
+        if "Hometown" in module_text:
+            home_town = module.find("div", class_="member-info-bar-value").text.strip()
+
+        if any(keyword in module_text for keyword in address_keywords):
+            address_number_module = module.find_all(
+                "div", class_="member-info-bar-value"
+            )
+            address = address_number_module[0].text.strip()
+            phone_number = address_number_module[1].text.strip().replace("Phone: ", "")
+            fax_number = address_number_module[2].text.strip().replace("Fax: ", "")
+
+    return home_town, address, phone_number, fax_number
+
+
+def parse_bio(html):
+    """
+    Parses the representative's biography into a single block of text.
+
+    Args:
+        html (str): The html content of the representative's biography page.
+
+    Returns:
+        str: The biography paragraphs joined by spaces, or None if there is no biography.
+    """
+    soup = BeautifulSoup(html, PARSER_BACKEND, parse_only=BIO_STRAINER)
+
+    bio_block = soup.find("div", class_="gray-block")
+
+    if not bio_block:
+        return None
+
+    bio_paragraphs = bio_block.find_all("p")
+
+    if not bio_paragraphs:
+        return None
+
+    return " ".join(paragraph.text.strip() for paragraph in bio_paragraphs)
+
+
+def parse_committees(html):
+    """
+    Parses the representative's committee memberships.
+
+    Args:
+        html (str): The html content of the representative's committees page.
+
+    Returns:
+        str: A comma-separated list of committees the representative is a member of.
+    """
+    soup = BeautifulSoup(html, PARSER_BACKEND, parse_only=COMMITTEES_STRAINER)
+
+    media_captions = soup.find_all("div", class_="media-overlay-caption")
+
+    return ", ".join(caption.text.strip() for caption in media_captions)
+
+
+def parse_legislation(html):
+    """
+    Parses the representative's primary sponsored legislation.
+
+    Args:
+        html (str): The html content of the representative's legislation page.
+
+    Returns:
+        str: A list of legislation the representative sponsors in a <newline> delimited list.
+    """
+    soup = BeautifulSoup(html, PARSER_BACKEND, parse_only=LEGISLATION_STRAINER)
+
+    legislation_tables = soup.find_all("table", class_="member-legislation-table")
+
+    table = None
+
+    # Finding needed table
+    for val in legislation_tables:
+        caption = val.find("caption")
+
+        if caption and "Primary Sponsored Bills" in caption.text:
+            table = val
+
+    if not table:
+        return "No Primary Sponsored Bills Found"
+
+    primary_legislation = []
+
+    for tbody in table.find_all("tbody"):
+        bill_num = tbody.find("a").text
+        bill_title = tbody.find("td", class_="title-cell").text
+
+        primary_legislation.append(bill_num + " " + bill_title)
+
+    return "<newline>".join(primary_legislation)
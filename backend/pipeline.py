@@ -0,0 +1,138 @@
+"""
+Ohio House Representatives Pipeline
+
+This script handles running work through a series of stages connected by bounded queues.
+Every stage has its own number of workers. An item moves to the next stage as soon as a
+worker finishes with it, so items flow through the stages independently and a slow item
+never holds up the items behind it. When a stage falls behind, its queue fills up and
+the stages before it wait to put new items, so backpressure reaches the start of the
+pipeline.
+
+Classes:
+    Stage: A named step of the pipeline with a handler and a worker count.
+    Pipeline: Connects stages with bounded queues and runs items through them.
+
+Libraries:
+    asyncio: Used for queues and worker tasks
+    traceback: Used to print errors raised by stage handlers
+"""
+
+import asyncio
+import traceback
+
+
+class Stage:
+    """
+    A named step of the pipeline.
+
+    The handler is called with each item and returns the item to pass to the next stage,
+    or None to drop it.
+
+    Args:
+        name (str): The stage name, used for stats and errors.
+        handler (function): Async function taking an item and returning an item or None.
+        workers (int): The number of items the stage works on at once.
+        queue_size (int): The most items waiting in front of the stage.
+    """
+
+    def __init__(self, name, handler, workers=1, queue_size=16):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue_size = queue_size
+
+        self.processed = 0
+        self.failed = 0
+
+
+class Pipeline:
+    """
+    Runs items through a list of stages connected by bounded queues.
+
+    Args:
+        stages (list): The stages, in the order items move through them.
+    """
+
+    def __init__(self, stages):
+        self.stages = stages
+        self.queues = []
+
+    async def worker(self, stage, in_queue, out_queue):
+        """
+        Takes items from a stage's queue, handles them and passes them on.
+
+        Args:
+            stage (Stage): The stage the worker belongs to.
+            in_queue (asyncio.Queue): The queue in front of the stage.
+            out_queue (asyncio.Queue): The queue of the next stage, or None if last.
+        """
+        while True:
+            item = await in_queue.get()
+
+            try:
+                result = await stage.handler(item)
+                stage.processed += 1
+
+                if result is not None and out_queue is not None:
+                    await out_queue.put(result)
+            except Exception:
+                stage.failed += 1
+                print(f"Pipeline stage {stage.name} failed:")
+                traceback.print_exc()
+            finally:
+                in_queue.task_done()
+
+    async def run(self, items):
+        """
+        Runs every item through the pipeline and waits for all of them to finish.
+
+        Args:
+            items (iterable): The items to feed to the first stage.
+        """
+        self.queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in self.stages]
+
+        workers = []
+        for index, stage in enumerate(self.stages):
+            out_queue = self.queues[index + 1] if index + 1 < len(self.queues) else None
+            workers.append(
+                [
+                    asyncio.create_task(self.worker(stage, self.queues[index], out_queue))
+                    for _ in range(stage.workers)
+                ]
+            )
+
+        try:
+            for item in items:
+                await self.queues[0].put(item)
+
+            # A stage is finished once its queue is drained, since every earlier
+            # stage has already finished putting items on it
+            for queue in self.queues:
+                await queue.join()
+        finally:
+            for stage_workers in workers:
+                for task in stage_workers:
+                    task.cancel()
+
+            await asyncio.gather(
+                *(task for stage_workers in workers for task in stage_workers),
+                return_exceptions=True,
+            )
+
+    def get_stats(self):
+        """
+        Gets the queue depth and item counts of every stage.
+
+        Returns:
+            dict: Maps each stage name to its workers, queue depth, processed and
+                failed counts.
+        """
+        return {
+            stage.name: {
+                "workers": stage.workers,
+                "queue_depth": self.queues[index].qsize() if self.queues else 0,
+                "processed": stage.processed,
+                "failed": stage.failed,
+            }
+            for index, stage in enumerate(self.stages)
+        }
@@ -0,0 +1,241 @@
+"""
+Ohio House Representatives Adaptive Rate Controller
+
+This script handles tuning the request rate while the scraper runs. The rate for a host
+is raised a little for every second the site keeps answering successfully (200 or 304)
+and cut in half whenever the site answers with a 429 or 503 (additive increase,
+multiplicative decrease). The increase is per second, not per response, so it does not
+speed up as the rate goes up, and the rate never goes past the hand-tuned rate unless a
+higher maximum is configured. Retry-After
+headers pause the host for as long as the site asks. The learned rate is saved to disk
+so the next run starts at the last rate known to be safe instead of the value found by
+hand with rate_limit_find.py. A rate cut only marks the rates as changed, a single task
+writes them from a thread so the event loop never waits on the disk and the saves land
+in order.
+
+Classes:
+    AdaptiveRateController: Adjusts a RequestScheduler's per host rates from responses.
+
+Functions:
+    def parse_retry_after(value): Converts a Retry-After header into seconds
+
+Libraries:
+    asyncio: Used to save the rates off the event loop
+    json: Used to save and load the learned rates
+    os: Used for file paths
+    time: Used to space out rate increases and decreases
+    parsedate_to_datetime: Used to read Retry-After dates
+    datetime, timezone: Used to compare Retry-After dates to now
+    urlsplit: Used to pull the host out of a url
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+
+def parse_retry_after(value):
+    """
+    Converts a Retry-After header into a number of seconds.
+
+    The header may either be a number of seconds or an HTTP date.
+
+    Args:
+        value (str): The Retry-After header value, or None.
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (retry_date - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveRateController:
+    """
+    Adjusts the request rate of each host using AIMD.
+
+    Several requests are in flight when the site starts refusing them, so only the
+    first refusal within the cooldown cuts the rate.
+
+    Args:
+        scheduler (RequestScheduler): The scheduler whose rates are adjusted.
+        state_file (str): Path of the json file the learned rates are kept in.
+        min_rate (float): Lowest rate (requests per second) the controller will use.
+        max_rate (float): Highest rate (requests per second) the controller will use,
+            or None for the scheduler's default rate.
+        increase (float): Requests per second added per second of successful responses.
+        decrease (float): Factor the rate is multiplied by after a 429 or 503.
+        cooldown (float): Seconds after a decrease during which refusals are ignored.
+    """
+
+    THROTTLE_STATUSES = (429, 503)
+
+    def __init__(
+        self,
+        scheduler,
+        state_file,
+        min_rate=0.2,
+        max_rate=None,
+        increase=0.01,
+        decrease=0.5,
+        cooldown=2.0,
+    ):
+        self.scheduler = scheduler
+        self.state_file = state_file
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else scheduler.rate
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.last_decrease = {}
+        self.last_increase = {}
+
+        # Set when the rates changed since the last save, picked up by the save task
+        self.dirty = False
+        self.save_task = None
+
+        self.load()
+
+    def load(self):
+        """
+        Applies the rates saved by an earlier run to the scheduler.
+        """
+        if not os.path.exists(self.state_file):
+            return
+
+        try:
+            with open(self.state_file, "r") as file:
+                rates = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Could not load saved request rates: {e}")
+            return
+
+        for host, rate in rates.items():
+            self.scheduler.set_rate(host, self.clamp(rate))
+
+    def get_rates(self):
+        """Returns the current rate of every host."""
+        return {host: bucket.rate for host, bucket in self.scheduler.buckets.items()}
+
+    def save(self, rates=None):
+        """
+        Writes the rate of every host to the state file.
+
+        Args:
+            rates (dict): The rates to write, or None for the current rates.
+        """
+        if rates is None:
+            rates = self.get_rates()
+
+        temp_file = self.state_file + ".tmp"
+        try:
+            with open(temp_file, "w") as file:
+                json.dump(rates, file)
+            os.replace(temp_file, self.state_file)
+        except OSError as e:
+            print(f"Could not save request rates: {e}")
+
+    def save_soon(self):
+        """
+        Marks the rates as changed and starts the save task if it is not running.
+
+        Without a running event loop the rates are saved right away.
+        """
+        self.dirty = True
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.dirty = False
+            self.save()
+            return
+
+        if self.save_task is None or self.save_task.done():
+            self.save_task = loop.create_task(self.save_pending())
+
+    async def save_pending(self):
+        """
+        Saves the rates from a thread until no changes are left. Rates changed during
+        a save are written by the next pass, so only one save runs at a time.
+        """
+        while self.dirty:
+            self.dirty = False
+            await asyncio.to_thread(self.save, self.get_rates())
+
+    async def flush(self):
+        """
+        Saves the current rates, waiting for the save task to finish. Called at the
+        end of a run so the rates raised by successful responses are kept too.
+        """
+        self.save_soon()
+        await self.save_task
+
+    def clamp(self, rate):
+        """
+        Keeps a rate between the minimum and maximum rate.
+
+        Args:
+            rate (float): The rate to clamp.
+
+        Returns:
+            float: The clamped rate.
+        """
+        return max(self.min_rate, min(self.max_rate, rate))
+
+    def record(self, url, status, retry_after=None):
+        """
+        Adjusts the host's rate based on the status of a response.
+
+        Args:
+            url (str): The url that was requested.
+            status (int): The HTTP status of the response.
+            retry_after (str): The Retry-After header of the response, if any.
+        """
+        host = urlsplit(url).hostname
+        bucket = self.scheduler.get_bucket(host)
+
+        if status in self.THROTTLE_STATUSES:
+            delay = parse_retry_after(retry_after)
+            if delay:
+                self.scheduler.pause(host, delay)
+
+            now = time.monotonic()
+            if now - self.last_decrease.get(host, 0.0) < self.cooldown:
+                return
+
+            self.last_decrease[host] = now
+            self.last_increase[host] = now
+            new_rate = self.clamp(bucket.rate * self.decrease)
+            print(
+                f"Received {status} from {host}. Lowering rate to {new_rate:.2f} requests/s"
+            )
+            self.scheduler.set_rate(host, new_rate)
+            self.save_soon()
+        elif status in (200, 304):
+            now = time.monotonic()
+            elapsed = now - self.last_increase.setdefault(host, now)
+
+            # Raised by the time since the last increase, not by the responses in it
+            if elapsed >= 1.0:
+                self.last_increase[host] = now
+                new_rate = self.clamp(bucket.rate + self.increase * elapsed)
+                self.scheduler.set_rate(host, new_rate)
@@ -0,0 +1,140 @@
+"""
+Ohio House Representatives Refresh Scheduler
+
+This script handles keeping the snapshot fresh in the background. Each field has its own
+refresh period, and the scheduler regularly checks which fields are older than their
+period and starts one scrape job for all of them. The job goes through the job registry,
+so it is shared with any client asking for the same fields and can reuse their recent
+results. Finished jobs are merged into the snapshot by the server, so a refresh and a
+client's scrape both keep the snapshot up to date.
+
+A field whose refresh did not update the snapshot is not tried again until the retry
+interval has passed. A field the saved snapshot already has waits a full period after
+the scheduler starts, so restarting the server does not start a scrape right away.
+
+Classes:
+    RefreshScheduler: Starts scrape jobs for the fields whose snapshot is too old.
+
+Libraries:
+    asyncio: Used for the scheduler task
+    logging: Used to log the refreshes
+    time: Used to time the refresh attempts
+"""
+
+import asyncio
+import logging
+import time
+
+
+class RefreshScheduler:
+    """
+    Starts scrape jobs for the fields whose snapshot is too old.
+
+    Args:
+        registry (JobRegistry): The registry jobs are started through.
+        store (SnapshotStore): The snapshot being kept fresh.
+        periods (dict): Maps each field to the seconds between its refreshes.
+        start_job (function): Starts a new job's task.
+        check_interval (float): Seconds between checks for fields that are due.
+        retry_interval (float): Seconds before a failed refresh is tried again.
+    """
+
+    def __init__(
+        self,
+        registry,
+        store,
+        periods,
+        start_job,
+        check_interval=60,
+        retry_interval=900,
+    ):
+        self.registry = registry
+        self.store = store
+        self.periods = periods
+        self.start_job = start_job
+        self.check_interval = check_interval
+        self.retry_interval = retry_interval
+
+        self.last_attempt = {}
+        self.task = None
+        self.started_at = None
+
+        self.refreshes = 0
+
+    def get_due_fields(self):
+        """
+        Gets the fields older than their refresh period. A field the snapshot has is
+        not due until a full period after the scheduler started.
+
+        Returns:
+            list: The fields to refresh.
+        """
+        now = time.time()
+        due = []
+
+        for field, period in self.periods.items():
+            age = self.store.get_age(field)
+            if age is not None and age < period:
+                continue
+
+            if age is not None and now - self.started_at < period:
+                continue
+
+            if now - self.last_attempt.get(field, 0) < self.retry_interval:
+                continue
+
+            due.append(field)
+
+        return due
+
+    async def refresh(self, fields):
+        """
+        Runs a scrape job for the fields and waits for it to finish.
+
+        Args:
+            fields (list): The fields to refresh.
+        """
+        now = time.time()
+        for field in fields:
+            self.last_attempt[field] = now
+
+        job, created = self.registry.get_job(fields, True)
+
+        if created:
+            self.start_job(job)
+
+        logging.info(f"Refreshing {fields} with scrape job {job.job_id}")
+        await job.done.wait()
+        self.refreshes += 1
+
+    async def run(self):
+        """
+        Checks for fields that are due until the scheduler is stopped.
+        """
+        while True:
+            try:
+                due = self.get_due_fields()
+                if due:
+                    await self.refresh(due)
+            except Exception as e:
+                logging.error(f"Background refresh failed: {e}")
+
+            await asyncio.sleep(self.check_interval)
+
+    def start(self):
+        """Starts the scheduler task."""
+        if self.task is None or self.task.done():
+            self.started_at = time.time()
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self):
+        """Stops the scheduler task."""
+        if self.task is not None:
+            self.task.cancel()
+
+    def get_stats(self):
+        """Returns the number of refreshes and the age of every field."""
+        return {
+            "refreshes": self.refreshes,
+            "field_ages": {field: self.store.get_age(field) for field in self.periods},
+        }
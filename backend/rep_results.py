@@ -0,0 +1,213 @@
+"""
+Ohio House Representatives Field Results
+
+This script handles tracking the results of a scrape per representative and field. Every
+(representative, field) pair is a unit with its own status: ok, retrying or failed. Only
+the failed units are retried, so an error on one page no longer makes the scraper fetch
+every page and call the AI again for the fields that worked. A retried unit's value is
+merged into the representative's record, and a good value is never replaced by an error.
+
+A unit's status comes from the retry scheduler: a unit that was just put on it is
+retrying, a unit it gave up on is failed and anything else is ok. Units that are ok are
+recorded in the run's journal, if it has one, so an interrupted run can be resumed.
+Units replayed from the journal or reused from an earlier job are not scraped again.
+
+Values are cleaned once, when they are recorded, so the records never have to be cleaned
+again before they are sent.
+
+Classes:
+    RepResults: The value and status of every (representative, field) unit of a run.
+
+Libraries:
+    Counter: Used to count the units by status
+
+Imports:
+    serialization.py
+        clean_value: Used to collapse the whitespace of a unit's value
+"""
+
+from collections import Counter
+
+from serialization import clean_value
+
+
+class RepResults:
+    """
+    The value and status of every (representative, field) unit of a run.
+
+    Each time a representative's record changes it is put on the result queue. In stream
+    mode that sends it right away, so a representative's values are only kept while one
+    of its units is retrying. Otherwise every record is kept for get_people.
+
+    Args:
+        fields (list): The fields scraped, in the order they were requested.
+        build_rep_obj (function): Maps a representative's field values onto its record.
+        error_queue (RetryScheduler): The scheduler the failed units are put on.
+        result_queue (ResultStream): Where changed records are sent, or None to keep them.
+        journal (RunJournal): The journal completed units are recorded in, or None.
+        reused (dict): Values of units an earlier job completed, by representative and
+            field, or None.
+    """
+
+    def __init__(
+        self,
+        fields,
+        build_rep_obj,
+        error_queue,
+        result_queue=None,
+        journal=None,
+        reused=None,
+    ):
+        self.fields = fields
+        self.build_rep_obj = build_rep_obj
+        self.error_queue = error_queue
+        self.result_queue = result_queue
+        self.journal = journal
+        self.reused = reused or {}
+
+        self.values = {}
+        self.status = {}
+
+        self.merged = 0
+
+    def get_unit_status(self, unit):
+        """
+        Gets the status of a unit from the retry scheduler.
+
+        Args:
+            unit (tuple): The representative's name and the field.
+
+        Returns:
+            str: ok, retrying or failed.
+        """
+        if unit in self.error_queue.scheduled:
+            return "retrying"
+
+        if unit in self.error_queue.failed:
+            return "failed"
+
+        return "ok"
+
+    def set_unit(self, rep_name, field, value):
+        """
+        Records the value of a unit.
+
+        A failed attempt only fills in a field that has no value yet, so a good value
+        from an earlier attempt is kept.
+
+        Args:
+            rep_name (str): The representative's name.
+            field (str): The field.
+            value: The value the field's function returned.
+        """
+        value = clean_value(value)
+        status = self.get_unit_status((rep_name, field))
+        rep_values = self.values.setdefault(rep_name, {})
+
+        if status == "ok" or field not in rep_values:
+            rep_values[field] = value
+
+        if status == "ok" and self.journal is not None:
+            self.journal.record(rep_name, field, value)
+
+        self.status[(rep_name, field)] = status
+
+    def get_journaled(self, rep_name):
+        """
+        Gets the values of a representative replayed from the journal or reused from
+        an earlier job.
+
+        Args:
+            rep_name (str): The representative's name.
+
+        Returns:
+            dict: Maps each field that is already done to its value.
+        """
+        reused = self.reused.get(rep_name, {})
+        values = {field: reused[field] for field in self.fields if field in reused}
+
+        if self.journal is not None:
+            values.update(self.journal.get_values(rep_name, self.fields))
+
+        return values
+
+    def add(self, rep_name, values):
+        """
+        Records the first attempt of every field of a representative.
+
+        Args:
+            rep_name (str): The representative's name.
+            values (dict): Maps each field to the value its function returned.
+        """
+        for field, value in values.items():
+            self.set_unit(rep_name, field, value)
+
+        self.emit(rep_name)
+
+    def merge(self, rep_name, field, value):
+        """
+        Merges a retried unit into its representative's record.
+
+        Args:
+            rep_name (str): The representative's name.
+            field (str): The retried field.
+            value: The value the field's function returned.
+        """
+        self.set_unit(rep_name, field, value)
+        self.merged += 1
+
+        self.emit(rep_name)
+
+    def is_retrying(self, rep_name):
+        """Returns True if one of the representative's units is waiting for a retry."""
+        return any(
+            self.status.get((rep_name, field)) == "retrying" for field in self.fields
+        )
+
+    def emit(self, rep_name):
+        """
+        Puts a representative's record on the result queue.
+
+        Args:
+            rep_name (str): The representative whose record changed.
+        """
+        if self.result_queue is None:
+            return
+
+        rep_obj = self.build_rep_obj(self.fields, self.values[rep_name])
+        self.result_queue.put({rep_name: rep_obj})
+
+        # A streamed record only has to be kept until its retries are done
+        if not self.is_retrying(rep_name):
+            del self.values[rep_name]
+
+    def get_people(self):
+        """
+        Gets the record of every representative.
+
+        Returns:
+            dict: Maps representative names to their records.
+        """
+        return {
+            rep_name: self.build_rep_obj(self.fields, rep_values)
+            for rep_name, rep_values in self.values.items()
+        }
+
+    def get_failed(self):
+        """
+        Gets the fields that still failed for each representative.
+
+        Returns:
+            dict: Maps representative names to their failed fields.
+        """
+        failed = {}
+
+        for (rep_name, field), status in self.status.items():
+            if status != "ok":
+                failed.setdefault(rep_name, []).append(field)
+
+        return {rep_name: sorted(fields) for rep_name, fields in sorted(failed.items())}
+
+    def get_stats(self):
+        """Returns the number of units by status and the number of merged retries."""
+        return {"units": dict(Counter(self.status.values())), "merged": self.merged}
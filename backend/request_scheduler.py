@@ -0,0 +1,225 @@
+"""
+Ohio House Representatives Request Scheduler
+
+This script handles spacing out the requests the scraper sends. Each host gets a token
+bucket that refills at a set rate and holds up to a set burst of tokens. A request waits
+only until its host has a token to start, so response bodies download concurrently and
+never hold up the requests behind them.
+
+Classes:
+    TokenBucket: Rate and burst state for a single host.
+    RequestScheduler: Hands out request start times per host and tracks wait statistics.
+
+Libraries:
+    asyncio: Used for sleeping until a request may start
+    time: Used for a monotonic clock
+    urlsplit: Used to pull the host out of a url
+"""
+
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """
+    Token bucket for a single host.
+
+    Tokens are allowed to go negative. A negative balance is the number of requests that
+    have reserved a start time but are still waiting for it, which keeps every acquire
+    O(1) and first come first served without a lock.
+
+    A bucket can also be paused until a point in time (e.g. for a Retry-After header).
+    Pausing bumps the generation so requests that reserved earlier take a new slot.
+
+    Args:
+        rate (float): Tokens added per second (requests per second).
+        burst (int): The most tokens the bucket can hold.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.generation = 0
+
+        # Statistics
+        self.requests = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.first_request = None
+        self.last_request = None
+
+    def refill(self, now):
+        """
+        Adds the tokens earned since the last update, capped at the burst size.
+
+        Args:
+            now (float): The current monotonic time.
+        """
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def reserve(self):
+        """
+        Takes a token and returns how long the caller must wait before starting.
+
+        Returns:
+            float: Seconds to wait before the request may start.
+        """
+        now = time.monotonic()
+        start = max(now, self.blocked_until)
+        self.refill(start)
+        self.tokens -= 1
+
+        return (start - now) + max(0.0, -self.tokens / self.rate)
+
+    def pause(self, seconds):
+        """
+        Stops requests from starting for the given number of seconds.
+
+        Args:
+            seconds (float): How long to hold off requests.
+        """
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+        # Forget earlier reservations and restart with a single token after the pause
+        self.tokens = 1
+        self.updated = self.blocked_until
+        self.generation += 1
+
+
+class RequestScheduler:
+    """
+    Controls when requests start, using one token bucket per host.
+
+    Args:
+        rate (float): Default requests per second for each host.
+        burst (int): Default number of requests a host may start back to back.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+
+    def get_bucket(self, host):
+        """
+        Gets the bucket for a host, creating it with the default rate if needed.
+
+        Args:
+            host (str): The host name.
+
+        Returns:
+            TokenBucket: The bucket for the host.
+        """
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+
+        return self.buckets[host]
+
+    def set_rate(self, host, rate, burst=None):
+        """
+        Changes the rate (and optionally the burst) used for a host.
+
+        Args:
+            host (str): The host name.
+            rate (float): Requests per second.
+            burst (int): Number of requests that may start back to back.
+        """
+        bucket = self.get_bucket(host)
+        bucket.refill(time.monotonic())
+        bucket.rate = rate
+
+        if burst is not None:
+            bucket.burst = burst
+            bucket.tokens = min(bucket.tokens, burst)
+
+    def pause(self, host, seconds):
+        """
+        Stops requests to a host from starting for the given number of seconds.
+
+        Args:
+            host (str): The host name.
+            seconds (float): How long to hold off requests.
+        """
+        self.get_bucket(host).pause(seconds)
+
+    async def acquire(self, url):
+        """
+        Waits until a request to the url's host is allowed to start.
+
+        Args:
+            url (str): The url about to be requested.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        bucket = self.get_bucket(urlsplit(url).hostname)
+        requested = time.monotonic()
+
+        while True:
+            generation = bucket.generation
+            wait = bucket.reserve()
+
+            if wait <= 0:
+                break
+
+            bucket.waiting += 1
+            bucket.max_waiting = max(bucket.max_waiting, bucket.waiting)
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                bucket.waiting -= 1
+
+            # Reserve again if the host was paused while waiting
+            if generation == bucket.generation:
+                break
+
+        now = time.monotonic()
+        wait = now - requested
+        if bucket.first_request is None:
+            bucket.first_request = now
+        bucket.last_request = now
+        bucket.requests += 1
+        bucket.total_wait += wait
+        bucket.max_wait = max(bucket.max_wait, wait)
+
+        return wait
+
+    def get_stats(self):
+        """
+        Gets the queue depth and wait time statistics for every host.
+
+        The achieved rate is measured between the first and last request start, so it
+        can be compared directly against the configured rate.
+
+        Returns:
+            dict: Maps each host to a dict of its statistics.
+        """
+        stats = {}
+
+        for host, bucket in self.buckets.items():
+            achieved_rate = 0.0
+            if bucket.requests > 1 and bucket.last_request > bucket.first_request:
+                achieved_rate = (bucket.requests - 1) / (
+                    bucket.last_request - bucket.first_request
+                )
+
+            stats[host] = {
+                "rate": bucket.rate,
+                "burst": bucket.burst,
+                "requests": bucket.requests,
+                "queue_depth": bucket.waiting,
+                "max_queue_depth": bucket.max_waiting,
+                "avg_wait": bucket.total_wait / bucket.requests if bucket.requests else 0.0,
+                "max_wait": bucket.max_wait,
+                "achieved_rate": achieved_rate,
+            }
+
+        return stats
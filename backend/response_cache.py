@@ -0,0 +1,449 @@
+"""
+Ohio House Representatives Response Cache
+
+This script handles caching the pages the scraper downloads. Pages are kept in two tiers:
+a small in-memory LRU with a short TTL, and a persistent on-disk store holding the body,
+ETag, Last-Modified and fetch time of every page. Pages that are still fresh (per url
+pattern TTL) are served without a request. Stale pages are revalidated with
+If-None-Match/If-Modified-Since so an unchanged page only costs a 304. The default TTLs
+are only a few minutes, long enough for the jobs of one session to share pages, so a
+later run revalidates every page instead of trusting a copy that may be days old.
+
+The on-disk store is pruned at the end of every run: pages not fetched or revalidated
+for longer than its max age are deleted, then the oldest pages over its max files.
+
+The values parsed out of a cached page are kept in memory too, keyed by the url, the
+parser and the page's validators. A page served from the cache or revalidated with a 304
+has the same validators, so its values are reused instead of parsing it again. A page
+downloaded again gets new validators and is parsed.
+
+Classes:
+    CacheEntry: A cached page and its validators.
+    MemoryCache: In-memory LRU with a TTL.
+    DiskCache: Persistent store of one json file per url.
+    ResponseCache: Combines both tiers and decides freshness.
+
+Libraries:
+    asyncio: Used to keep disk access off the event loop
+    hashlib: Used to name cache files
+    json: Used to store entries on disk
+    os: Used for file paths
+    re: Used to match urls to TTLs
+    time: Used for fetch times
+    OrderedDict: Used for the LRU ordering
+
+Global Variables:
+    DEFAULT_TTLS: Seconds a page stays fresh, by url pattern
+    CACHE_MODES: The supported cache modes
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+
+# Checked in order, first match wins
+DEFAULT_TTLS = [
+    (r"/members/directory", 5 * 60),
+    (r"/members/[^/]+/legislation$", 5 * 60),
+    (r"/members/[^/]+/committees$", 5 * 60),
+    (r"/members/[^/]+/biography$", 5 * 60),
+    (r"/members/[^/]+$", 5 * 60),
+]
+
+# normal: serve fresh pages, revalidate stale ones
+# offline: only serve from the cache, never send a request
+# off: never read or write the cache
+CACHE_MODES = ("normal", "offline", "off")
+
+
+class CacheEntry:
+    """
+    A cached page and the validators needed to revalidate it.
+
+    Args:
+        url (str): The url of the page.
+        body (str): The html content of the page.
+        etag (str): The ETag header of the response, if any.
+        last_modified (str): The Last-Modified header of the response, if any.
+        fetched_at (float): Unix time the page was last fetched or revalidated.
+    """
+
+    def __init__(self, url, body, etag=None, last_modified=None, fetched_at=None):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+    def to_dict(self):
+        """Returns the entry as a json serializable dict."""
+        return {
+            "url": self.url,
+            "body": self.body,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "fetched_at": self.fetched_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds an entry from a dict made by to_dict."""
+        return cls(
+            data["url"],
+            data["body"],
+            data.get("etag"),
+            data.get("last_modified"),
+            data.get("fetched_at"),
+        )
+
+
+class MemoryCache:
+    """
+    In-memory LRU of cache entries that expire after a TTL.
+
+    Args:
+        max_entries (int): The most entries kept before the oldest is evicted.
+        ttl (float): Seconds an entry is kept in memory.
+    """
+
+    def __init__(self, max_entries=512, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+
+    def get(self, url):
+        """Returns the entry for a url, or None if it is missing or expired."""
+        item = self.entries.get(url)
+
+        if item is None:
+            return None
+
+        stored_at, entry = item
+        if time.monotonic() - stored_at > self.ttl:
+            del self.entries[url]
+            return None
+
+        self.entries.move_to_end(url)
+        return entry
+
+    def put(self, entry):
+        """Adds an entry, evicting the least recently used ones if full."""
+        self.entries[entry.url] = (time.monotonic(), entry)
+        self.entries.move_to_end(entry.url)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+class DiskCache:
+    """
+    Persistent store of cache entries, one json file per url.
+
+    Args:
+        directory (str): The folder the entries are written to.
+        max_files (int): The most entries kept, the least recently written are
+            deleted first.
+        max_age (float): Seconds an entry is kept after it was last written.
+    """
+
+    def __init__(self, directory, max_files=5000, max_age=30 * 24 * 60 * 60):
+        self.directory = directory
+        self.max_files = max_files
+        self.max_age = max_age
+
+    def path(self, url):
+        """Returns the file an entry for the url is stored in."""
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{name}.json")
+
+    def load(self, url):
+        """Reads the entry for a url, or None if it is not stored."""
+        try:
+            with open(self.path(url), "r", encoding="utf-8") as file:
+                return CacheEntry.from_dict(json.load(file))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not read cache entry for {url}: {e}")
+            return None
+
+    def save(self, entry):
+        """Writes an entry, replacing the file atomically."""
+        os.makedirs(self.directory, exist_ok=True)
+
+        path = self.path(entry.url)
+        temp_path = path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(entry.to_dict(), file)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Could not write cache entry for {entry.url}: {e}")
+
+    def prune(self):
+        """
+        Deletes the entries older than max_age and the oldest over max_files.
+
+        Returns:
+            int: The number of entries deleted.
+        """
+        try:
+            names = [
+                name for name in os.listdir(self.directory) if name.endswith(".json")
+            ]
+        except OSError:
+            return 0
+
+        expired = time.time() - self.max_age
+        entries = []
+        deleted = 0
+
+        for name in names:
+            path = os.path.join(self.directory, name)
+
+            try:
+                written = os.path.getmtime(path)
+
+                if written < expired:
+                    os.remove(path)
+                    deleted += 1
+                else:
+                    entries.append((written, path))
+            except OSError:
+                continue
+
+        entries.sort()
+
+        for _, path in entries[: max(0, len(entries) - self.max_files)]:
+            try:
+                os.remove(path)
+                deleted += 1
+            except OSError:
+                continue
+
+        return deleted
+
+
+class ResponseCache:
+    """
+    Two tier response cache used by fetch_data.
+
+    Args:
+        directory (str): The folder the on-disk tier is written to.
+        ttls (list): (pattern, seconds) pairs deciding how long a page stays fresh.
+        mode (str): One of CACHE_MODES.
+        memory_entries (int): The size of the in-memory tier.
+        memory_ttl (float): Seconds an entry is kept in the in-memory tier.
+        disk_files (int): The most entries kept in the on-disk tier.
+        disk_max_age (float): Seconds an entry is kept in the on-disk tier.
+        parsed_entries (int): The most parsed values kept before the oldest is evicted.
+    """
+
+    def __init__(
+        self,
+        directory,
+        ttls=None,
+        mode="normal",
+        memory_entries=512,
+        memory_ttl=300,
+        disk_files=5000,
+        disk_max_age=30 * 24 * 60 * 60,
+        parsed_entries=2048,
+    ):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {mode}")
+
+        self.mode = mode
+        self.ttls = [
+            (re.compile(pattern), seconds)
+            for pattern, seconds in (ttls if ttls is not None else DEFAULT_TTLS)
+        ]
+        self.memory = MemoryCache(memory_entries, memory_ttl)
+        self.disk = DiskCache(directory, disk_files, disk_max_age)
+        self.parsed_entries = parsed_entries
+        self.parsed = OrderedDict()
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.parsed_hits = 0
+        self.pruned = 0
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    @property
+    def offline(self):
+        return self.mode == "offline"
+
+    def get_ttl(self, url):
+        """
+        Gets the number of seconds a page stays fresh.
+
+        Args:
+            url (str): The url of the page.
+
+        Returns:
+            float: The TTL of the first matching pattern, or 0 if none match.
+        """
+        for pattern, seconds in self.ttls:
+            if pattern.search(url):
+                return seconds
+
+        return 0
+
+    def is_fresh(self, entry):
+        """Returns True if the entry can be served without revalidating it."""
+        return time.time() - entry.fetched_at < self.get_ttl(entry.url)
+
+    async def get(self, url):
+        """
+        Gets the cached entry for a url, checking memory before disk.
+
+        Args:
+            url (str): The url of the page.
+
+        Returns:
+            CacheEntry: The cached entry, or None if the page is not cached.
+        """
+        if not self.enabled:
+            return None
+
+        entry = self.memory.get(url)
+
+        if entry is None:
+            entry = await asyncio.to_thread(self.disk.load, url)
+            if entry is not None:
+                self.memory.put(entry)
+
+        return entry
+
+    async def store(self, url, body, etag=None, last_modified=None):
+        """
+        Caches a freshly downloaded page in both tiers.
+
+        Args:
+            url (str): The url of the page.
+            body (str): The html content of the page.
+            etag (str): The ETag header of the response, if any.
+            last_modified (str): The Last-Modified header of the response, if any.
+        """
+        if not self.enabled:
+            return
+
+        entry = CacheEntry(url, body, etag, last_modified)
+        self.memory.put(entry)
+        await asyncio.to_thread(self.disk.save, entry)
+
+    async def refresh(self, entry):
+        """
+        Marks a cached page as revalidated after a 304 response.
+
+        Args:
+            entry (CacheEntry): The entry that was revalidated.
+        """
+        entry.fetched_at = time.time()
+        self.memory.put(entry)
+        await asyncio.to_thread(self.disk.save, entry)
+
+    async def prune(self):
+        """
+        Deletes the on-disk entries past its max age and max files, off the event loop.
+        """
+        if self.enabled:
+            self.pruned += await asyncio.to_thread(self.disk.prune)
+
+    def get_conditional_headers(self, entry):
+        """
+        Builds the headers used to revalidate a cached page.
+
+        Args:
+            entry (CacheEntry): The cached entry, or None.
+
+        Returns:
+            dict: If-None-Match/If-Modified-Since headers for the entry.
+        """
+        headers = {}
+
+        if entry is None:
+            return headers
+
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        return headers
+
+    def get_parsed_key(self, url, body, parser_name):
+        """
+        Builds the key a page's parsed value is kept under.
+
+        Args:
+            url (str): The url of the page.
+            body (str): The html content that is about to be parsed.
+            parser_name (str): The name of the parser.
+
+        Returns:
+            tuple: The url, parser and validators of the cached page, or None if the
+                body is not the cached page or the page has no validators.
+        """
+        entry = self.memory.get(url) if self.enabled else None
+
+        if entry is None or not (entry.etag or entry.last_modified):
+            return None
+
+        if entry.body is not body and entry.body != body:
+            return None
+
+        return url, parser_name, entry.etag, entry.last_modified
+
+    def get_parsed(self, key):
+        """
+        Gets the parsed value kept under a key.
+
+        Args:
+            key (tuple): A key made by get_parsed_key.
+
+        Returns:
+            tuple: True and the value, or False and None if it is not kept.
+        """
+        if key is None or key not in self.parsed:
+            return False, None
+
+        self.parsed.move_to_end(key)
+        self.parsed_hits += 1
+        return True, self.parsed[key]
+
+    def put_parsed(self, key, value):
+        """
+        Keeps a parsed value, evicting the least recently used ones if full.
+
+        Args:
+            key (tuple): A key made by get_parsed_key, or None to skip.
+            value: The value returned by the parser.
+        """
+        if key is None:
+            return
+
+        self.parsed[key] = value
+        self.parsed.move_to_end(key)
+
+        while len(self.parsed) > self.parsed_entries:
+            self.parsed.popitem(last=False)
+
+    def get_stats(self):
+        """Returns the hit, revalidation and miss counts."""
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "parsed_hits": self.parsed_hits,
+            "pruned": self.pruned,
+        }
@@ -0,0 +1,86 @@
+"""
+Ohio House Representatives Result Stream
+
+This script handles sending each representative's record to the frontend as soon as it
+is finished, instead of collecting every record and sending one large json at the end.
+Every record goes out as its own result message with a sequence number, and once the
+scrape is done a manifest message says how many results were sent, which representatives
+they covered and which fields still failed. Records are not kept after they are sent.
+
+A representative whose field is retried after an error is sent again, with the retried
+field merged in and a higher sequence number, so the frontend keeps the record with the
+highest sequence number.
+
+Classes:
+    ResultStream: Drop in replacement for the result queue that sends each record.
+
+Libraries:
+    time: Used to time the stream
+
+Imports:
+    serialization.py
+        create_msg: Used to format the result and manifest messages
+"""
+
+import time
+
+from serialization import create_msg
+
+
+class ResultStream:
+    """
+    Sends each representative's record to the frontend as it is finished.
+
+    Has the same put method as the result queue, so the scraper stages can hand it
+    their results without knowing whether they are streamed.
+
+    Args:
+        add_to_ui_queue (function): A function to send messages to the frontend.
+    """
+
+    def __init__(self, add_to_ui_queue):
+        self.add_to_ui_queue = add_to_ui_queue
+        self.seq = 0
+        self.rep_names = set()
+        self.started = time.monotonic()
+        self.first_result = None
+
+    def put(self, result):
+        """
+        Sends the records of a result as result messages.
+
+        Args:
+            result (dict): Maps a representative's name to their record.
+        """
+        for rep_name, rep_obj in result.items():
+            self.seq += 1
+            self.rep_names.add(rep_name)
+
+            if self.first_result is None:
+                self.first_result = time.monotonic() - self.started
+
+            self.add_to_ui_queue(
+                create_msg("result", {rep_name: rep_obj}, seq=self.seq)
+            )
+
+    def send_manifest(self, fields, failed):
+        """
+        Sends the final message of the stream.
+
+        Args:
+            fields (list): The fields that were scraped.
+            failed (dict): Maps representatives that still had errors to their failed fields.
+        """
+        manifest = {
+            "results": self.seq,
+            "last_seq": self.seq,
+            "rep_count": len(self.rep_names),
+            "rep_names": sorted(self.rep_names),
+            "fields": fields,
+            "failed": sorted(failed),
+            "failed_fields": failed,
+            "first_result_seconds": self.first_result,
+            "elapsed_seconds": time.monotonic() - self.started,
+        }
+
+        self.add_to_ui_queue(create_msg("manifest", manifest))
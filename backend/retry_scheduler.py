@@ -0,0 +1,238 @@
+"""
+Ohio House Representatives Retry Scheduler
+
+This script handles retrying the units of work that failed during a scrape. Every failure
+is reported with an error class (rate limited, server error, timeout, AI format, ...) and
+each class has its own retry policy: an exponential backoff with jitter and a max number
+of attempts. Retries wait for their own backoff and then run concurrently, instead of one
+at a time behind a fixed sleep, so a wave of failures costs about one backoff instead of
+one sleep per unit. The request scheduler still paces the requests the retries send.
+
+Retries only become eligible once the scheduler is started, after the first attempt of
+every unit. The backoff is counted from then, or from the failure if it came later, so
+units that failed early in the run still wait their class's delay instead of all firing
+at once.
+
+A run level budget caps the total number of retries, and a unit that keeps failing stops
+after its policy's max attempts, so it can not use up the budget for everyone else.
+
+Classes:
+    RetryPolicy: Exponential backoff with jitter and a max number of attempts.
+    RetryScheduler: Drop in replacement for the error queue that schedules retries.
+
+Functions:
+    def classify_status(status): Gets the error class of an HTTP status code
+
+Libraries:
+    asyncio: Used to wait for the backoffs and run the retries
+    random: Used for the jitter
+    traceback: Used to print errors raised by retries
+    Counter: Used to count the errors by class
+
+Global Variables:
+    DEFAULT_RETRY_POLICIES: The retry policy of each error class
+"""
+
+import asyncio
+import random
+import traceback
+from collections import Counter
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with jitter and a max number of attempts.
+
+    The delay before attempt n is drawn between half and all of
+    min(max_delay, base_delay * factor ** (n - 1)), so retries of units that failed
+    together are spread out but still back off.
+
+    Args:
+        base_delay (float): Seconds before the first retry, before jitter.
+        max_delay (float): The longest delay, before jitter.
+        max_attempts (int): The most retries of one unit.
+        factor (float): How much the delay grows with each attempt.
+    """
+
+    def __init__(self, base_delay, max_delay, max_attempts, factor=2.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.factor = factor
+
+    def get_delay(self, attempt):
+        """
+        Gets the delay before an attempt.
+
+        Args:
+            attempt (int): The number of the retry, starting at 1.
+
+        Returns:
+            float: Seconds to wait before the retry.
+        """
+        ceiling = min(self.max_delay, self.base_delay * self.factor ** (attempt - 1))
+
+        return random.uniform(ceiling / 2, ceiling)
+
+
+DEFAULT_RETRY_POLICIES = {
+    "rate_limited": RetryPolicy(10, 120, 5),
+    "server": RetryPolicy(5, 60, 4),
+    "timeout": RetryPolicy(2, 30, 4),
+    "connection": RetryPolicy(2, 30, 4),
+    "response": RetryPolicy(5, 30, 2),
+    "ai_format": RetryPolicy(1, 10, 3),
+    "ai_error": RetryPolicy(10, 120, 4),
+    "parse": RetryPolicy(5, 30, 2),
+}
+
+
+def classify_status(status):
+    """
+    Gets the error class of an HTTP status code.
+
+    Args:
+        status (int): The response status code.
+
+    Returns:
+        str: rate_limited for 429, server for 5xx and response for anything else.
+    """
+    if status == 429:
+        return "rate_limited"
+
+    if 500 <= status < 600:
+        return "server"
+
+    return "response"
+
+
+class RetryScheduler:
+    """
+    Schedules a retry for every unit put on it, following its error class's policy.
+
+    Has the same put method as the error queue, so the scraper's functions can report
+    failures without knowing how they are retried. Retries only start once start or
+    join is called, so a unit is not retried while its first attempt is still running.
+
+    Args:
+        retry (function): Async function that retries a unit.
+        policies (dict): Maps each error class to its RetryPolicy.
+        budget (int): The most retries in the run.
+        concurrency (int): The most retries running at once.
+        on_give_up (function): Called with the unit, error class and reason ("attempts"
+            or "budget") when a unit will not be retried again.
+    """
+
+    def __init__(
+        self, retry, policies=None, budget=75, concurrency=8, on_give_up=None
+    ):
+        self.retry = retry
+        self.policies = policies or DEFAULT_RETRY_POLICIES
+        self.budget = budget
+        self.on_give_up = on_give_up
+
+        self.attempts = {}
+        self.scheduled = {}
+        self.failed = {}
+        self.tasks = set()
+
+        self.started = asyncio.Event()
+        self.concurrency = asyncio.Semaphore(concurrency)
+
+        self.used = 0
+        self.errors = Counter()
+
+    def put(self, unit, error_class="response"):
+        """
+        Reports a failed unit and schedules its retry.
+
+        A unit that already has a retry waiting is not scheduled twice.
+
+        Args:
+            unit: The unit that failed, such as a (representative, field) pair.
+            error_class (str): The kind of error, one of the policies' keys.
+        """
+        self.errors[error_class] += 1
+
+        if unit in self.scheduled or unit in self.failed:
+            return
+
+        policy = self.policies.get(error_class, self.policies["response"])
+        attempt = self.attempts.get(unit, 0) + 1
+
+        if attempt > policy.max_attempts:
+            self.give_up(unit, error_class, "attempts")
+            return
+
+        if self.used >= self.budget:
+            self.give_up(unit, error_class, "budget")
+            return
+
+        self.used += 1
+        self.attempts[unit] = attempt
+        self.scheduled[unit] = error_class
+
+        task = asyncio.create_task(self.run_retry(unit, policy.get_delay(attempt)))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def give_up(self, unit, error_class, reason):
+        """
+        Stops retrying a unit.
+
+        Args:
+            unit: The unit that failed.
+            error_class (str): The kind of its last error.
+            reason (str): "attempts" or "budget".
+        """
+        self.failed[unit] = error_class
+
+        if self.on_give_up:
+            self.on_give_up(unit, error_class, reason)
+
+    async def run_retry(self, unit, delay):
+        """
+        Waits until retries may start, then for the unit's backoff, and retries it.
+
+        Args:
+            unit: The unit to retry.
+            delay (float): Seconds of backoff, counted once retries may start.
+        """
+        await self.started.wait()
+        await asyncio.sleep(delay)
+
+        async with self.concurrency:
+            # Failures during this attempt schedule the next one
+            del self.scheduled[unit]
+
+            try:
+                await self.retry(unit)
+            except Exception:
+                print(f"Retry of {unit} failed:")
+                traceback.print_exc()
+
+    def pending(self):
+        """Returns the number of units waiting for a retry."""
+        return len(self.scheduled)
+
+    def start(self):
+        """Lets the scheduled retries start once their backoff ends."""
+        self.started.set()
+
+    async def join(self):
+        """
+        Starts the retries and waits until no unit is waiting for one.
+        """
+        self.start()
+
+        while self.tasks:
+            await asyncio.gather(*list(self.tasks), return_exceptions=True)
+
+    def get_stats(self):
+        """Returns the retries used, the errors by class and the units given up on."""
+        return {
+            "retries": self.used,
+            "budget": self.budget,
+            "errors": dict(self.errors),
+            "failed": len(self.failed),
+        }
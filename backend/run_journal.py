@@ -0,0 +1,304 @@
+"""
+Ohio House Representatives Run Journal
+
+This script handles keeping a crash safe record of a scrape run. Every run appends one
+line per completed (representative, field) unit, with its value, to its own journal file.
+If the server restarts or the process is killed in the middle of a run, the journal is
+still on disk, and a resume_run command replays it so only the missing units are scraped.
+
+The journal is append only. Completed units are collected and a single task writes them
+from a thread, a batch at a time, flushing after each batch, so the event loop never
+waits on the disk and a crash loses at most the units of the batch being written. A
+partial last line is skipped when the journal is read.
+The journal of a run that finishes is deleted, since its results are in the snapshot.
+
+Classes:
+    RunJournal: The append only journal of one scrape run.
+
+Functions:
+    def get_latest_run_id(directory): Gets the id of the most recent unfinished run
+    def prune_journals(directory, ttl): Deletes journals too old to resume
+
+Libraries:
+    asyncio: Used to write the journal off the event loop
+    itertools: Used to number the runs
+    json: Used to read and write the journal lines
+    os: Used to list and delete journals
+    time: Used to name runs and expire old journals
+    threading: Used to keep the journal from being closed during a write
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+
+run_counter = itertools.count(1)
+
+
+class RunJournal:
+    """
+    The append only journal of one scrape run.
+
+    Use RunJournal.create for a new run and RunJournal.open to resume one.
+
+    Args:
+        directory (str): The folder the journals are kept in.
+        run_id (str): The id of the run.
+        fields (list): The fields the run scrapes.
+    """
+
+    def __init__(self, directory, run_id, fields):
+        self.directory = directory
+        self.run_id = run_id
+        self.fields = fields
+        self.path = os.path.join(directory, f"{run_id}.jsonl")
+
+        self.values = {}
+        self.file = None
+
+        # Units recorded but not written yet, picked up by the write task
+        self.pending = []
+        self.write_task = None
+        self.lock = threading.Lock()
+
+        self.recorded = 0
+        self.replayed = 0
+
+    @classmethod
+    def create(cls, directory, fields):
+        """
+        Starts the journal of a new run.
+
+        Args:
+            directory (str): The folder the journals are kept in.
+            fields (list): The fields the run scrapes.
+
+        Returns:
+            RunJournal: The new journal.
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(run_counter)}"
+        journal = cls(directory, run_id, list(fields))
+
+        journal.file = open(journal.path, "a", encoding="utf-8")
+        journal.write({"type": "run", "run_id": run_id, "fields": journal.fields})
+
+        return journal
+
+    @classmethod
+    def open(cls, directory, run_id):
+        """
+        Opens the journal of an interrupted run and replays it.
+
+        Args:
+            directory (str): The folder the journals are kept in.
+            run_id (str): The id of the run.
+
+        Returns:
+            RunJournal: The journal with the values of every completed unit, or None if
+                there is no such run.
+        """
+        # Run ids come from clients, so they must not point outside the folder
+        if not run_id or os.path.basename(run_id) != run_id:
+            return None
+
+        path = os.path.join(directory, f"{run_id}.jsonl")
+
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                lines = file.readlines()
+        except OSError:
+            return None
+
+        journal = None
+
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # The line being written when the run was interrupted
+                continue
+
+            if entry.get("type") == "run":
+                journal = cls(directory, run_id, entry["fields"])
+            elif entry.get("type") == "unit" and journal is not None:
+                journal.values.setdefault(entry["rep"], {})[entry["field"]] = entry[
+                    "value"
+                ]
+                journal.replayed += 1
+
+        if journal is None:
+            return None
+
+        journal.file = open(path, "a", encoding="utf-8")
+
+        # Make sure the next line does not continue a partial one
+        if lines and not lines[-1].endswith("\n"):
+            journal.file.write("\n")
+            journal.file.flush()
+
+        return journal
+
+    def write(self, entry):
+        """
+        Appends a line to the journal and flushes it.
+
+        Args:
+            entry (dict): The line to write.
+        """
+        self.write_entries([entry])
+
+    def write_entries(self, entries):
+        """
+        Appends a line per entry to the journal and flushes them. Runs in a thread.
+
+        Args:
+            entries (list): The lines to write.
+        """
+        with self.lock:
+            if self.file is None:
+                return
+
+            self.file.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            self.file.flush()
+
+    async def write_pending(self):
+        """
+        Writes the recorded units from a thread until none are left, one batch at a
+        time so the lines stay in order.
+        """
+        while self.pending:
+            entries, self.pending = self.pending, []
+            await asyncio.to_thread(self.write_entries, entries)
+
+    async def flush(self):
+        """Waits until every recorded unit is written."""
+        if self.write_task is not None:
+            await self.write_task
+
+    def has_unit(self, rep_name, field):
+        """Returns True if the unit is already in the journal."""
+        return field in self.values.get(rep_name, {})
+
+    def record(self, rep_name, field, value):
+        """
+        Records a completed unit and starts the write task if it is not running.
+
+        Args:
+            rep_name (str): The representative's name.
+            field (str): The field.
+            value: The value the field's function returned.
+        """
+        if self.file is None or self.has_unit(rep_name, field):
+            return
+
+        self.values.setdefault(rep_name, {})[field] = value
+        self.pending.append(
+            {"type": "unit", "rep": rep_name, "field": field, "value": value}
+        )
+        self.recorded += 1
+
+        if self.write_task is None or self.write_task.done():
+            self.write_task = asyncio.get_running_loop().create_task(
+                self.write_pending()
+            )
+
+    def get_values(self, rep_name, fields):
+        """
+        Gets the journaled values of a representative.
+
+        Args:
+            rep_name (str): The representative's name.
+            fields (list): The fields wanted.
+
+        Returns:
+            dict: Maps each journaled field to its value.
+        """
+        rep_values = self.values.get(rep_name, {})
+
+        return {field: rep_values[field] for field in fields if field in rep_values}
+
+    def close(self):
+        """
+        Writes the units still waiting, closes the journal and keeps it so the run can
+        be resumed. Called after flush, in a thread.
+        """
+        entries, self.pending = self.pending, []
+
+        if entries:
+            self.write_entries(entries)
+
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def finish(self):
+        """Closes and deletes the journal of a finished run."""
+        self.pending = []
+        self.close()
+
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def get_stats(self):
+        """Returns the run id and the number of units recorded and replayed."""
+        return {
+            "run_id": self.run_id,
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+        }
+
+
+def get_latest_run_id(directory):
+    """
+    Gets the id of the most recent unfinished run.
+
+    Args:
+        directory (str): The folder the journals are kept in.
+
+    Returns:
+        str: The run id, or None if there is no journal.
+    """
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith(".jsonl")]
+    except OSError:
+        return None
+
+    if not names:
+        return None
+
+    latest = max(names, key=lambda name: os.path.getmtime(os.path.join(directory, name)))
+
+    return latest[: -len(".jsonl")]
+
+
+def prune_journals(directory, ttl):
+    """
+    Deletes journals that were not written to for longer than the ttl.
+
+    Args:
+        directory (str): The folder the journals are kept in.
+        ttl (float): Seconds an unfinished run can be resumed for.
+    """
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+
+    now = time.time()
+
+    for name in names:
+        path = os.path.join(directory, name)
+
+        try:
+            if name.endswith(".jsonl") and now - os.path.getmtime(path) > ttl:
+                os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,152 @@
+"""
+Ohio House Representatives Run Profiler
+
+This script handles profiling a single scrape run when it is slow in production, without
+redeploying. While a run is profiled cProfile records every function called on the event
+loop thread and tracemalloc traces every allocation. Once the run ends the profile is
+saved as a pstats file, and a text report is written next to it with the functions that
+took the most time, the time spent in the page parsers and BeautifulSoup, and the lines
+that allocated the most memory during the run. The final results are encoded after the
+run returns, or not at all when they are streamed, so they are not in the profile.
+
+cProfile only sees the thread it is enabled on, so the profiled run parses on the event
+loop instead of the parse pool. Other runs keep parsing in the pool, but their work on
+the loop at the same time is included in the profile too.
+
+Classes:
+    RunProfiler: Profiles the CPU time and allocations of one run and saves the artifacts.
+
+Libraries:
+    cProfile, pstats: Used to profile the CPU time of the run
+    tracemalloc: Used to compare the allocations before and after the run
+    io: Used to write the pstats tables into the report
+    os: Used to name and save the artifacts
+    time: Used to name the artifacts and time the run
+
+Global Variables:
+    HOT_SPOTS: The report's sections on the code known to be hot, with the functions each
+        lists and how they are sorted
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+
+HOT_SPOTS = [
+    ("Page parsers by cumulative time", r"parsers\.py", "cumulative"),
+    ("BeautifulSoup by own time", r"[/\\]bs4[/\\]", "tottime"),
+]
+
+
+class RunProfiler:
+    """
+    Profiles the CPU time and allocations of one run and saves the artifacts.
+
+    Args:
+        directory (str): The folder the artifacts are saved in.
+        top (int): The number of functions and allocation sites in the report.
+        label (str): Added to the artifact names, such as the run's fields.
+    """
+
+    def __init__(self, directory, top=25, label="run"):
+        self.directory = directory
+        self.top = top
+        self.name = f"{time.strftime('%Y%m%d-%H%M%S')}-{label}"
+
+        self.profile = cProfile.Profile()
+        self.snapshot = None
+        self.started_tracing = False
+        self.started = None
+        self.elapsed = None
+
+    def start(self):
+        """
+        Takes the allocation snapshot the run is compared against and starts profiling.
+        Must be called from the event loop thread.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+
+        self.snapshot = tracemalloc.take_snapshot()
+        self.started = time.monotonic()
+        self.profile.enable()
+
+    def stop(self):
+        """
+        Stops profiling. Must be called from the event loop thread.
+
+        Returns:
+            tracemalloc.Snapshot: The allocations at the end of the run.
+        """
+        self.profile.disable()
+        self.elapsed = time.monotonic() - self.started
+
+        snapshot = tracemalloc.take_snapshot()
+
+        if self.started_tracing:
+            tracemalloc.stop()
+
+        return snapshot
+
+    def build_report(self, snapshot):
+        """
+        Builds the text report of the run.
+
+        Args:
+            snapshot (tracemalloc.Snapshot): The allocations at the end of the run.
+
+        Returns:
+            str: The report.
+        """
+        report = io.StringIO()
+        report.write(f"Run profile {self.name}, {self.elapsed:.1f}s\n\n")
+
+        # Paths are kept so the bs4 package can be matched
+        stats = pstats.Stats(self.profile, stream=report)
+
+        report.write(f"Top {self.top} functions by cumulative time\n")
+        stats.sort_stats("cumulative").print_stats(self.top)
+
+        for title, pattern, sort in HOT_SPOTS:
+            report.write(f"{title}\n")
+            stats.sort_stats(sort).print_stats(pattern, self.top)
+
+        # The profiler's own snapshots are not part of the run
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        differences = snapshot.filter_traces(filters).compare_to(
+            self.snapshot.filter_traces(filters), "lineno"
+        )
+
+        report.write(f"Top {self.top} allocation sites by memory added in the run\n")
+        for difference in differences[: self.top]:
+            report.write(f"{difference}\n")
+
+        return report.getvalue()
+
+    def save(self, snapshot):
+        """
+        Saves the pstats file and the report. Runs in a thread.
+
+        Args:
+            snapshot (tracemalloc.Snapshot): The allocations at the end of the run.
+
+        Returns:
+            dict: The paths of the pstats file and the report.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+
+        paths = {
+            "pstats": os.path.join(self.directory, f"{self.name}.pstats"),
+            "report": os.path.join(self.directory, f"{self.name}.txt"),
+        }
+
+        self.profile.dump_stats(paths["pstats"])
+
+        with open(paths["report"], "w", encoding="utf-8") as file:
+            file.write(self.build_report(snapshot))
+
+        return paths
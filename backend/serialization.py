@@ -0,0 +1,175 @@
+"""
+Ohio House Representatives Serialization
+
+This script handles cleaning the scraped values and turning results and messages into
+json. Values are cleaned once, when a field's value is produced, with a single
+precompiled pattern, so nothing has to clean the finished json again. Messages are built
+from dicts by the json encoder, so names with quotes or backslashes are escaped.
+
+orjson is used when it is installed, and the standard json module otherwise. Large
+results are encoded one record at a time, so the full payload is only built once, when
+the pieces are joined or written.
+
+Functions:
+    def clean_value(value): Collapses whitespace and line separators in a scraped value
+    def dumps(obj): Encodes an object as json text
+    def loads(text): Decodes json text
+    def iter_json_object(items): Encodes a large object piece by piece
+    def create_json_list(people_dict): Formats a dictionary of reps into json format
+    def create_formatted_json_msg(kind, rep_name): Formats a progress or error message
+    def create_msg(msg_type, msg, **extra): Formats a message of any type
+
+Libraries:
+    json: Used to encode and decode json when orjson is not installed
+    re: Used for the whitespace pattern
+    orjson: Optional faster json encoder and decoder
+
+Global Variables:
+    WHITESPACE_PATTERN: Runs of whitespace, line breaks and unicode line separators
+    PROGRESS_MESSAGES: The msg_type and text of each kind of progress message
+"""
+
+import json
+import re
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+# \s matches the unicode line separators U+2028 and U+2029 too, so one pass covers them
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+PROGRESS_MESSAGES = {
+    "start_rep": ("update", "Processing: {rep_name}"),
+    "finish_rep": ("update", "Finished Processing: {rep_name}"),
+    "res_error": ("error", "Error: Response Error. Adding {rep_name} to error queue"),
+    "ai_error": ("error", "Error: AI Format Error. Adding {rep_name} to error queue"),
+    "parse_error": ("error", "Error: Parse Error. Adding {rep_name} to error queue"),
+}
+
+
+def clean_value(value):
+    """
+    Collapses whitespace and line separators in a scraped value into single spaces.
+
+    Args:
+        value: The scraped value. Tuples and lists, such as the info and bio fields,
+            are cleaned item by item and anything but a string is returned as is.
+
+    Returns:
+        The cleaned value.
+    """
+    if isinstance(value, str):
+        return WHITESPACE_PATTERN.sub(" ", value).strip()
+
+    if isinstance(value, (tuple, list)):
+        return tuple(clean_value(item) for item in value)
+
+    return value
+
+
+def dumps(obj):
+    """
+    Encodes an object as json text.
+
+    Args:
+        obj: The object, made of dicts, lists, strings, numbers, booleans and None.
+
+    Returns:
+        str: The json text.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(text):
+    """
+    Decodes json text.
+
+    Args:
+        text (str): The json text.
+
+    Returns:
+        The decoded object.
+
+    Raises:
+        ValueError: If the text is not valid json.
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+
+    return json.loads(text)
+
+
+def iter_json_object(items):
+    """
+    Encodes a large object piece by piece.
+
+    Args:
+        items (iterable): The (key, value) pairs of the object.
+
+    Yields:
+        str: Pieces of the json text, one per key.
+    """
+    separator = "{"
+
+    for key, value in items:
+        yield f"{separator}{dumps(str(key))}:{dumps(value)}"
+        separator = ","
+
+    yield "{}" if separator == "{" else "}"
+
+
+def create_json_list(people_dict):
+    """
+    Converts the dictionary of people data into a JSON string.
+
+    The values are cleaned when each field is produced (see RepResults.set_unit), so
+    the records are only encoded here.
+
+    Args:
+        people_dict (dict): A dictionary containing people data to be formatted.
+
+    Returns:
+        str: A JSON-formatted string of the `people_dict`.
+    """
+    return "".join(iter_json_object(people_dict.items()))
+
+
+def create_formatted_json_msg(kind, rep_name):
+    """
+    Formats a progress or error message about a representative.
+
+    Args:
+        kind (str): start_rep, finish_rep, res_error, ai_error or parse_error.
+        rep_name (str): The representative the message is about.
+
+    Returns:
+        str: The message as json.
+    """
+    msg_type, text = PROGRESS_MESSAGES[kind]
+    msg = text.format(rep_name=rep_name)
+
+    # Updates carry the rep name so a newer update can replace an unsent one
+    if msg_type == "update":
+        return create_msg(msg_type, msg, rep_name=rep_name)
+
+    return create_msg(msg_type, msg)
+
+
+def create_msg(msg_type, msg, **extra):
+    """
+    Formats a message of any type.
+
+    Args:
+        msg_type (str): The message type, such as update, error, result or manifest.
+        msg: The message's content.
+        **extra: Other keys of the message, such as seq or rep_name.
+
+    Returns:
+        str: The message as json.
+    """
+    return dumps({"msg_type": msg_type, **extra, "msg": msg})
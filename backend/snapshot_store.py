@@ -0,0 +1,212 @@
+"""
+Ohio House Representatives Snapshot Store
+
+This script handles keeping the latest complete results of every field so they can be
+served without scraping. Every finished scrape job is merged into the snapshot field by
+field, and each merge gets a new version number. A representative's field is only
+replaced when the new values are complete, so a page or AI error never overwrites good
+data from an earlier run.
+
+The snapshot is serialized once per version, so serving it is a string copy no matter
+how many clients ask for it. It is saved to disk so a restarted server can serve it
+right away.
+
+Classes:
+    SnapshotStore: The versioned snapshot of the latest complete results.
+
+Libraries:
+    asyncio: Used to save the snapshot off the event loop
+    os: Used for the atomic save
+    time: Used to time the snapshot's fields
+
+Imports:
+    serialization.py
+        dumps, loads: Used to read and write the snapshot
+"""
+
+import asyncio
+import os
+import time
+
+from serialization import dumps, loads
+
+
+class SnapshotStore:
+    """
+    The versioned snapshot of the latest complete results.
+
+    Args:
+        path (str): The file the snapshot is saved to.
+        field_columns (dict): Maps each field to the output columns it fills in.
+        error_values (tuple): Values that mark a field as failed for a representative.
+    """
+
+    def __init__(
+        self,
+        path,
+        field_columns,
+        error_values=("Response Error", "AI Error", "Parse Error"),
+    ):
+        self.path = path
+        self.field_columns = field_columns
+        self.error_values = set(error_values)
+
+        self.version = 0
+        self.updated_at = {}
+        self.results = {}
+        self.serialized = None
+        self.lock = asyncio.Lock()
+
+        self.served = 0
+
+    def load(self):
+        """
+        Loads the snapshot saved by an earlier run.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                snapshot = loads(file.read())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Could not load snapshot: {e}")
+            return
+
+        self.version = snapshot["version"]
+        self.updated_at = snapshot["updated_at"]
+        self.results = snapshot["results"]
+        self.serialize()
+
+    def serialize(self):
+        """
+        Serializes the current version of the snapshot.
+        """
+        self.serialized = dumps(
+            {
+                "version": self.version,
+                "updated_at": self.updated_at,
+                "results": self.results,
+            }
+        )
+
+    def save(self, serialized):
+        """
+        Saves a serialized snapshot with an atomic write.
+
+        Args:
+            serialized (str): The serialized snapshot.
+        """
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                file.write(serialized)
+
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Could not save snapshot: {e}")
+
+    def is_complete(self, rep_obj, field):
+        """
+        Checks that a representative has complete values for a field.
+
+        Args:
+            rep_obj (dict): The representative's columns.
+            field (str): The field to check.
+
+        Returns:
+            bool: True if every column of the field is present and not an error.
+        """
+        columns = self.field_columns.get(field, ())
+
+        return bool(columns) and all(
+            column in rep_obj and rep_obj[column] not in self.error_values
+            for column in columns
+        )
+
+    async def update(self, fields, results):
+        """
+        Merges a finished job's results into a new version of the snapshot.
+
+        Args:
+            fields (iterable): The fields the job scraped.
+            results (dict): Maps representative names to their columns.
+
+        Returns:
+            bool: True if the snapshot changed.
+        """
+        now = time.time()
+        updated_fields = set()
+
+        for rep_name, rep_obj in results.items():
+            for field in fields:
+                if not self.is_complete(rep_obj, field):
+                    continue
+
+                snapshot_obj = self.results.setdefault(rep_name, {})
+                for column in self.field_columns[field]:
+                    snapshot_obj[column] = rep_obj[column]
+
+                updated_fields.add(field)
+
+        if not updated_fields:
+            return False
+
+        for field in updated_fields:
+            self.updated_at[field] = now
+
+        self.version += 1
+        self.serialize()
+
+        async with self.lock:
+            await asyncio.to_thread(self.save, self.serialized)
+
+        return True
+
+    def get_age(self, field=None):
+        """
+        Gets the seconds since the snapshot or one of its fields was updated.
+
+        Args:
+            field (str): The field to check, or None for the whole snapshot.
+
+        Returns:
+            float: The age in seconds, or None if it was never updated.
+        """
+        if field is not None:
+            updated_at = self.updated_at.get(field)
+        else:
+            updated_at = max(self.updated_at.values(), default=None)
+
+        if updated_at is None:
+            return None
+
+        return time.time() - updated_at
+
+    def get_message(self):
+        """
+        Gets the snapshot message sent to the frontend.
+
+        Returns:
+            str: The snapshot message, or None if there is no snapshot yet.
+        """
+        if self.serialized is None:
+            return None
+
+        self.served += 1
+        field_ages = {field: self.get_age(field) for field in self.updated_at}
+
+        return (
+            f'{{"msg_type":"snapshot","age_seconds":{dumps(self.get_age())},'
+            f'"field_ages":{dumps(field_ages)},"msg":{self.serialized}}}'
+        )
+
+    def get_stats(self):
+        """Returns the snapshot's version, size, age and times served."""
+        return {
+            "version": self.version,
+            "reps": len(self.results),
+            "age_seconds": self.get_age(),
+            "served": self.served,
+        }
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The backend modules import each other by name, and the scraper needs an API key
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("API_KEY", "test")
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+import websocket_server
+from admission_control import ClientRateLimiter, QueueFullError, ScrapeAdmission
+from job_registry import JobRegistry
+from snapshot_store import SnapshotStore
+
+
+def test_slots_are_handed_over_in_first_come_order():
+    async def main():
+        admission = ScrapeAdmission(max_running=1, max_queued=5)
+        positions = {}
+        order = []
+
+        async def scrape(name):
+            await admission.acquire(
+                lambda position: positions.setdefault(name, []).append(position)
+            )
+            order.append(name)
+            await asyncio.sleep(0.01)
+            admission.release()
+
+        await asyncio.gather(*(scrape(name) for name in ("a", "b", "c")))
+
+        return order, positions, admission.get_stats()
+
+    order, positions, stats = asyncio.run(main())
+
+    assert order == ["a", "b", "c"]
+    assert positions == {"b": [1], "c": [2, 1]}
+    assert stats["running"] == 0
+    assert stats["admitted"] == 3
+
+
+def test_full_queue_refuses_scrapes():
+    async def main():
+        admission = ScrapeAdmission(max_running=1, max_queued=1)
+        await admission.acquire(lambda position: None)
+        waiting = asyncio.create_task(admission.acquire(lambda position: None))
+        await asyncio.sleep(0)
+
+        with pytest.raises(QueueFullError):
+            await admission.acquire(lambda position: None)
+
+        admission.release()
+        await waiting
+        admission.release()
+
+        return admission.get_stats()
+
+    stats = asyncio.run(main())
+
+    assert stats["rejected"] == 1
+    assert stats["running"] == 0
+
+
+def test_rate_limiter_refills_over_time():
+    limiter = ClientRateLimiter(rate=1000, burst=2)
+
+    assert limiter.allow("1.2.3.4")
+    assert limiter.allow("1.2.3.4")
+    assert not limiter.allow("1.2.3.4")
+    assert limiter.allow("5.6.7.8")
+
+
+def test_job_waiting_for_its_base_does_not_hold_a_slot(monkeypatch, tmp_path):
+    calls = []
+
+    async def fake_run_scraper(
+        fields, add_to_ui_queue, sendJson, websocket, stream, journal=None, reused=None
+    ):
+        calls.append(list(fields))
+        await asyncio.sleep(0.01)
+        await sendJson(websocket, {})
+
+    registry = JobRegistry()
+    monkeypatch.setattr(websocket_server, "run_scraper", fake_run_scraper)
+    monkeypatch.setattr(websocket_server, "job_registry", registry)
+    monkeypatch.setattr(websocket_server, "scrape_admission", ScrapeAdmission(1, 5))
+    monkeypatch.setattr(websocket_server, "JOURNAL_DIR", str(tmp_path))
+    monkeypatch.setattr(
+        websocket_server,
+        "snapshot_store",
+        SnapshotStore(str(tmp_path / "snapshot.json"), websocket_server.FIELD_COLUMNS),
+    )
+
+    async def main():
+        base, _ = registry.get_job(["info"], False)
+        dependent, _ = registry.get_job(["info", "bio"], False)
+
+        # The dependent job takes the only slot first, the base job queues behind it
+        dependent_task = asyncio.create_task(
+            websocket_server.run_scraper_handler(dependent)
+        )
+        await asyncio.sleep(0)
+        base_task = asyncio.create_task(websocket_server.run_scraper_handler(base))
+
+        await asyncio.wait_for(asyncio.gather(dependent_task, base_task), 5)
+
+        return base, dependent
+
+    base, dependent = asyncio.run(main())
+
+    assert sorted(calls) == [["bio"], ["info"]]
+    assert base.succeeded and dependent.succeeded
+    assert websocket_server.scrape_admission.get_stats()["running"] == 0
@@ -0,0 +1,42 @@
+from utils import get_ai_batch_prompt, get_ai_prompt_version, parse_ai_batch_response
+
+
+def test_batch_prompt_marks_every_biography():
+    prompt = get_ai_batch_prompt({"jane-doe": "Jane's bio", "john-roe": "John's bio"})
+
+    assert "[ID: jane-doe]" in prompt and "Jane's bio" in prompt
+    assert prompt.index("[ID: jane-doe]") < prompt.index("[ID: john-roe]")
+
+
+def test_batch_response_is_split_by_id():
+    response = "\n".join(
+        [
+            "Here are the summaries:",
+            "[ID: jane-doe]::OSU|Council|Lawyer|Rotary",
+            "'john-roe::None|None|Farmer|4-H|extra'",
+        ]
+    )
+
+    results = parse_ai_batch_response(response, ["jane-doe", "john-roe"])
+
+    assert results == {
+        "jane-doe": ("OSU", "Council", "Lawyer", "Rotary"),
+        "john-roe": ("None", "None", "Farmer", "4-H"),
+    }
+
+
+def test_unknown_ids_and_short_lines_are_missing():
+    response = "\n".join(
+        [
+            "jane-doe::OSU|Council",
+            "someone-else::OSU|Council|Lawyer|Rotary",
+            "john-roe OSU|Council|Lawyer|Rotary",
+        ]
+    )
+
+    assert parse_ai_batch_response(response, ["jane-doe", "john-roe"]) == {}
+
+
+def test_prompt_version_is_stable():
+    assert get_ai_prompt_version() == get_ai_prompt_version()
+    assert len(get_ai_prompt_version()) == 12
@@ -0,0 +1,91 @@
+import asyncio
+
+from job_registry import JobRegistry
+
+INFO = ("Town", "1 Main St", "555-0100", "555-0101")
+ERRORS = ("Response Error",) * 4
+COLUMNS = ("hometown", "address", "phone", "fax")
+
+
+def info_columns(values):
+    return dict(zip(COLUMNS, values))
+
+
+class FakeScraper:
+    """Records every call and returns the given records, without any requests."""
+
+    def __init__(self, *people):
+        self.people = list(people)
+        self.calls = []
+
+    async def __call__(
+        self,
+        fields,
+        add_to_ui_queue,
+        sendJson,
+        websocket,
+        stream,
+        journal=None,
+        reused=None,
+    ):
+        self.calls.append((list(fields), reused))
+        await sendJson(websocket, self.people.pop(0))
+
+
+def finish(job, results, succeeded):
+    job.results = results
+    job.succeeded = succeeded
+    job.finish()
+
+
+def test_failed_job_is_not_reused():
+    registry = JobRegistry()
+    refused, _ = registry.get_job(["info", "bio"], True)
+    finish(refused, {}, succeeded=False)
+
+    job, created = registry.get_job(["info", "bio"], True)
+
+    assert created
+    assert job.base is None
+    assert job.scrape_fields == ["info", "bio"]
+
+
+def test_only_complete_units_are_reused():
+    registry = JobRegistry()
+    base, _ = registry.get_job(["info"], False)
+    finish(
+        base,
+        {"Ann": info_columns(INFO), "Bob": info_columns(ERRORS)},
+        succeeded=True,
+    )
+
+    job, created = registry.get_job(["info", "committees"], False)
+    assert created and job.base is base
+    assert job.scrape_fields == ["committees"]
+
+    scraper = FakeScraper(
+        {"Ann": {"committees": "Finance"}, "Bob": {"committees": "Rules"}},
+        {"Ann": info_columns(INFO), "Bob": info_columns(INFO)},
+    )
+    asyncio.run(job.run(scraper))
+
+    # Bob's info failed in the base job, so info is scraped again with Ann's reused
+    assert scraper.calls == [
+        (["committees"], None),
+        (["info"], {"Ann": {"info": INFO}}),
+    ]
+    assert job.scraped_fields == ["committees", "info"]
+    assert job.results["Bob"] == {**info_columns(INFO), "committees": "Rules"}
+
+
+def test_complete_base_is_not_scraped_again():
+    registry = JobRegistry()
+    base, _ = registry.get_job(["info"], False)
+    finish(base, {"Ann": info_columns(INFO)}, succeeded=True)
+
+    job, _ = registry.get_job(["info"], False)
+    scraper = FakeScraper()
+    asyncio.run(job.run(scraper))
+
+    assert scraper.calls == []
+    assert job.results == {"Ann": info_columns(INFO)}
@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+from message_channel import MessageBuffer, MessageChannel
+from serialization import create_msg
+
+
+def update(rep_name, msg):
+    return create_msg("update", msg, rep_name=rep_name)
+
+
+def result(rep_name):
+    return json.dumps({"msg_type": "result", "rep_name": rep_name})
+
+
+def fill(buffer, texts):
+    for text in texts:
+        buffer.put(json.loads(text), text)
+
+
+def get_frames(buffer):
+    async def main():
+        frames = []
+        buffer.close()
+        while (frame := await buffer.get_frame()) is not None:
+            frames.append(json.loads(frame))
+        return frames
+
+    return asyncio.run(main())
+
+
+def test_newer_update_replaces_the_waiting_one():
+    buffer = MessageBuffer(flush_interval=0)
+    fill(
+        buffer,
+        [update("Ann", "start"), update("Bob", "start"), update("Ann", "done")],
+    )
+
+    frames = get_frames(buffer)
+
+    assert frames == [
+        [json.loads(update("Bob", "start")), json.loads(update("Ann", "done"))]
+    ]
+    assert buffer.get_stats()["merged"] == 1
+
+
+def test_frames_are_split_at_the_size_limit():
+    texts = [result(f"Rep {i}") for i in range(10)]
+    buffer = MessageBuffer(flush_interval=0, max_frame_bytes=len(texts[0]) * 3)
+    fill(buffer, texts)
+
+    frames = get_frames(buffer)
+
+    assert [len(frame) for frame in frames] == [3, 3, 3, 1]
+    assert [m["rep_name"] for frame in frames for m in frame] == [
+        f"Rep {i}" for i in range(10)
+    ]
+
+
+def test_slow_client_loses_progress_not_data():
+    buffer = MessageBuffer(flush_interval=0, max_messages=3)
+    fill(
+        buffer,
+        [
+            create_msg("update", "one"),
+            result("Ann"),
+            create_msg("update", "two"),
+            result("Bob"),
+        ],
+    )
+
+    messages = [m for frame in get_frames(buffer) for m in frame]
+
+    assert [m.get("rep_name") or m["msg"] for m in messages] == ["Ann", "two", "Bob"]
+    assert buffer.get_stats()["dropped"] == 1
+
+
+def test_client_too_far_behind_gets_an_error_and_is_closed():
+    buffer = MessageBuffer(flush_interval=0, max_messages=2, max_data_messages=4)
+    fill(buffer, [result(f"Rep {i}") for i in range(5)])
+
+    # Published after the overflow, never sent
+    fill(buffer, [result("Late")])
+    frames = get_frames(buffer)
+
+    assert buffer.overflowed
+    assert len(frames) == 1
+    assert [m["msg_type"] for m in frames[0]] == ["error"]
+
+
+def test_channel_catches_up_late_subscribers():
+    channel = MessageChannel(flush_interval=0)
+    early = channel.subscribe()
+    channel.publish(result("Ann"))
+    late = channel.subscribe(history=[result("Ann")])
+    channel.publish("not json")
+    channel.close()
+
+    assert get_frames(early) == get_frames(late) == [
+        [{"msg_type": "result", "rep_name": "Ann"}, "not json"]
+    ]
@@ -0,0 +1,26 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import houseScraper_async
+
+
+def test_only_the_profiled_run_parses_on_the_loop():
+    threads = {}
+
+    def parser(html):
+        threads[html] = threading.current_thread()
+        return html
+
+    async def run(html, executor):
+        houseScraper_async.parse_executor.set(executor)
+        return await houseScraper_async.parse_page(parser, html)
+
+    async def main():
+        with ThreadPoolExecutor(1) as pool:
+            await asyncio.gather(run("profiled", None), run("other", pool))
+
+    asyncio.run(main())
+
+    assert threads["profiled"] is threading.main_thread()
+    assert threads["other"] is not threading.main_thread()
@@ -0,0 +1,82 @@
+import json
+
+import rate_controller
+from rate_controller import AdaptiveRateController, parse_retry_after
+from request_scheduler import RequestScheduler
+
+URL = "https://ohiohouse.gov/members/jane-doe"
+HOST = "ohiohouse.gov"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_controller(monkeypatch, tmp_path, **kwargs):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_controller.time, "monotonic", clock)
+    scheduler = RequestScheduler(1.0)
+    controller = AdaptiveRateController(
+        scheduler, str(tmp_path / "rates.json"), **kwargs
+    )
+    return controller, scheduler, clock
+
+
+def test_increase_follows_time_not_responses(monkeypatch, tmp_path):
+    controller, scheduler, clock = make_controller(
+        monkeypatch, tmp_path, max_rate=2.0, increase=0.1
+    )
+    scheduler.set_rate(HOST, 0.5)
+
+    for _ in range(100):
+        controller.record(URL, 200)
+    assert scheduler.get_bucket(HOST).rate == 0.5
+
+    clock.now += 2
+    controller.record(URL, 200)
+    controller.record(URL, 304)
+    assert round(scheduler.get_bucket(HOST).rate, 6) == 0.7
+
+
+def test_rate_is_capped_at_the_default_rate(monkeypatch, tmp_path):
+    controller, scheduler, clock = make_controller(monkeypatch, tmp_path)
+
+    controller.record(URL, 200)
+    clock.now += 3600
+    controller.record(URL, 200)
+
+    assert controller.max_rate == 1.0
+    assert scheduler.get_bucket(HOST).rate == 1.0
+
+
+def test_throttle_halves_once_per_cooldown(monkeypatch, tmp_path):
+    controller, scheduler, clock = make_controller(monkeypatch, tmp_path)
+
+    controller.record(URL, 429)
+    controller.record(URL, 503)
+    assert scheduler.get_bucket(HOST).rate == 0.5
+
+    clock.now += controller.cooldown
+    controller.record(URL, 429)
+    assert scheduler.get_bucket(HOST).rate == 0.25
+
+
+def test_saved_rates_are_clamped_on_load(tmp_path):
+    path = tmp_path / "rates.json"
+    path.write_text(json.dumps({HOST: 4.0}))
+    scheduler = RequestScheduler(1 / 0.85)
+
+    AdaptiveRateController(scheduler, str(path))
+
+    assert scheduler.get_bucket(HOST).rate == 1 / 0.85
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
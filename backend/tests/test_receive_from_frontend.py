@@ -0,0 +1,36 @@
+import asyncio
+import json
+
+import websockets
+
+import websocket_server
+
+
+class FakeWebSocket:
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.sent = []
+        self.remote_address = ("127.0.0.1", 0)
+
+    async def recv(self):
+        if not self.messages:
+            raise websockets.exceptions.ConnectionClosed(None, None)
+        return self.messages.pop(0)
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+    async def close(self, *args):
+        self.messages.clear()
+
+
+def test_failed_directory_fetch_is_sent_as_an_error(monkeypatch):
+    async def fake_get_rep_names():
+        raise RuntimeError("Got status 503 from the directory")
+
+    monkeypatch.setattr(websocket_server, "get_rep_names", fake_get_rep_names)
+    websocket = FakeWebSocket([websocket_server.create_msg("command", "get_rep_names")])
+
+    asyncio.run(websocket_server.receive_from_frontend(websocket, []))
+
+    assert [m["msg_type"] for m in websocket.sent] == ["error"]
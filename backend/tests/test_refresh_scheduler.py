@@ -0,0 +1,39 @@
+import time
+
+from refresh_scheduler import RefreshScheduler
+
+
+class FakeStore:
+    def __init__(self, ages):
+        self.ages = ages
+
+    def get_age(self, field=None):
+        return self.ages.get(field)
+
+
+def make_scheduler(ages, started_ago):
+    scheduler = RefreshScheduler(
+        None, FakeStore(ages), {"info": 100, "bio": 100}, None, retry_interval=10
+    )
+    scheduler.started_at = time.time() - started_ago
+    return scheduler
+
+
+def test_saved_fields_wait_a_period_after_startup():
+    scheduler = make_scheduler({"info": 500}, started_ago=5)
+
+    # info is stale but saved, bio was never scraped
+    assert scheduler.get_due_fields() == ["bio"]
+
+
+def test_stale_fields_are_due_after_a_period():
+    scheduler = make_scheduler({"info": 500, "bio": 50}, started_ago=200)
+
+    assert scheduler.get_due_fields() == ["info"]
+
+
+def test_failed_refresh_waits_the_retry_interval():
+    scheduler = make_scheduler({}, started_ago=200)
+    scheduler.last_attempt = {"info": time.time()}
+
+    assert scheduler.get_due_fields() == ["bio"]
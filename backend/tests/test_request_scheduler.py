@@ -0,0 +1,70 @@
+import asyncio
+
+import request_scheduler
+from request_scheduler import RequestScheduler
+
+URL = "https://ohiohouse.gov/members/jane-doe"
+HOST = "ohiohouse.gov"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+def make_scheduler(monkeypatch, rate, burst=1):
+    clock = FakeClock()
+    monkeypatch.setattr(request_scheduler.time, "monotonic", clock)
+    monkeypatch.setattr(request_scheduler.asyncio, "sleep", clock.sleep)
+    return RequestScheduler(rate, burst), clock
+
+
+def test_requests_are_spaced_by_the_rate(monkeypatch):
+    scheduler, _ = make_scheduler(monkeypatch, 2.0)
+    bucket = scheduler.get_bucket(HOST)
+
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.5, 1.0]
+
+
+def test_burst_starts_back_to_back(monkeypatch):
+    scheduler, clock = make_scheduler(monkeypatch, 1.0, burst=3)
+    bucket = scheduler.get_bucket(HOST)
+
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.0, 1.0]
+
+    # Idle time refills the bucket, but never past the burst
+    clock.now += 100
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.0, 1.0]
+
+
+def test_pause_holds_off_waiting_requests(monkeypatch):
+    scheduler, clock = make_scheduler(monkeypatch, 1.0)
+
+    async def main():
+        await scheduler.acquire(URL)
+        waiter = asyncio.ensure_future(scheduler.acquire(URL))
+        scheduler.pause(HOST, 30)
+        return await waiter
+
+    assert asyncio.run(main()) == 30.0
+    assert clock.now == 1030.0
+    assert scheduler.get_stats()[HOST]["requests"] == 2
+
+
+def test_set_rate_keeps_earned_tokens(monkeypatch):
+    scheduler, clock = make_scheduler(monkeypatch, 1.0, burst=2)
+    bucket = scheduler.get_bucket(HOST)
+    bucket.reserve()
+    bucket.reserve()
+
+    clock.now += 1
+    scheduler.set_rate(HOST, 4.0, burst=1)
+
+    assert bucket.rate == 4.0
+    assert [bucket.reserve() for _ in range(2)] == [0.0, 0.25]
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import time
+
+from response_cache import CacheEntry, DiskCache, ResponseCache
+
+URL = "https://ohiohouse.gov/members/jane-doe/committees"
+
+
+def test_stale_page_is_revalidated_with_its_validators(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttls=[(r"/committees$", 60)])
+    entry = CacheEntry(URL, "<html></html>", '"abc"', "Mon, 01 Jan 2024 00:00:00 GMT")
+
+    assert cache.is_fresh(entry)
+
+    entry.fetched_at -= 61
+    assert not cache.is_fresh(entry)
+    assert cache.get_conditional_headers(entry) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    assert cache.get_conditional_headers(None) == {}
+
+
+def test_default_ttls_are_short(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+
+    assert 0 < cache.get_ttl(URL) <= 10 * 60
+    assert cache.get_ttl("https://ohiohouse.gov/about") == 0
+
+
+def test_entries_survive_a_restart_and_refresh(tmp_path):
+    async def main():
+        cache = ResponseCache(str(tmp_path))
+        await cache.store(URL, "<html>a</html>", '"abc"')
+
+        restarted = ResponseCache(str(tmp_path))
+        entry = await restarted.get(URL)
+        entry.fetched_at -= 3600
+        await restarted.refresh(entry)
+
+        return entry, await ResponseCache(str(tmp_path)).get(URL)
+
+    entry, reloaded = asyncio.run(main())
+
+    assert reloaded.body == "<html>a</html>"
+    assert reloaded.etag == '"abc"'
+    assert reloaded.fetched_at == entry.fetched_at
+
+
+def test_parsed_values_follow_the_validators(tmp_path):
+    async def main():
+        cache = ResponseCache(str(tmp_path))
+        await cache.store(URL, "<html>a</html>", '"v1"')
+        key = cache.get_parsed_key(URL, "<html>a</html>", "parse_committees")
+        cache.put_parsed(key, "Finance")
+
+        kept = cache.get_parsed(key)
+        other_body = cache.get_parsed_key(URL, "<html>b</html>", "parse_committees")
+
+        await cache.store(URL, "<html>a</html>", '"v2"')
+        new_key = cache.get_parsed_key(URL, "<html>a</html>", "parse_committees")
+
+        return kept, other_body, cache.get_parsed(new_key)
+
+    kept, other_body, after_change = asyncio.run(main())
+
+    assert kept == (True, "Finance")
+    assert other_body is None
+    assert after_change == (False, None)
+
+
+def test_disk_prune_drops_old_and_extra_entries(tmp_path):
+    disk = DiskCache(str(tmp_path), max_files=2, max_age=100)
+
+    for i in range(4):
+        disk.save(CacheEntry(f"{URL}/{i}", "<html></html>"))
+        written = time.time() - 10 * (4 - i)
+        os.utime(disk.path(f"{URL}/{i}"), (written, written))
+
+    old = disk.path(f"{URL}/0")
+    os.utime(old, (time.time() - 1000, time.time() - 1000))
+
+    assert disk.prune() == 2
+    assert disk.load(f"{URL}/0") is None
+    assert disk.load(f"{URL}/1") is None
+    assert disk.load(f"{URL}/3") is not None
@@ -0,0 +1,96 @@
+import asyncio
+
+from retry_scheduler import RetryPolicy, RetryScheduler, classify_status
+
+POLICIES = {
+    "fast": RetryPolicy(0.05, 0.05, 2),
+    "slow": RetryPolicy(0.3, 0.3, 2),
+    "response": RetryPolicy(0.05, 0.05, 1),
+}
+
+
+def run_scheduler(puts, budget=75, fail_again=(), wait_before_join=0.0):
+    """Puts the units, waits like a pipeline would and joins, timing every retry."""
+    retried = []
+    given_up = []
+
+    async def main():
+        loop = asyncio.get_running_loop()
+
+        async def retry(unit):
+            retried.append((unit, loop.time()))
+            if unit in fail_again:
+                scheduler.put(unit, dict(puts)[unit])
+
+        scheduler = RetryScheduler(
+            retry,
+            POLICIES,
+            budget=budget,
+            on_give_up=lambda *args: given_up.append(args),
+        )
+
+        for unit, error_class in puts:
+            scheduler.put(unit, error_class)
+
+        await asyncio.sleep(wait_before_join)
+        started = loop.time()
+        await scheduler.join()
+
+        return started, scheduler.get_stats()
+
+    started, stats = asyncio.run(main())
+    return started, stats, retried, given_up
+
+
+def test_backoff_counts_from_start_not_from_failure():
+    # The pipeline ran longer than every backoff, the retries must still wait theirs
+    started, _, retried, _ = run_scheduler(
+        [(("Ann", "info"), "fast"), (("Bob", "info"), "slow")], wait_before_join=0.4
+    )
+    delays = {unit: at - started for unit, at in retried}
+
+    assert 0.025 <= delays[("Ann", "info")] < 0.2
+    assert delays[("Bob", "info")] >= 0.15
+    assert retried[0][0] == ("Ann", "info")
+
+
+def test_budget_caps_retries():
+    units = [((f"Rep {i}", "info"), "fast") for i in range(5)]
+
+    _, stats, retried, given_up = run_scheduler(units, budget=3)
+
+    assert len(retried) == 3
+    assert stats["retries"] == 3
+    assert [reason for _, _, reason in given_up] == ["budget", "budget"]
+
+
+def test_unit_stops_after_max_attempts():
+    unit = ("Ann", "bio")
+
+    _, _, retried, given_up = run_scheduler([(unit, "fast")], fail_again=[unit])
+
+    assert len(retried) == POLICIES["fast"].max_attempts
+    assert given_up == [(unit, "fast", "attempts")]
+
+
+def test_unit_is_scheduled_once():
+    unit = ("Ann", "info")
+
+    _, stats, retried, _ = run_scheduler([(unit, "fast"), (unit, "fast")])
+
+    assert len(retried) == 1
+    assert stats["errors"] == {"fast": 2}
+
+
+def test_delay_grows_and_stays_within_jitter():
+    policy = RetryPolicy(1, 5, 4)
+
+    for attempt, ceiling in ((1, 1), (2, 2), (3, 4), (4, 5)):
+        for _ in range(20):
+            assert ceiling / 2 <= policy.get_delay(attempt) <= ceiling
+
+
+def test_classify_status():
+    assert classify_status(429) == "rate_limited"
+    assert classify_status(503) == "server"
+    assert classify_status(404) == "response"
@@ -0,0 +1,104 @@
+import asyncio
+import os
+
+import websocket_server
+from job_registry import JobRegistry
+from run_journal import RunJournal, get_latest_run_id, prune_journals
+from snapshot_store import SnapshotStore
+
+INFO = ["Town", "1 Main St", "555-0100", "555-0101"]
+
+
+def record_units(journal, units):
+    async def main():
+        for rep_name, field, value in units:
+            journal.record(rep_name, field, value)
+        await journal.flush()
+        await asyncio.to_thread(journal.close)
+
+    asyncio.run(main())
+
+
+def test_interrupted_run_is_replayed(tmp_path):
+    journal = RunJournal.create(str(tmp_path), ["info", "bio"])
+    record_units(
+        journal,
+        [("Ann", "info", INFO), ("Ann", "bio", "Lawyer"), ("Bob", "info", INFO)],
+    )
+
+    resumed = RunJournal.open(str(tmp_path), journal.run_id)
+
+    assert resumed.fields == ["info", "bio"]
+    assert resumed.replayed == 3
+    assert resumed.get_values("Ann", ["info", "bio"]) == {"info": INFO, "bio": "Lawyer"}
+    assert resumed.get_values("Bob", ["bio"]) == {}
+    assert get_latest_run_id(str(tmp_path)) == journal.run_id
+
+
+def test_partial_last_line_is_skipped(tmp_path):
+    journal = RunJournal.create(str(tmp_path), ["info"])
+    record_units(journal, [("Ann", "info", INFO)])
+
+    with open(journal.path, "a", encoding="utf-8") as file:
+        file.write('{"type": "unit", "rep": "Bob", "fie')
+
+    resumed = RunJournal.open(str(tmp_path), journal.run_id)
+    record_units(resumed, [("Bob", "info", INFO)])
+
+    replayed = RunJournal.open(str(tmp_path), journal.run_id)
+    assert replayed.replayed == 2
+    assert replayed.has_unit("Bob", "info")
+
+
+def test_units_are_recorded_once(tmp_path):
+    journal = RunJournal.create(str(tmp_path), ["info"])
+    record_units(journal, [("Ann", "info", INFO), ("Ann", "info", INFO)])
+
+    assert journal.recorded == 1
+
+
+def test_unknown_or_unsafe_run_ids_are_refused(tmp_path):
+    assert RunJournal.open(str(tmp_path), "missing") is None
+    assert RunJournal.open(str(tmp_path), "../secrets") is None
+    assert RunJournal.open(str(tmp_path), "") is None
+
+
+def test_old_journals_are_pruned(tmp_path):
+    journal = RunJournal.create(str(tmp_path), ["info"])
+    journal.close()
+    os.utime(journal.path, (0, 0))
+
+    prune_journals(str(tmp_path), 60)
+
+    assert get_latest_run_id(str(tmp_path)) is None
+
+
+def test_resumed_job_covered_by_earlier_results_finishes_its_journal(
+    monkeypatch, tmp_path
+):
+    async def fake_run_scraper(*args, **kwargs):
+        raise AssertionError("Nothing is left to scrape")
+
+    registry = JobRegistry()
+    monkeypatch.setattr(websocket_server, "run_scraper", fake_run_scraper)
+    monkeypatch.setattr(websocket_server, "job_registry", registry)
+    monkeypatch.setattr(
+        websocket_server,
+        "snapshot_store",
+        SnapshotStore(str(tmp_path / "snapshot.json"), websocket_server.FIELD_COLUMNS),
+    )
+
+    base, _ = registry.get_job(["info"], False)
+    base.results = {"Ann": dict(zip(("hometown", "address", "phone", "fax"), INFO))}
+    base.succeeded = True
+    base.finish()
+
+    job, created = registry.get_job(["info"], False)
+    job.journal = RunJournal.create(str(tmp_path / "journals"), ["info"])
+
+    asyncio.run(websocket_server.run_scraper_handler(job))
+
+    assert created and job.scrape_fields == []
+    assert job.succeeded
+    assert not os.path.exists(job.journal.path)
+    assert get_latest_run_id(str(tmp_path / "journals")) is None
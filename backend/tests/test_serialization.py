@@ -0,0 +1,49 @@
+import json
+
+from serialization import (
+    clean_value,
+    create_formatted_json_msg,
+    create_json_list,
+    create_msg,
+    dumps,
+    loads,
+)
+
+TRICKY = 'She said "hi"\\ and\tleft  — café'
+
+
+def test_clean_value_collapses_whitespace_and_line_separators():
+    assert clean_value("  Columbus,\n\tOhio   ") == "Columbus, Ohio"
+    assert clean_value(["a  b", ("c\nd",), 3]) == ("a b", ("c d",), 3)
+    assert clean_value(None) is None
+
+
+def test_json_list_is_valid_json_with_escaped_text():
+    people = {
+        'Jane "JJ" Doe': {"bio": TRICKY, "info": ["Town", "1 Main St"]},
+        "John Roe": {"committees": None},
+    }
+
+    text = create_json_list(people)
+
+    assert json.loads(text) == people
+    assert loads(text) == people
+    assert create_json_list({}) == "{}"
+
+
+def test_dumps_round_trips_with_the_standard_library():
+    obj = {"text": TRICKY, "n": [1, 2.5, True, None]}
+
+    assert json.loads(dumps(obj)) == obj
+    assert loads(json.dumps(obj)) == obj
+
+
+def test_messages_keep_their_type_and_extra_keys():
+    msg = json.loads(create_msg("result", {"bio": TRICKY}, seq=3))
+    update = json.loads(create_formatted_json_msg("start_rep", "Jane Doe"))
+    error = json.loads(create_formatted_json_msg("res_error", "Jane Doe"))
+
+    assert msg == {"msg_type": "result", "seq": 3, "msg": {"bio": TRICKY}}
+    assert update["rep_name"] == "Jane Doe"
+    assert update["msg"] == "Processing: Jane Doe"
+    assert error["msg_type"] == "error" and "rep_name" not in error
@@ -4,57 +4,156 @@ Ohio House Representatives Utils
 This script holds various utility functions to be used throughout the scraper
 
 Functions:
-    def get_representative_list(): Scrapes for list of all Ohio Representatives
+    def create_rep_slug(name): Turns a representative's name into their url slug
+    def build_directory_index(html): Parses the member directory into a slug keyed index
     async def checkURLResponse(response): Checks URL response for errors
     def getTime(): Formats the current time into hours, minutes, seconds
     def get_ai_prompt(combined_bio): Creates ai prompt to guide the AI
-    def create_json_list(people_dict): Formats a dictionary of reps into json format
+    def get_ai_batch_prompt(bios): Creates ai prompt for several biographies at once
+    def parse_ai_batch_response(response_text, bio_ids): Splits a batched ai response by id
+    def get_ai_prompt_version(): Hashes the ai prompt so changes to it can be detected
     
 Libraries:
     BeautifulSoup: Helps format scraped pages
-    requests: Used to handle http requests
-    json: Used for formatting into json
     re: Used for pattern matching
+    hashlib: Used to version the ai prompt
+
+Global Variables:
+    AI_PROMPT_INSTRUCTIONS: Instructions shared by the single and batched ai prompts
+    AI_BATCH_PROMPT_INSTRUCTIONS: Extra instructions for batched ai prompts
 
 Author: Kent Howell [khowellmobile@gmail.com]
 Date: 2/18/2025
 """
 
 from bs4 import BeautifulSoup  # type: ignore
-import requests  # type: ignore
 import time
-import json
 import re
+import hashlib
+
+# Instructions shared by the single and batched AI prompts
+AI_PROMPT_INSTRUCTIONS = """ The following is a biography of a member of the Ohio State House of Representatives. Based on the biography, return a summarization following these instructions:
+
+        Summarization Format:
+            1. Education
+                a. List educational background in the format: University, Degree, Area of Study.
+                b. If any of the three sections are missing, omit that section and any commas. For example:
+                    b1. "The Ohio State University, MS, Political Science"
+                    b2. "Ohio University, BS, Nursing"
+
+            2. Political Experience
+                a. List political experience in the format: Organization, Role, Term.
+                b. Include terms from any Ohio House or Senate, U.S. House or Senate, or City Council.
+                c. If the term years are not specifically enumerated then do not include them
+                d. If any section is missing, omit it and do not add extra commas. For example:
+                    d1. "House of Representatives, Majority Whip, 2017-2021"
+                    d2. "Columbus City Council, President"
+
+            3.Employment History
+                a. List past employment in the format: Organization, Role, Status.
+                b. Include any business ventures like buying or starting companies.
+                c. If any section is missing, omit it and do not add extra commas. For example:
+                    c1. "JP Morgan Chase, Accountant, Formerly"
+                    c2. "Bought Johns Company"
+                    c3. "Started Columbus Mowing"
+
+            4. Community Involvement
+                a. List community involvement in the format: Organization, Role.
+                b. This includes churches, local organizations, school boards, etc.
+                c. If only the organization is available, list it alone. For example:
+                    c1."Church of God"
+                    c2."Neighborhood Watch, Captain"
+
+        General Instructions for Summarization:
+            1. Segments of information (jobs, terms in office, organizations) are only put in the category they most belong in.
+                a. Examples include
+                    a1. A term in the Ohio House should only be put into Political Experience and should not also be put into into community involvement.
+                    a2. A degree should not be listed in Community Involvement, Employment History, and Education. It should only be listed in Education.
+            2. Terms in the Ohio House or Senate, U.S. House or Senate, or City Council should only be listed under Political Experience
+            3. Attending a college or university and any mention of a degree should only be listed under education.
+            4. Multiple degrees are all put in the same bucket seperated by commas.
+                a. E.g. "The Ohio State University, MS, Nursing, Toledo University, BS, Biology|||"
+        
+        Examples of summarizations to use for comparison:
+
+
+        Output Instructions:
+            1. The output should be a single line, with sections (education, political experience, employment, community involvement) separated by a pipe (|).
+                a1. e.g. 'education | political experience | employment | community involvement'.
+            2. If any section has no data, leave it empty (i.e., '||').
+            3. If no biography is provided, return "||||".
+            4. Ensure there are no extra commas or new line breaks. 
+            5. Ensure the output does not have any newline operators. ie "\n, \r, \u2028, \u2029" 
+            6. Each output should contain exactly 3 pipe characters (|).
+            
+"""
+
+AI_BATCH_PROMPT_INSTRUCTIONS = """
+        Batch Instructions:
+            1. Several biographies follow. Each one starts with a line in the format "[ID: id]".
+            2. Summarize every biography on its own, following all of the instructions above.
+            3. Return exactly one line per biography in the format 'id::education | political experience | employment | community involvement'.
+                a1. e.g. 'jane-doe::Ohio University, BS, Nursing|Ohio House of Representatives, 2019-2023||Neighborhood Watch, Captain'
+            4. Use the id exactly as it is given and do not add anything else to the response.
+            5. These instructions replace output instruction 1 above. All other output instructions still apply to each line.
+
+        Biographies:"""
+
+
+def create_rep_slug(name):
+    """
+    Turns a representative's display name into the slug used in ohiohouse.gov urls.
+
+    Args:
+        name (str): The name as listed in the member directory.
+
+    Returns:
+        str: The lowercase, dash separated slug (e.g. "jane-doe").
+    """
+    return name.strip().replace(" ", "-").replace(".", "").replace(",", "").lower()
 
 
-def get_representative_list():
+def build_directory_index(html):
     """
-    Scrapes the list of representatives from the Ohio House of Representatives website.
+    Parses the member directory page into an index keyed by representative slug.
 
-    Extracts and cleans the names of representatives, removing unwanted characters
-    and converting the names to lowercase.
+    Each portrait on the directory page holds the representative's name and the
+    headshot url, so a single parse gives everything the scraper needs from the page.
+    The index keeps the order the directory lists the representatives in.
 
     Args:
-        None
+        html (str | bytes): The html content of the member directory page.
 
     Returns:
-        list: A list of cleaned and formatted representative names.
+        dict: Maps each slug to a dict holding "name", "image_url" and "image_formula".
     """
-    rep_names = []
-    url = "https://ohiohouse.gov/members/directory?start=1&sort=LastName"
-    response = requests.get(url)
+    directory = {}
+
+    soup = BeautifulSoup(html, "html.parser")
 
-    soup = BeautifulSoup(response.content, "html.parser")
+    for div in soup.find_all("div", class_="media-container-portrait"):
+        name_div = div.find("div", class_="media-overlay-caption-text-line-1")
 
-    rep_name_divs = soup.find_all("div", class_="media-overlay-caption-text-line-1")
+        if not name_div:
+            continue
 
-    for div in rep_name_divs:
-        # Use re.sub in future
-        rep_names.append(
-            div.text.strip().replace(" ", "-").replace(".", "").replace(",", "").lower()
-        )
+        image_path = "Image not found"
+        image_div = div.find("div", class_="media-thumbnail-image")
 
-    return rep_names
+        if image_div and image_div.get("style"):
+            match = re.search(r"url\((.*?)\)", image_div["style"])
+            if match:
+                image_path = match.group(1)
+
+        image_url = f"https://ohiohouse.gov{image_path}"
+
+        directory[create_rep_slug(name_div.text)] = {
+            "name": name_div.text.strip(),
+            "image_url": image_url,
+            "image_formula": f'=IMAGE("{image_url}")',
+        }
+
+    return directory
 
 
 async def checkURLResponse(response):
@@ -97,135 +196,91 @@ def getTime():
 
     return formatted_time
 
-def create_json_list(people_dict):
+
+def get_ai_prompt(combined_bio):
     """
-    Converts the dictionary of people data into a formatted JSON string.
+    Generates an AI prompt for summarizing a representative's biography.
 
-    Iterates through the `people_dict`, cleans and standardizes each value by removing
-    unwanted whitespace and newlines, and then converts the dictionary to a JSON string.
+    The prompt provides specific instructions for summarizing various sections of a
+    representative's biography (education, political experience, employment, community involvement).
+    The biography is combined with the prompt to guide the AI.
 
     Args:
-        people_dict (dict): A dictionary containing people data to be formatted.
+        combined_bio (str): The full biography of a representative to be summarized.
 
     Returns:
-        str: A JSON-formatted string of the cleaned `people_dict`.
+        str: The AI prompt concatenated with the biography.
     """
-    for key, val in people_dict.items():
-        for sub_key, sub_val in val.items():
-            val[sub_key] = re.sub(r"\s+", " ", sub_val).replace(", ,", "")
-            val[sub_key] = re.sub(r"[\r\n\u2028\u2029]+", " ", sub_val)
+    return AI_PROMPT_INSTRUCTIONS + "        Biography:" + " " + combined_bio
 
-    people_json = json.dumps(people_dict)
 
-    people_json = re.sub(r"[\r\n\u2028\u2029]+", " ", people_json)
+def get_ai_batch_prompt(bios):
+    """
+    Generates an AI prompt for summarizing several biographies in one request.
+
+    Uses the same instructions as get_ai_prompt, followed by instructions for
+    returning one line per biography. Each biography is marked with its id.
 
-    return people_json
+    Args:
+        bios (dict): Maps each id (representative slug) to their full biography.
 
+    Returns:
+        str: The AI prompt concatenated with every marked biography.
+    """
+    marked_bios = "".join(
+        f"\n        [ID: {bio_id}]\n        {combined_bio}\n"
+        for bio_id, combined_bio in bios.items()
+    )
 
-def create_formatted_json_msg(kind, rep_name):
-    if kind == "start_rep":
-        return f'{{"msg_type":"update", "rep_name":"{rep_name}", "msg":"Processing: {rep_name}"}}'
-    elif kind == "finish_rep":
-        return f'{{"msg_type":"update", "rep_name":"{rep_name}", "msg":"Finished Processing: {rep_name}"}}'
-    elif kind == "res_error":
-        return f'{{"msg_type":"error", "msg":"Error: Response Error. Adding {rep_name} to error queue"}}'
-    elif kind == "ai_error":
-        return f'{{"msg_type":"error", "msg":"Error: AI Format Error. Adding {rep_name} to error queue"}}'
+    return AI_PROMPT_INSTRUCTIONS + AI_BATCH_PROMPT_INSTRUCTIONS + marked_bios
 
 
-def get_ai_prompt(combined_bio):
+def parse_ai_batch_response(response_text, bio_ids):
     """
-    Generates an AI prompt for summarizing a representative's biography.
+    Splits a batched AI response into the values for each biography.
 
-    The prompt provides specific instructions for summarizing various sections of a
-    representative's biography (education, political experience, employment, community involvement).
-    The biography is combined with the prompt to guide the AI.
+    Lines that do not start with a requested id or do not hold all four sections
+    are ignored, so the ids they belong to are reported as missing.
 
     Args:
-        combined_bio (str): The full biography of a representative to be summarized.
+        response_text (str): The text returned by the AI.
+        bio_ids (iterable): The ids that were sent in the request.
 
     Returns:
-        str: The AI prompt concatenated with the biography.
+        dict: Maps each id with a valid line to its (education, politics,
+            employment, community) tuple.
     """
-    ai_prompt_text = """ The following is a biography of a member of the Ohio State House of Representatives. Based on the biography, return a summarization following these instructions:
-
-        Summarization Format:
-            1. Education
-                a. List educational background in the format: University, Degree, Area of Study.
-                b. If any of the three sections are missing, omit that section and any commas. For example:
-                    b1. "The Ohio State University, MS, Political Science"
-                    b2. "Ohio University, BS, Nursing"
-
-            2. Political Experience
-                a. List political experience in the format: Organization, Role, Term.
-                b. Include terms from any Ohio House or Senate, U.S. House or Senate, or City Council.
-                c. If the term years are not specifically enumerated then do not include them
-                d. If any section is missing, omit it and do not add extra commas. For example:
-                    d1. "House of Representatives, Majority Whip, 2017-2021"
-                    d2. "Columbus City Council, President"
-
-            3.Employment History
-                a. List past employment in the format: Organization, Role, Status.
-                b. Include any business ventures like buying or starting companies.
-                c. If any section is missing, omit it and do not add extra commas. For example:
-                    c1. "JP Morgan Chase, Accountant, Formerly"
-                    c2. "Bought Johns Company"
-                    c3. "Started Columbus Mowing"
+    bio_ids = set(bio_ids)
+    results = {}
 
-            4. Community Involvement
-                a. List community involvement in the format: Organization, Role.
-                b. This includes churches, local organizations, school boards, etc.
-                c. If only the organization is available, list it alone. For example:
-                    c1."Church of God"
-                    c2."Neighborhood Watch, Captain"
+    for line in response_text.splitlines():
+        bio_id, separator, summary = line.strip().strip("'\"").partition("::")
+        bio_id = bio_id.strip().strip("[]").replace("ID:", "").strip()
 
-        General Instructions for Summarization:
-            1. Segments of information (jobs, terms in office, organizations) are only put in the category they most belong in.
-                a. Examples include
-                    a1. A term in the Ohio House should only be put into Political Experience and should not also be put into into community involvement.
-                    a2. A degree should not be listed in Community Involvement, Employment History, and Education. It should only be listed in Education.
-            2. Terms in the Ohio House or Senate, U.S. House or Senate, or City Council should only be listed under Political Experience
-            3. Attending a college or university and any mention of a degree should only be listed under education.
-            4. Multiple degrees are all put in the same bucket seperated by commas.
-                a. E.g. "The Ohio State University, MS, Nursing, Toledo University, BS, Biology|||"
-        
-        Examples of summarizations to use for comparison:
+        if not separator or bio_id not in bio_ids:
+            continue
 
+        values = summary.split("|")
+        if len(values) < 4:
+            continue
 
-        Output Instructions:
-            1. The output should be a single line, with sections (education, political experience, employment, community involvement) separated by a pipe (|).
-                a1. e.g. 'education | political experience | employment | community involvement'.
-            2. If any section has no data, leave it empty (i.e., '||').
-            3. If no biography is provided, return "||||".
-            4. Ensure there are no extra commas or new line breaks. 
-            5. Ensure the output does not have any newline operators. ie "\n, \r, \u2028, \u2029" 
-            6. Each output should contain exactly 3 pipe characters (|).
-            
-        Biography:"""
+        results[bio_id] = tuple(values[:4])
 
-    return ai_prompt_text + " " + combined_bio
+    return results
 
 
-def create_json_list(people_dict):
+def get_ai_prompt_version():
     """
-    Converts the dictionary of people data into a formatted JSON string.
+    Creates a short version string for the AI prompt.
 
-    Iterates through the `people_dict`, cleans and standardizes each value by removing
-    unwanted whitespace and newlines, and then converts the dictionary to a JSON string.
+    The version is a hash of the single and batched prompt text, so any edit to
+    either prompt produces a new version. Cached AI results are tied to the version they were created with.
 
     Args:
-        people_dict (dict): A dictionary containing people data to be formatted.
+        None
 
     Returns:
-        str: A JSON-formatted string of the cleaned `people_dict`.
+        str: The first 12 characters of the prompt's sha256 hash.
     """
-    for key, val in people_dict.items():
-        for sub_key, sub_val in val.items():
-            val[sub_key] = re.sub(r"\s+", " ", sub_val).replace(", ,", "")
-            val[sub_key] = re.sub(r"[\r\n\u2028\u2029]+", " ", sub_val)
-
-    people_json = json.dumps(people_dict)
-
-    people_json = re.sub(r"[\r\n\u2028\u2029]+", " ", people_json)
-
-    return people_json
+    prompt_text = get_ai_prompt("") + get_ai_batch_prompt({})
+    return hashlib.sha256(prompt_text.encode("utf-8")).hexdigest()[:12]
@@ -6,66 +6,257 @@ between the frontend and backend of the scraper. This file also handles communic
 The scraper itself and this file.
 
 Functions:
-    is_rate_limited(client_ip): Checks if the user surpases the rate limit.
-    async def receive_from_frontend(websocket): Gets messages from front end to receive commands
-    async def send_to_frontend(websocket): Sends messages to the front end from print_queue
-    def add_to_ui_queue(text): Add messages to the print_queue (used as callback)
-    async def sendJson(websocket, people_json): Sends final message to frontend and closes websocket
-    async def run_scraper_handler(websocket): Runs scraper and sends progress updates to the frontend.
+    def notify_queue_position(job, position): Tells a queued job's subscribers their place in line.
+    async def receive_from_frontend(websocket, subscriptions): Gets messages from front end to receive
+        commands
+    async def send_to_frontend(websocket, subscriber): Sends coalesced frames to the front end from a
+        job subscription
+    async def run_scraper_handler(job, profile=False): Runs a scrape job and publishes its progress updates to its
+        subscribers.
+    def start_job(job, profile=False): Starts a new scrape job's task.
+    def is_admin(msg_json): Checks if a message carries the admin token.
+    async def resume_job(run_id, stream): Gets the job that finishes an interrupted run.
     async def handler(websocket): Handles WebSocket connection and manage scraping flow.
+    async def serve_metrics(request): Serves the scraper and server metrics in the Prometheus format.
+    async def serve_export(request): Streams an export of the snapshot as TSV, CSV, NDJSON or Parquet.
+    async def start_http_server(): Starts the http server for the /metrics and /export endpoints.
     async def start_server(): Starts the WebSocket server to listen for connections and handle scraping.
 
 Libraries:
     asyncio: handles async functions.
     websockets: communication with front end.
     json: formatting of data.
-    queue: used for holding messages for frontend.
+    os: used for environment variables
     loggin: used to log the scraper runs for debugging.
-    time: used to delay to make sure all messages have been sent
     re: used to pattern match for validation
-    defaultdict: used to create dictionary for timestamps
-    datetime: used to connection time stamps
+    hmac: used to compare the admin token in constant time
+    partial: used to pass the profile option to the scraper
+    aiohttp.web: used to serve the /metrics and /export endpoints
 
 Imports:
     houseScraper_async.py
         run_scraper: Used to start the scraper.
-    utils.py
-        get_representative_list: Used to get complete list of representatives.
+        get_rep_names: Used to get complete list of representatives without blocking.
+        close_session: Used to close the shared aiohttp session when the server stops.
+        FIELD_COLUMNS: Used to know which snapshot columns each field fills in.
+    job_registry.py
+        JobRegistry: Used to share running scrapes and recent results between clients.
+    snapshot_store.py
+        SnapshotStore: Used to serve the latest complete results without scraping.
+    refresh_scheduler.py
+        RefreshScheduler: Used to keep the snapshot fresh in the background.
+    run_journal.py
+        RunJournal: Used to record each run's completed units so it can be resumed.
+        get_latest_run_id: Used to resume the most recent run when no run id is given.
+        prune_journals: Used to delete journals too old to resume.
+    loop_monitor.py
+        LoopLagMonitor: Used to log the stack of anything blocking the event loop in debug mode.
+    metrics.py
+        registry: Used to record the server's metrics and render every metric for /metrics.
+    admission_control.py
+        ClientRateLimiter: Used to rate limit each client IP in bounded memory.
+        ScrapeAdmission: Used to cap the scrapes running at once and queue the rest.
+        QueueFullError: Raised when a scrape cannot be queued.
+    serialization.py
+        create_msg: Used to format the messages sent to the frontend.
+    exports.py
+        ExportCache: Used to build exports of the snapshot once per snapshot version.
+        ExportError: Raised when an export cannot be built from the request.
+        EXPORT_FORMATS: Used for the content type and file extension of each export.
 
 Global Variables:
-    print_queue: Holds messages to be sent to the front end.
+    FLUSH_INTERVAL: Seconds progress messages are collected for before a frame is sent
+    MAX_FRAME_BYTES: The size a frame is sent at without waiting for the flush interval
+    MAX_BUFFERED_MESSAGES: The most messages waiting for a slow client before the oldest are dropped
+    MAX_BUFFERED_DATA_MESSAGES: The most results waiting for a slow client before it is disconnected (env WS_MAX_BUFFERED_DATA_MESSAGES)
+    JOB_RESULT_TTL: Seconds a finished job's results are reused by later jobs (env JOB_RESULT_TTL)
+    job_registry: The running and recently finished scrape jobs
+    SNAPSHOT_FILE: File the snapshot is saved to (env SNAPSHOT_FILE)
+    snapshot_store: The latest complete results, served by get_snapshot
+    REFRESH_ENABLED: Whether the snapshot is refreshed in the background (env REFRESH_ENABLED)
+    REFRESH_PERIODS: Seconds between refreshes of each field (env REFRESH_PERIODS as json)
+    REFRESH_CHECK_INTERVAL: Seconds between checks for fields to refresh (env REFRESH_CHECK_INTERVAL)
+    REFRESH_RETRY_INTERVAL: Seconds before a failed refresh is tried again (env REFRESH_RETRY_INTERVAL)
+    refresh_scheduler: The background refresh scheduler
+    JOURNAL_DIR: Folder the run journals are kept in (env JOURNAL_DIR)
+    JOURNAL_TTL: Seconds an interrupted run can be resumed for (env JOURNAL_TTL)
     RATE_LIMIT: The number of requests users cna make in the time window
     RATE_LIMIT_WINDOW: Window size used for rate limiting
-    request_timestamps: Dictionary of user connection timestamps
+    MAX_TRACKED_CLIENTS: The most client IPs the rate limiter keeps (env MAX_TRACKED_CLIENTS)
+    rate_limiter: Token bucket of each client IP
+    MAX_RUNNING_SCRAPES: The most scrapes running at once (env MAX_RUNNING_SCRAPES)
+    MAX_QUEUED_SCRAPES: The most scrapes waiting for a running slot (env MAX_QUEUED_SCRAPES)
+    scrape_admission: Running slots and queue of the scrape jobs
+    MAX_MESSAGE_BYTES: The largest message accepted from a client (env MAX_MESSAGE_BYTES)
     BANNED_PATTERNS: List of patterns not allowed in messages
+    BANNED_REGEX: BANNED_PATTERNS compiled into one pattern, checked in a single pass
+    DEBUG: Runs the event loop in debug mode with the loop lag monitor (env WS_DEBUG)
+    LOOP_LAG_THRESHOLD: Seconds a callback may hold the loop before it is logged (env LOOP_LAG_THRESHOLD)
+    METRICS_ENABLED: Whether the /metrics endpoint is served (env METRICS_ENABLED)
+    METRICS_HOST: Host the http endpoints listen on (env METRICS_HOST)
+    METRICS_PORT: Port the http endpoints listen on (env METRICS_PORT)
+    connections_gauge: Open websocket connections, served by /metrics
+    EXPORT_ENABLED: Whether the /export endpoint is served (env EXPORT_ENABLED)
+    EXPORT_DIR: Folder the built exports are kept in (env EXPORT_DIR)
+    EXPORT_CHUNK_ROWS: Rows written at a time when an export is built (env EXPORT_CHUNK_ROWS)
+    EXPORT_MAX_FILES: The most exports kept for the current snapshot version (env EXPORT_MAX_FILES)
+    EXPORT_GRACE: Seconds exports of older versions are kept for downloads in flight (env EXPORT_GRACE)
+    EXPORT_RATE_LIMIT: The number of exports a client can download in the time window (env EXPORT_RATE_LIMIT)
+    EXPORT_RATE_LIMIT_WINDOW: Window size used for rate limiting exports
+    export_rate_limiter: Token bucket of each client IP for /export, apart from the scrape requests
+    export_cache: The exports built from the current snapshot version
+    exports_counter: Exports served by format and whether they were built, served by /metrics
+    ADMIN_TOKEN: Token admin commands must send, admin commands are off without it (env ADMIN_TOKEN)
+    PROFILE_NEXT_RUN: Whether the first run after startup is profiled (env PROFILE_NEXT_RUN)
 
 
 Author: Kent Howell [khowellmobile@gmail.com]
 Date: 2/18/2025
-Last Update: 3/27/2025
+Last Update: 10/18/2026
 """
 
 import asyncio
 import websockets  # type: ignore
 import json
-import queue
+import os
 import logging
-import time
 import re
-from collections import defaultdict
-from datetime import datetime, timedelta
+import hmac
+from functools import partial
+from aiohttp import web  # type: ignore
 
 from houseScraper_async import run_scraper as run_scraper
-from utils import get_representative_list
+from houseScraper_async import get_rep_names, close_session, FIELD_COLUMNS
+from job_registry import JobRegistry
+from snapshot_store import SnapshotStore
+from refresh_scheduler import RefreshScheduler
+from loop_monitor import LoopLagMonitor
+from run_journal import RunJournal, get_latest_run_id, prune_journals
+from metrics import registry
+from admission_control import ClientRateLimiter, ScrapeAdmission, QueueFullError
+from serialization import create_msg
+from exports import ExportCache, ExportError, EXPORT_FORMATS
+
+
+# Message coalescing setup
+FLUSH_INTERVAL = float(os.getenv("WS_FLUSH_INTERVAL", 0.05))
+MAX_FRAME_BYTES = int(os.getenv("WS_MAX_FRAME_BYTES", 64 * 1024))
+MAX_BUFFERED_MESSAGES = int(os.getenv("WS_MAX_BUFFERED_MESSAGES", 256))
+MAX_BUFFERED_DATA_MESSAGES = int(os.getenv("WS_MAX_BUFFERED_DATA_MESSAGES", 4096))
+
+# Scrape job sharing setup
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", 600))
+job_registry = JobRegistry(
+    result_ttl=JOB_RESULT_TTL,
+    flush_interval=FLUSH_INTERVAL,
+    max_frame_bytes=MAX_FRAME_BYTES,
+    max_messages=MAX_BUFFERED_MESSAGES,
+    max_data_messages=MAX_BUFFERED_DATA_MESSAGES,
+)
+
+# Snapshot setup
+SNAPSHOT_FILE = os.getenv(
+    "SNAPSHOT_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "snapshot.json"),
+)
+snapshot_store = SnapshotStore(SNAPSHOT_FILE, FIELD_COLUMNS)
+
+# Background refresh setup
+# Off by default, every refresh scrapes the live site and calls the AI
+REFRESH_ENABLED = os.getenv("REFRESH_ENABLED", "0") == "1"
+REFRESH_PERIODS = (
+    json.loads(os.getenv("REFRESH_PERIODS"))
+    if os.getenv("REFRESH_PERIODS")
+    else {
+        "info": 24 * 60 * 60,
+        "committees": 24 * 60 * 60,
+        "legislation": 6 * 60 * 60,
+        "image_url": 7 * 24 * 60 * 60,
+        "bio": 7 * 24 * 60 * 60,
+    }
+)
+REFRESH_CHECK_INTERVAL = float(os.getenv("REFRESH_CHECK_INTERVAL", 60))
+REFRESH_RETRY_INTERVAL = float(os.getenv("REFRESH_RETRY_INTERVAL", 15 * 60))
+
+# Run journal setup
+JOURNAL_DIR = os.getenv(
+    "JOURNAL_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "journals"),
+)
+JOURNAL_TTL = float(os.getenv("JOURNAL_TTL", 24 * 60 * 60))
+
+# Debug mode setup
+DEBUG = os.getenv("WS_DEBUG", "0") == "1"
+LOOP_LAG_THRESHOLD = float(os.getenv("LOOP_LAG_THRESHOLD", 0.1))
+
+# Metrics setup
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_HOST = os.getenv("METRICS_HOST", "localhost")
+METRICS_PORT = int(os.getenv("METRICS_PORT", 50001))
+connections_gauge = registry.gauge(
+    "websocket_connections", "Open websocket connections"
+)
+registry.gauge(
+    "websocket_running_jobs",
+    "Scrape jobs running",
+    function=lambda: job_registry.get_stats()["running"],
+)
+registry.gauge(
+    "websocket_snapshot_age_seconds",
+    "Seconds since each field of the snapshot was updated",
+    ("field",),
+    lambda: {
+        (field,): snapshot_store.get_age(field) for field in snapshot_store.updated_at
+    },
+)
 
+# Export setup, exports are served next to the metrics
+EXPORT_ENABLED = os.getenv("EXPORT_ENABLED", "1") == "1"
+EXPORT_DIR = os.getenv(
+    "EXPORT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "exports"),
+)
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", 500))
+EXPORT_MAX_FILES = int(os.getenv("EXPORT_MAX_FILES", 32))
+EXPORT_GRACE = float(os.getenv("EXPORT_GRACE", 300))
+export_cache = ExportCache(
+    EXPORT_DIR, FIELD_COLUMNS, EXPORT_CHUNK_ROWS, EXPORT_MAX_FILES, EXPORT_GRACE
+)
+exports_counter = registry.counter(
+    "websocket_exports_total", "Exports served", ("format", "cache")
+)
 
-# This will hold the text updates for the frontend.
-print_queue = queue.Queue()
+# Admin setup, profiling a run is only allowed with the admin token
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PROFILE_NEXT_RUN = os.getenv("PROFILE_NEXT_RUN", "0") == "1"
 
 # Rate Limiting Setup
 RATE_LIMIT = 5
 RATE_LIMIT_WINDOW = 60
-request_timestamps = defaultdict(list)
+MAX_TRACKED_CLIENTS = int(os.getenv("MAX_TRACKED_CLIENTS", 10000))
+rate_limiter = ClientRateLimiter(
+    RATE_LIMIT / RATE_LIMIT_WINDOW, RATE_LIMIT, MAX_TRACKED_CLIENTS
+)
+
+# Exports have their own buckets so downloads do not use up a client's scrapes
+EXPORT_RATE_LIMIT = int(os.getenv("EXPORT_RATE_LIMIT", 30))
+EXPORT_RATE_LIMIT_WINDOW = 60
+export_rate_limiter = ClientRateLimiter(
+    EXPORT_RATE_LIMIT / EXPORT_RATE_LIMIT_WINDOW, EXPORT_RATE_LIMIT, MAX_TRACKED_CLIENTS
+)
+
+# Admission Setup, scrapes past the running cap wait in line
+MAX_RUNNING_SCRAPES = int(os.getenv("MAX_RUNNING_SCRAPES", 2))
+MAX_QUEUED_SCRAPES = int(os.getenv("MAX_QUEUED_SCRAPES", 20))
+scrape_admission = ScrapeAdmission(MAX_RUNNING_SCRAPES, MAX_QUEUED_SCRAPES)
+registry.gauge(
+    "websocket_queued_scrapes",
+    "Scrape jobs waiting for a running slot",
+    function=lambda: len(scrape_admission.waiters),
+)
+
+# Commands are small, anything larger is refused by the websocket itself
+MAX_MESSAGE_BYTES = int(os.getenv("MAX_MESSAGE_BYTES", 4096))
 
 
 logging.basicConfig(
@@ -93,37 +284,30 @@ BANNED_PATTERNS = [
     r"@import",
     r"@keyframes",
 ]
+BANNED_REGEX = re.compile(
+    "|".join(re.escape(pattern) for pattern in BANNED_PATTERNS), re.IGNORECASE
+)
 
 
-def is_rate_limited(client_ip):
+def is_admin(msg_json):
     """
-    Checks if a client IP has exceeded the rate limit within the time window.
+    Checks if a message carries the admin token.
 
     Args:
-        client_ip (str): The IP address of the client trying to make a request.
+        msg_json (dict): The message from the frontend.
 
     Returns:
-        bool: True if the IP is rate-limited (exceeded the request limit), False otherwise.
+        bool: True if an admin token is set and the message's token matches it.
     """
-    current_time = datetime.now()
-
-    # Get timestamps in window
-    request_timestamps[client_ip] = [
-        timestamp
-        for timestamp in request_timestamps[client_ip]
-        if current_time - timestamp < timedelta(seconds=RATE_LIMIT_WINDOW)
-    ]
+    token = msg_json.get("admin_token")
 
-    # Return true if rate is exceeded
-    if len(request_timestamps[client_ip]) >= RATE_LIMIT:
-        return True
+    if not ADMIN_TOKEN or not isinstance(token, str):
+        return False
 
-    # If no exceeded, log time stamp and return False
-    request_timestamps[client_ip].append(current_time)
-    return False
+    return hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
 
 
-async def receive_from_frontend(websocket):
+async def receive_from_frontend(websocket, subscriptions):
     """
     Gets messages in json format from the front end
 
@@ -133,6 +317,8 @@ async def receive_from_frontend(websocket):
     Args:
         websocket (websockets.WebSocketClientProtocol): The WebSocket connection
         to the frontend.
+        subscriptions (list): The (job, subscriber, send task) of every job the
+        connection is subscribed to, cleaned up by handler.
     """
     while True:
         try:
@@ -140,31 +326,84 @@ async def receive_from_frontend(websocket):
 
             client_ip = websocket.remote_address[0]
 
-            if is_rate_limited(client_ip):
-                error_msg = json.dumps(
-                    "Rate limit exceeded. Please wait before making another request."
+            if not rate_limiter.allow(client_ip):
+                error_msg = create_msg(
+                    "error",
+                    "Rate limit exceeded. Please wait before making another request.",
                 )
-                await websocket.send(f'{{"msg_type":"error", "msg": {error_msg}}}')
+                await websocket.send(error_msg)
                 await websocket.close()
                 return
 
-            if any(
-                re.search(pattern, message, re.IGNORECASE)
-                for pattern in BANNED_PATTERNS
-            ):
+            if BANNED_REGEX.search(message):
                 raise ValueError("Malicious content detected in message.")
 
             msg_json = json.loads(message)
 
             if msg_json["msg_type"] == "command" and msg_json["msg"] == "start_scraper":
                 fields = [field.strip() for field in msg_json["fields"]]
-                asyncio.create_task(run_scraper_handler(websocket, fields))
-                await send_to_frontend(websocket)
+                stream = msg_json.get("stream") is True
+                profile = msg_json.get("profile") is True
+
+                if profile and not is_admin(msg_json):
+                    logging.warning(f"{client_ip} asked to profile without the token")
+                    error_msg = create_msg("error", "Only admins can profile a run.")
+                    await websocket.send(error_msg)
+                    await websocket.close()
+                    continue
+
+                job, created = job_registry.get_job(fields, stream)
+
+                if created:
+                    start_job(job, profile)
+                    subscriber = job.subscribe()
+                else:
+                    logging.info(f"{client_ip} joined scrape job {job.job_id}")
+                    subscriber = job.subscribe(
+                        create_msg("update", "Joined a scrape already in progress")
+                    )
+
+                send_task = asyncio.create_task(send_to_frontend(websocket, subscriber))
+                subscriptions.append((job, subscriber, send_task))
+            elif msg_json["msg_type"] == "command" and msg_json["msg"] == "resume_run":
+                stream = msg_json.get("stream") is True
+
+                job, note = await resume_job(msg_json.get("run_id"), stream)
+
+                if job is None:
+                    error_msg = create_msg("error", "No interrupted run to resume.")
+                    await websocket.send(error_msg)
+                    await websocket.close()
+                    continue
+
+                logging.info(f"{client_ip} resumed with scrape job {job.job_id}")
+                subscriber = job.subscribe(create_msg("update", note))
+
+                send_task = asyncio.create_task(send_to_frontend(websocket, subscriber))
+                subscriptions.append((job, subscriber, send_task))
+            elif (
+                msg_json["msg_type"] == "command" and msg_json["msg"] == "get_snapshot"
+            ):
+                snapshot_msg = snapshot_store.get_message()
+
+                if snapshot_msg is None:
+                    snapshot_msg = create_msg(
+                        "error", "No snapshot yet. Run the scraper to get fresh data."
+                    )
+
+                await websocket.send(snapshot_msg)
+                await websocket.close()
             elif (
                 msg_json["msg_type"] == "command" and msg_json["msg"] == "get_rep_names"
             ):
-                names = json.dumps(get_representative_list())
-                json_return_msg = f'{{"msg_type":"data", "msg":{names}}}'
+                try:
+                    json_return_msg = create_msg("data", await get_rep_names())
+                except RuntimeError as e:
+                    logging.error(f"Could not get the representative names: {e}")
+                    json_return_msg = create_msg(
+                        "error", "Could not get the list of representatives. Try again."
+                    )
+
                 await websocket.send(json_return_msg)
                 await websocket.close()
 
@@ -176,95 +415,217 @@ async def receive_from_frontend(websocket):
             print(f"Invalid message content: {ve}")
             break
 
-        await asyncio.sleep(0.1)
-
 
-async def send_to_frontend(websocket):
+async def send_to_frontend(websocket, subscriber):
     """
     Sends updated to the frontend via a websocket
 
-    Continuously checks global print_queue for new messages and sends them
-    to the frontend via the passed websocket. Ensures there is no blocking
-    and breaks loop when websocket is closed
+    Waits on the connection's job subscription and sends the published messages
+    to the frontend as json array frames. Each frame holds every message collected
+    during the flush interval, up to the max frame size. Once the job is finished
+    and every message has been sent, the websocket is closed. A connection that fell
+    too far behind gets an error and is closed with code 1013 (try again later).
 
     Args:
         websocket (websockets.WebSocketClientProtocol): The WebSocket connection
         to the frontend.
+        subscriber (MessageBuffer): The connection's subscription to its job.
     """
     while True:
+        frame = await subscriber.get_frame()
+
+        # None means the job is finished and its messages were all sent
+        if frame is None:
+            if subscriber.overflowed:
+                await websocket.close(1013, "Too far behind")
+            else:
+                await websocket.close()
+            break
+
         try:
-            # Try to get the next message from the queue (non-blocking)
-            text = print_queue.get_nowait()
+            await websocket.send(frame)
+        except websockets.exceptions.ConnectionClosed:
+            break
 
-            # Try sending a message, catch ConnectionClosed exception if closed
-            try:
-                await websocket.send(text)
-            except websockets.exceptions.ConnectionClosed:
-                break
 
-        except queue.Empty:
-            pass
+async def run_scraper_handler(job, profile=False):
+    """
+    Run the scraper and sends progress updates to the frontend.
 
-        await asyncio.sleep(0.1)
+    Runs the job, which calls the scraper for the fields no earlier job has and
+    publishes the progress and merged results to every subscribed client. After
+    completion, it publishes a final "Finished" message, finishes the job and
+    merges its complete results into the snapshot.
 
+    A job that does not resume a run gets a new run journal, and its run id is sent
+    to the subscribers so they can resume it if the run is interrupted.
 
-def add_to_ui_queue(text):
-    """
-    Function to add updates to the UI queue and print them.
+    A profiled job's run_scraper call is profiled, as is the first job after startup
+    with PROFILE_NEXT_RUN.
 
-    Adds messages to the global print_queue. This function can be
-    passed to other files to faciliate printing to the front end
+    A job waits for one of the MAX_RUNNING_SCRAPES running slots every time it calls
+    the scraper and gives it back as soon as the scraper returns, so a job waiting
+    for the job it reuses does not hold a slot. Its subscribers are told their place
+    in line while it waits. This covers a job that only reuses results too, when the
+    job it reuses did not complete them. If the queue is full the job is finished
+    with an error instead. Only a job that runs to the end is marked as succeeded,
+    so later jobs can reuse its results, and its journal is deleted.
 
     Args:
-        text: The message to be added to the queue
+        job (ScrapeJob): The job to run.
+        profile (bool): Whether to profile the job's scraper run.
+    """
+    global PROFILE_NEXT_RUN
+
+    if PROFILE_NEXT_RUN and job.scrape_fields:
+        PROFILE_NEXT_RUN = False
+        profile = True
+
+    scraper = partial(run_scraper, profile=True) if profile else run_scraper
+
+    async def admitted_scraper(*args, **kwargs):
+        await scrape_admission.acquire(partial(notify_queue_position, job))
+
+        try:
+            return await scraper(*args, **kwargs)
+        finally:
+            scrape_admission.release()
+
+    try:
+        if job.journal is None and job.scrape_fields:
+            try:
+                job.journal = await asyncio.to_thread(
+                    RunJournal.create, JOURNAL_DIR, job.scrape_fields
+                )
+            except OSError as e:
+                logging.error(f"Could not create run journal: {e}")
+
+        if job.journal is not None:
+            run_id = job.journal.run_id
+            job.channel.publish(
+                create_msg("update", f"Run id: {run_id}", run_id=run_id)
+            )
+
+        if profile:
+            logging.info(f"Profiling scrape job {job.job_id}")
+
+        await job.run(admitted_scraper)
+        job.succeeded = True
+
+        # run_scraper finishes the journal, but a job that only reuses results
+        # never calls it
+        if job.journal is not None:
+            await job.journal.flush()
+            await asyncio.to_thread(job.journal.finish)
+        job.channel.publish(create_msg("update", "Finished from websocket"))
+    except QueueFullError as e:
+        logging.warning(f"Scrape job {job.job_id} refused: {e}")
+        job.channel.publish(
+            create_msg("error", "The server is busy. Wait a few minutes and try again.")
+        )
+    except Exception as e:
+        # Log the error and notify the client if error occurs
+        logging.error(f"Error occurred while running scraper: {e}")
+        job.channel.publish(
+            create_msg("error", f"Error occurred: {e}. This error has been logged.")
+        )
+    finally:
+        # A journal left by a failed run is kept so the run can be resumed
+        if job.journal is not None:
+            await job.journal.flush()
+            await asyncio.to_thread(job.journal.close)
+
+        job.finish()
+        logging.info(f"Scrape job {job.job_id} finished: {job_registry.get_stats()}")
+
+    if await snapshot_store.update(job.scraped_fields, job.results):
+        logging.info(f"Snapshot updated: {snapshot_store.get_stats()}")
+
+
+def notify_queue_position(job, position):
     """
+    Tells a queued job's subscribers their place in line.
 
-    print_queue.put(text + "\n")
+    Args:
+        job (ScrapeJob): The job waiting for a running slot.
+        position (int): The job's position in the queue, starting at 1.
+    """
+    job.channel.publish(
+        create_msg(
+            "update",
+            f"Waiting for other scrapes to finish, position {position}",
+            queue_position=position,
+        )
+    )
 
 
-async def sendJson(websocket, people_json):
+def start_job(job, profile=False):
     """
-    Sends one final message to the front via a websocket, waits a delay, then
-    the websocket
+    Starts a new scrape job's task.
 
     Args:
-        websocket (websockets.WebSocketClientProtocol): The WebSocket connection
-        to the front end
-        people_json: The message to be sent. Should be in json format.
+        job (ScrapeJob): The job returned as new by the job registry.
+        profile (bool): Whether to profile the job's scraper run.
     """
-    await websocket.send(people_json)
-    time.sleep(3)
-    await websocket.close()
-    print("WebSocket Closed", "132")
+    job.task = asyncio.create_task(run_scraper_handler(job, profile))
 
 
-async def run_scraper_handler(websocket, fields):
+async def resume_job(run_id, stream):
     """
-    Run the scraper and sends progress updates to the frontend.
+    Gets the job that finishes an interrupted run.
 
-    Calls the scraper function and sends the resulting updates to the
-    WebSocket. After completion, it adds a final "Finished" message to the queue.
+    Replays the run's journal and starts a job that only scrapes the missing units.
+    A run that is still going is joined instead, as is a running job that already
+    covers the run's fields.
 
     Args:
-        websocket (websockets.WebSocketClientProtocol): The WebSocket connection
-        to the frontend used to communicate to the front end.
+        run_id (str): The id of the run, or None for the most recent one.
+        stream (bool): Whether the client wants results as they finish.
+
+    Returns:
+        tuple: The job and a note for the client, or (None, None) if there is no such run.
     """
-    try:
-        await run_scraper(fields, add_to_ui_queue, sendJson, websocket)
-        add_to_ui_queue('{"msg_type": "update", "msg": "Finished from websocket"}')
-    except Exception as e:
-        # Log the error and notify the client if error occurs
-        logging.error(f"Error occurred while running scraper: {e}")
-        error_msg = json.dumps(f"Error occurred: {e}. This error has been logged.")
-        add_to_ui_queue(f'{{"msg_type": "error", "msg": {error_msg}}}')
+    if not run_id:
+        run_id = await asyncio.to_thread(get_latest_run_id, JOURNAL_DIR)
+
+    job = job_registry.get_journaled_job(run_id)
+    if job is not None:
+        return job, f"Joined run {run_id}, which is still running"
+
+    journal = await asyncio.to_thread(RunJournal.open, JOURNAL_DIR, run_id)
+    if journal is None:
+        return None, None
+
+    job, created = job_registry.get_job(journal.fields, stream)
+
+    if not created:
+        # The running job scrapes every unit of the run anyway
+        journal.close()
+        return job, "Joined a scrape already in progress"
+
+    job.journal = journal
+    start_job(job)
+
+    return job, f"Resuming run {run_id}: {journal.replayed} units were already done"
+
+
+refresh_scheduler = RefreshScheduler(
+    job_registry,
+    snapshot_store,
+    REFRESH_PERIODS,
+    start_job,
+    check_interval=REFRESH_CHECK_INTERVAL,
+    retry_interval=REFRESH_RETRY_INTERVAL,
+)
 
 
 async def handler(websocket):
     """
     Handle WebSocket connection and manage scraping flow.
 
-    Receives connection and starts receiving and sending of messages
-    to the frontend.
+    Receives connection and starts receiving messages from the frontend. Every
+    start_scraper command subscribes the connection to a scrape job, which sends
+    its messages to the frontend.
 
     Args:
         websocket (websockets.WebSocketClientProtocol): The WebSocket connection
@@ -277,10 +638,114 @@ async def handler(websocket):
 
     logging.info(f"Connection made from IP: {client_ip}")
 
-    receive_task = asyncio.create_task(receive_from_frontend(websocket))
-    send_task = asyncio.create_task(send_to_frontend(websocket))
+    subscriptions = []
+    connections_gauge.inc()
+
+    try:
+        await receive_from_frontend(websocket, subscriptions)
+    finally:
+        connections_gauge.dec()
+
+        # The jobs keep running for their other subscribers
+        for job, subscriber, send_task in subscriptions:
+            job.channel.unsubscribe(subscriber)
+            send_task.cancel()
+
+            stats = subscriber.get_stats()
+            logging.info(f"Message frames for {client_ip}: {stats}")
+
+
+async def serve_metrics(request):
+    """
+    Serve the scraper and server metrics in the Prometheus text format.
+
+    Args:
+        request (web.Request): The request for /metrics.
+
+    Returns:
+        web.Response: The rendered metrics.
+    """
+    return web.Response(
+        text=registry.render(),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+    )
+
+
+async def serve_export(request):
+    """
+    Stream an export of the snapshot.
+
+    The query picks the format (tsv, csv, ndjson or parquet, tsv by default) and
+    optionally the fields (field=info&field=bio) and representatives (rep=...) to
+    include. The TSV has the columns of the frontend's Save Output file.
 
-    await asyncio.gather(receive_task, send_task)
+    Args:
+        request (web.Request): The request for /export.
+
+    Returns:
+        web.StreamResponse: The export file, or a json error.
+    """
+    if not export_rate_limiter.allow(request.remote):
+        error = "Rate limit exceeded. Please wait before making another request."
+        return web.json_response({"error": error}, status=429)
+
+    if snapshot_store.serialized is None:
+        return web.json_response(
+            {"error": "No snapshot yet. Run the scraper to get fresh data."}, status=404
+        )
+
+    export_format = request.query.get("format", "tsv")
+    version = snapshot_store.version
+
+    try:
+        path, built = await export_cache.get(
+            snapshot_store,
+            export_format,
+            request.query.getall("field", []),
+            request.query.getall("rep", []),
+        )
+    except ExportError as e:
+        return web.json_response({"error": str(e)}, status=400)
+
+    exports_counter.inc(format=export_format, cache="miss" if built else "hit")
+
+    content_type, extension = EXPORT_FORMATS[export_format]
+
+    # Sent from disk in chunks, the export is never read into memory
+    return web.FileResponse(
+        path,
+        headers={
+            "Content-Type": content_type,
+            "Content-Disposition": (
+                f'attachment; filename="representatives_data.{extension}"'
+            ),
+            "X-Snapshot-Version": str(version),
+        },
+    )
+
+
+async def start_http_server():
+    """
+    Start the http server for the /metrics and /export endpoints next to the
+    WebSocket server.
+
+    Returns:
+        web.AppRunner: The runner to clean up when the server stops.
+    """
+    app = web.Application()
+
+    if METRICS_ENABLED:
+        app.router.add_get("/metrics", serve_metrics)
+    if EXPORT_ENABLED:
+        app.router.add_get("/export", serve_export)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, METRICS_HOST, METRICS_PORT).start()
+
+    print(f"Http endpoints served on http://{METRICS_HOST}:{METRICS_PORT}")
+
+    return runner
 
 
 async def start_server():
@@ -289,10 +754,54 @@ async def start_server():
 
     Initializes the WebSocket server on port 50000 and continuously listens
     for incoming connections from the frontend to manage the scraping process.
+
+    Loads the saved snapshot, deletes run journals too old to resume and starts the
+    background refresh scheduler.
+
+    Serves the metrics and exports on METRICS_PORT unless METRICS_ENABLED and
+    EXPORT_ENABLED are both off.
+
+    In debug mode the event loop logs slow callbacks and the loop lag monitor logs
+    the stack of anything that holds the loop past LOOP_LAG_THRESHOLD.
     """
-    server = await websockets.serve(handler, "localhost", 50000)
+    monitor = None
+    http_runner = None
+
+    await asyncio.to_thread(snapshot_store.load)
+    await asyncio.to_thread(prune_journals, JOURNAL_DIR, JOURNAL_TTL)
+
+    if REFRESH_ENABLED:
+        refresh_scheduler.start()
+
+    if DEBUG:
+        loop = asyncio.get_running_loop()
+        loop.set_debug(True)
+        loop.slow_callback_duration = LOOP_LAG_THRESHOLD
+
+        monitor = LoopLagMonitor(threshold=LOOP_LAG_THRESHOLD)
+        monitor.start()
+
+    if METRICS_ENABLED or EXPORT_ENABLED:
+        http_runner = await start_http_server()
+
+    server = await websockets.serve(
+        handler, "localhost", 50000, max_size=MAX_MESSAGE_BYTES
+    )
     print("WebSocket server running on ws://0.0.0.0:65432")
-    await server.wait_closed()
+
+    try:
+        await server.wait_closed()
+    finally:
+        refresh_scheduler.stop()
+
+        if monitor:
+            monitor.stop()
+            logging.info(f"Event loop lag: {monitor.get_stats()}")
+
+        if http_runner:
+            await http_runner.cleanup()
+
+        await close_session()
 
 
 if __name__ == "__main__":
@@ -78,6 +78,7 @@ const Body = () => {
                 msg_type: "command",
                 msg: initial_command,
                 fields: fieldList,
+                stream: true,
             };
 
             socket.send(JSON.stringify(message));
@@ -90,22 +91,17 @@ const Body = () => {
             /* Checking is message json */
             try {
                 message = JSON.parse(event.data);
-
-                if ("msg_type" in message) {
-                    if (message["msg_type"] === "update") {
-                        handleRepUpdate(message);
-                        setMessages((prevMessages) => [...prevMessages, message["msg"]]);
-                    } else if (message["msg_type"] === "error") {
-                        setMessages((prevMessages) => [...prevMessages, message["msg"]]);
-                    } else if (message["msg_type"] === "data") {
-                        initializeReps(message["msg"]);
-                    }
-                } else {
-                    setCsvJson(message);
-                }
             } catch (e) {
                 message = "Not Json format. Printing plain message: " + event.data;
                 setMessages((prevMessages) => [...prevMessages, message]);
+                return;
+            }
+
+            /* Progress messages arrive coalesced into arrays */
+            if (Array.isArray(message)) {
+                message.forEach(handleMessage);
+            } else {
+                handleMessage(message);
             }
         };
 
@@ -126,6 +122,31 @@ const Body = () => {
         };
     };
 
+    const handleMessage = (message) => {
+        if (typeof message !== "object" || message === null) {
+            setMessages((prevMessages) => [...prevMessages, String(message)]);
+        } else if ("msg_type" in message) {
+            if (message["msg_type"] === "update") {
+                handleRepUpdate(message);
+                setMessages((prevMessages) => [...prevMessages, message["msg"]]);
+            } else if (message["msg_type"] === "error") {
+                setMessages((prevMessages) => [...prevMessages, message["msg"]]);
+            } else if (message["msg_type"] === "data") {
+                initializeReps(message["msg"]);
+            } else if (message["msg_type"] === "result") {
+                handleRepResult(message);
+            } else if (message["msg_type"] === "manifest") {
+                const manifest = message["msg"];
+                setMessages((prevMessages) => [
+                    ...prevMessages,
+                    `Received ${manifest["results"]} results for ${manifest["rep_count"]} representatives`,
+                ]);
+            }
+        } else {
+            setCsvJson(message);
+        }
+    };
+
     const handleRepUpdate = (message) => {
         let status_mode;
 
@@ -151,6 +172,28 @@ const Body = () => {
         }
     };
 
+    /* Results are sent as each rep finishes. Retried reps are sent again with a higher seq */
+    const handleRepResult = (message) => {
+        setReps((prevReps) => {
+            const updatedReps = { ...prevReps };
+
+            Object.entries(message["msg"]).forEach(([name, person]) => {
+                const current = updatedReps[name];
+
+                if (current && (current.seq === undefined || current.seq < message["seq"])) {
+                    updatedReps[name] = {
+                        ...current,
+                        ...person,
+                        seq: message["seq"],
+                        status: "checked",
+                    };
+                }
+            });
+
+            return updatedReps;
+        });
+    };
+
     const initializeReps = (names) => {
         const newReps = {};
         names.forEach((name) => {